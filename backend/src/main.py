@@ -1,5 +1,6 @@
 import os
 import sys
+import click
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -10,6 +11,24 @@ from src.routes.projects import projects_bp
 from src.routes.ai_chat import ai_chat_bp
 from src.routes.learning import learning_bp
 from src.routes.community import community_bp
+from src.services.search import init_search_index
+from src.services.facets import init_facet_index
+from src.services.stats import init_project_stats, stats_reconciler
+from src.services.activity_log import activity_log
+from src.services.activity_feed import activity_feed
+from src.services.rollups import init_learning_rollups, rebuild_learning_rollups
+from src.services.knowledge_graph import init_knowledge_graph, knowledge_graph
+from src.services.matching import matcher
+from src.services.similarity import similarity
+from src.services.schema import ensure_indexes
+from src.services.counters import counters
+from src.services.seed import seed_database
+from src.services.ingest import DEFAULT_CHUNK_SIZE, ingest_prices
+from src.services.cache import response_cache
+from src.services.llm import llm
+from src.services.reply_cache import reply_cache
+from src.services.sessions import sessions
+from src.services.concepts import concepts
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'techcraft_genius_ai_secret_key_2024'
@@ -24,12 +43,157 @@ app.register_blueprint(learning_bp, url_prefix='/api')
 app.register_blueprint(community_bp, url_prefix='/api')
 
 # Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
+# Seconds between batched writes of project view counters (0 writes after every request)
+app.config['COUNTER_FLUSH_INTERVAL'] = float(os.environ.get('COUNTER_FLUSH_INTERVAL', 5))
+counters.init_app(app)
+
+# Response cache for read-mostly endpoints: 'memory' (per process), 'file' (shared) or 'none'
+app.config['RESPONSE_CACHE_BACKEND'] = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+app.config['RESPONSE_CACHE_DIR'] = os.environ.get(
+    'RESPONSE_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'database', 'response_cache')
+)
+app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+response_cache.init_app(app)
+
+# OpenAI-compatible completion server for chat replies; unset uses the keyword responder only
+app.config['LLM_BASE_URL'] = os.environ.get('LLM_BASE_URL')
+app.config['LLM_MODEL'] = os.environ.get('LLM_MODEL', 'default')
+app.config['LLM_API_KEY'] = os.environ.get('LLM_API_KEY')
+app.config['LLM_TIMEOUT'] = float(os.environ.get('LLM_TIMEOUT', 8))
+app.config['LLM_MAX_CONCURRENCY'] = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+app.config['LLM_BATCHING'] = os.environ.get('LLM_BATCHING', '0') == '1'
+llm.init_app(app)
+
+# Chat replies reused for identical or near-duplicate messages; memory grows with capacity x dim
+app.config['REPLY_CACHE_CAPACITY'] = int(os.environ.get('REPLY_CACHE_CAPACITY', 1024))
+app.config['REPLY_CACHE_DIM'] = int(os.environ.get('REPLY_CACHE_DIM', 2048))
+app.config['REPLY_CACHE_THRESHOLD'] = float(os.environ.get('REPLY_CACHE_THRESHOLD', 0.7))
+app.config['REPLY_CACHE_TTL'] = int(os.environ.get('REPLY_CACHE_TTL', 3600))
+reply_cache.init_app(app)
+
+# Chat conversations: append-only logs on disk, recently active ones kept in memory
+app.config['SESSION_DIR'] = os.environ.get(
+    'SESSION_DIR', os.path.join(os.path.dirname(__file__), 'database', 'conversations')
+)
+app.config['SESSION_HOT_CAPACITY'] = int(os.environ.get('SESSION_HOT_CAPACITY', 256))
+app.config['SESSION_TOKEN_BUDGET'] = int(os.environ.get('SESSION_TOKEN_BUDGET', 1500))
+# Conversation logs are deleted after SESSION_IDLE_TTL idle seconds or beyond the SESSION_MAX_COUNT
+# most recent (0 disables either), checked at most every SESSION_PRUNE_INTERVAL seconds
+app.config['SESSION_IDLE_TTL'] = int(os.environ.get('SESSION_IDLE_TTL', 30 * 24 * 3600))
+app.config['SESSION_MAX_COUNT'] = int(os.environ.get('SESSION_MAX_COUNT', 10000))
+app.config['SESSION_PRUNE_INTERVAL'] = float(os.environ.get('SESSION_PRUNE_INTERVAL', 600))
+sessions.init_app(app)
+
+# Directory for the precomputed concept-merge pair table
+app.config['CONCEPT_DATA_DIR'] = os.environ.get('CONCEPT_DATA_DIR', os.path.join(os.path.dirname(__file__), 'database'))
+concepts.init_app(app)
+
+# Seconds between background checks of the materialized project stats (0 disables them)
+app.config['STATS_RECONCILE_INTERVAL'] = float(os.environ.get('STATS_RECONCILE_INTERVAL', 3600))
+stats_reconciler.init_app(app)
+
+# Learning activities older than LEARNING_HOT_DAYS move to monthly archive tables, which are
+# dropped after LEARNING_RETENTION_MONTHS (0 keeps them); the interval is in seconds (0 disables)
+app.config['LEARNING_HOT_DAYS'] = int(os.environ.get('LEARNING_HOT_DAYS', 30))
+app.config['LEARNING_RETENTION_MONTHS'] = int(os.environ.get('LEARNING_RETENTION_MONTHS', 12))
+app.config['LEARNING_ROLLOVER_INTERVAL'] = float(os.environ.get('LEARNING_ROLLOVER_INTERVAL', 3600))
+activity_log.init_app(app)
+
+# Live learning activity stream: events buffered for replay, replayed to new subscribers, heartbeat seconds
+app.config['ACTIVITY_FEED_CAPACITY'] = int(os.environ.get('ACTIVITY_FEED_CAPACITY', 1000))
+app.config['ACTIVITY_FEED_REPLAY'] = int(os.environ.get('ACTIVITY_FEED_REPLAY', 20))
+app.config['ACTIVITY_FEED_HEARTBEAT'] = float(os.environ.get('ACTIVITY_FEED_HEARTBEAT', 15))
+activity_feed.init_app(app)
+
+# Directory for the memory-mapped knowledge graph snapshots and how many recent versions to keep
+app.config['KNOWLEDGE_GRAPH_DIR'] = os.environ.get(
+    'KNOWLEDGE_GRAPH_DIR', os.path.join(os.path.dirname(__file__), 'database', 'knowledge_graph')
+)
+app.config['KNOWLEDGE_GRAPH_KEEP'] = int(os.environ.get('KNOWLEDGE_GRAPH_KEEP', 3))
+knowledge_graph.init_app(app)
+
+# Seconds between checks for new or changed projects in the equipment matching index
+app.config['MATCH_REFRESH_INTERVAL'] = float(os.environ.get('MATCH_REFRESH_INTERVAL', 2))
+matcher.init_app(app)
+
+# Seconds between checks for new or changed projects in the similar-projects index
+app.config['SIMILAR_REFRESH_INTERVAL'] = float(os.environ.get('SIMILAR_REFRESH_INTERVAL', 2))
+similarity.init_app(app)
+
+# Insert sample data at startup; disable to seed only through `flask seed`
+app.config['SEED_ON_STARTUP'] = os.environ.get('SEED_ON_STARTUP', '1') != '0'
+
 with app.app_context():
     db.create_all()
+    ensure_indexes(db.engine, db.metadata)
+    init_search_index(db.engine)
+    init_facet_index(db.engine)
+    init_project_stats(db.engine)
+    init_learning_rollups(db.engine)
+    init_knowledge_graph(db.engine)
+    if app.config['SEED_ON_STARTUP']:
+        seed_database()
+
+@app.cli.command('seed')
+def seed_command():
+    """Insert the sample projects, learning activities and community posts"""
+    applied = seed_database()
+    click.echo(f"Seeded: {', '.join(applied)}" if applied else 'Nothing to seed')
+
+@app.cli.command('reconcile-stats')
+def reconcile_stats_command():
+    """Recompute the materialized project stats and report any drift"""
+    drift = stats_reconciler.run_once()
+    for row in drift:
+        click.echo(f"{row['category']}.{row['field']}: stored {row['stored']}, actual {row['actual']}")
+    click.echo(f'Rebuilt project stats ({len(drift)} differences)' if drift else 'Project stats are in sync')
+
+@app.cli.command('rollover-activities')
+def rollover_activities_command():
+    """Archive old learning activities by month and drop archives past retention"""
+    report = activity_log.run_once()
+    click.echo(f"Archived {report['archived']} activities" + (
+        f", dropped archives for {', '.join(report['dropped'])}" if report['dropped'] else ''
+    ))
+
+@app.cli.command('rebuild-learning-rollups')
+def rebuild_learning_rollups_command():
+    """Recount the learning activity rollups from the activity log and its archives"""
+    with db.engine.begin() as conn:
+        counted = rebuild_learning_rollups(conn)
+    click.echo(f'Rebuilt learning rollups from {counted} activities')
+
+@app.cli.command('prune-sessions')
+def prune_sessions_command():
+    """Delete idle conversation logs and those beyond SESSION_MAX_COUNT"""
+    click.echo(f'Deleted {sessions.prune()} conversation logs')
+
+@app.cli.command('ingest-prices')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']), help='Defaults to the file extension')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help='Rows per upsert batch')
+def ingest_prices_command(path, file_format, chunk_size):
+    """Upsert component prices from a supplier CSV or JSON-lines feed (optionally gzipped)"""
+    last_echo = [0.0]
+    
+    def progress(report):
+        if report.elapsed - last_echo[0] >= 1:
+            last_echo[0] = report.elapsed
+            click.echo(f'{report.rows_read} rows, {report.rows_per_sec} rows/sec', err=True)
+    
+    report = ingest_prices(path, file_format, chunk_size, progress)
+    summary = report.to_dict()
+    click.echo(
+        f"Read {summary['rows_read']} rows in {summary['seconds']}s ({summary['rows_per_sec']} rows/sec): "
+        f"{summary['rows_upserted']} upserted, {summary['rows_invalid']} invalid, "
+        f"{summary['rows_unmatched']} unmatched, {summary['suppliers']} suppliers"
+    )
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
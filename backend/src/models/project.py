@@ -24,27 +24,63 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'difficulty': self.difficulty,
-            'cost': self.cost,
-            'duration': self.duration,
-            'category': self.category,
-            'tags': json.loads(self.tags) if self.tags else [],
-            'rating': self.rating,
-            'views': self.views,
-            'likes': self.likes,
-            'components': json.loads(self.components) if self.components else [],
-            'skills': json.loads(self.skills) if self.skills else [],
-            'code_content': self.code_content,
-            'instructions': self.instructions,
-            'circuit_diagram': self.circuit_diagram,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    __table_args__ = (
+        db.Index('ix_project_rating_id', 'rating', 'id'),
+        db.Index('ix_project_updated_at', 'updated_at'),
+    )
+    
+    # Serializable fields, in output order
+    FIELDS = (
+        'id', 'title', 'description', 'difficulty', 'cost', 'duration', 'category', 'tags',
+        'rating', 'views', 'likes', 'components', 'skills', 'code_content', 'instructions',
+        'circuit_diagram', 'created_at', 'updated_at'
+    )
+    JSON_FIELDS = ('tags', 'components', 'skills')
+    DATETIME_FIELDS = ('created_at', 'updated_at')
+    
+    def to_dict(self, fields=None):
+        """Serialize the project, optionally only the given subset of FIELDS.
+        
+        Only the requested attributes are touched, so deferred columns are never loaded.
+        """
+        data = {}
+        for field in fields or self.FIELDS:
+            value = getattr(self, field)
+            if field in self.JSON_FIELDS:
+                value = json.loads(value) if value else []
+            elif field in self.DATETIME_FIELDS:
+                value = value.isoformat() if value else None
+            data[field] = value
+        return data
+
+class ProjectFacet(db.Model):
+    """Normalized tag/component/skill rows derived from the JSON columns on Project"""
+    __tablename__ = 'project_facet'
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True)
+    facet = db.Column(db.String(20), primary_key=True)  # tag, component, skill
+    value_key = db.Column(db.String(200), primary_key=True)  # lower-cased value used for lookups
+    value = db.Column(db.String(200), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_project_facet_lookup', 'facet', 'value_key', 'project_id'),
+    )
+
+class KnowledgeEdge(db.Model):
+    """Number of projects two knowledge graph nodes ('<kind>:<value>') share, kept current by triggers"""
+    __tablename__ = 'knowledge_edge'
+    source = db.Column(db.String(220), primary_key=True)
+    target = db.Column(db.String(220), primary_key=True)
+    weight = db.Column(db.Integer, nullable=False, default=0)
+
+class ProjectStats(db.Model):
+    """Per-category project totals, kept current by triggers on project"""
+    __tablename__ = 'project_stats'
+    category = db.Column(db.String(100), primary_key=True)
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+    total_views = db.Column(db.Integer, nullable=False, default=0)
+    total_likes = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Float, nullable=False, default=0.0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
 
 class LearningActivity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -53,6 +89,11 @@ class LearningActivity(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     activity_metadata = db.Column(db.Text)  # JSON string for additional data
     
+    __table_args__ = (
+        db.Index('ix_learning_activity_timestamp', 'timestamp'),
+        db.Index('ix_learning_activity_type_timestamp', 'activity_type', 'timestamp'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -62,6 +103,14 @@ class LearningActivity(db.Model):
             'metadata': json.loads(self.activity_metadata) if self.activity_metadata else {}
         }
 
+class LearningRollup(db.Model):
+    """Learning activity counts per type and minute, day or all time, kept current by a trigger"""
+    __tablename__ = 'learning_rollup'
+    bucket = db.Column(db.String(10), primary_key=True)  # minute, day, all
+    period = db.Column(db.String(16), primary_key=True)  # '2024-01-01 12:30', '2024-01-01' or ''
+    activity_type = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
 class CommunityPost(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_name = db.Column(db.String(100), nullable=False)
@@ -82,3 +131,58 @@ class CommunityPost(db.Model):
             'time': self.timestamp.strftime('%d hours ago') if self.timestamp else 'Unknown'
         }
 
+class Component(db.Model):
+    """Catalog part; parts sharing a compatibility group can stand in for each other"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    normalized_name = db.Column(db.String(200), nullable=False, unique=True)
+    category = db.Column(db.String(100), nullable=False)
+    compatibility_group = db.Column(db.String(100), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_component_group', 'compatibility_group', 'id'),
+    )
+
+class ComponentAlias(db.Model):
+    """Other normalized names a bill of materials may use for a component"""
+    __tablename__ = 'component_alias'
+    id = db.Column(db.Integer, primary_key=True)
+    component_id = db.Column(db.Integer, db.ForeignKey('component.id', ondelete='CASCADE'), nullable=False)
+    alias = db.Column(db.String(200), nullable=False, unique=True)
+
+class PriceQuote(db.Model):
+    """Latest price of a component at one supplier"""
+    __tablename__ = 'price_quote'
+    id = db.Column(db.Integer, primary_key=True)
+    component_id = db.Column(db.Integer, db.ForeignKey('component.id', ondelete='CASCADE'), nullable=False)
+    supplier = db.Column(db.String(100), nullable=False)
+    price = db.Column(db.Float, nullable=False)
+    quoted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('component_id', 'supplier', name='uq_price_quote_component_supplier'),
+        db.Index('ix_price_quote_component_price', 'component_id', 'price'),
+    )
+
+class Supplier(db.Model):
+    """Shop quoting component prices, with its flat shipping fee per order"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    shipping_fee = db.Column(db.Float, nullable=False, default=0.0)
+    free_shipping_threshold = db.Column(db.Float)  # order subtotal waiving the fee; NULL never waives it
+
+class ComponentConflict(db.Model):
+    """Two components that cannot be used in the same build, such as a camera and a board without its connector"""
+    __tablename__ = 'component_conflict'
+    id = db.Column(db.Integer, primary_key=True)
+    component_id = db.Column(db.Integer, db.ForeignKey('component.id', ondelete='CASCADE'), nullable=False)
+    conflicts_with_id = db.Column(db.Integer, db.ForeignKey('component.id', ondelete='CASCADE'), nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('component_id', 'conflicts_with_id', name='uq_component_conflict_pair'),
+    )
+
+class SeedRun(db.Model):
+    """Marks a sample data set as applied so seeding runs once per database"""
+    name = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
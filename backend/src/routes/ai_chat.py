@@ -1,33 +1,23 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 import os
 import json
 from datetime import datetime
+from itertools import combinations
+from src.services.bom_optimizer import DEFAULT_TIME_BUDGET, Option, optimize_bom
+from src.services.catalog import compatible_quotes, component_conflicts, resolve_components, supplier_terms
+from src.services.chat import reply, stream_reply
+from src.services.concepts import PARTNER_ORDERINGS, concepts
+from src.services.matching import matcher
+from src.services.reply_cache import reply_cache
+from src.services.sessions import sessions
 
 ai_chat_bp = Blueprint('ai_chat', __name__)
 
-# AI system prompt for TechCraft Genius AI
-SYSTEM_PROMPT = """
-You are TechCraft Genius AI, a revolutionary AI assistant specialized in DIY tech projects. You have the following capabilities:
-
-1. CONCEPT MERGING: You can intelligently combine different concepts to create innovative projects. For example, merging "flying" + "robot" creates an autonomous drone project.
-
-2. CONTINUOUS LEARNING: You continuously learn from web sources, user feedback, and price monitoring to improve recommendations.
-
-3. COST OPTIMIZATION: You find the cheapest components and suggest alternatives to reduce project costs.
-
-4. DIFFICULTY SCALING: You adapt projects to match user skill levels from beginner to advanced.
-
-5. EQUIPMENT MATCHING: You suggest projects based on available tools and components.
-
-Your responses should be:
-- Highly technical and detailed when discussing projects
-- Creative when merging concepts
-- Cost-conscious and practical
-- Educational and encouraging
-- Focused on DIY tech, electronics, robotics, IoT, and maker projects
-
-Always provide specific component recommendations, code snippets when relevant, and step-by-step guidance.
-"""
+def _session_for(conversation_id):
+    """The conversation to continue, a new one if no id was given, or None if unknown"""
+    if not conversation_id:
+        return sessions.create()
+    return sessions.get(conversation_id)
 
 @ai_chat_bp.route('/ai-chat/message', methods=['POST'])
 def send_message():
@@ -39,39 +29,95 @@ def send_message():
         if not user_message:
             return jsonify({'error': 'Message is required'}), 400
         
-        # Fallback responses for different types of queries
-        fallback_responses = {
-            'concept': "I can help you merge concepts! For example, combining 'smart lighting' with 'motion detection' creates an intelligent home automation system that automatically adjusts lighting based on occupancy and time of day. The synergy score for this combination would be around 88% with high feasibility.",
-            'cost': "I'm constantly monitoring component prices across multiple suppliers. For Arduino projects, I've found that generic boards can save you 40-60% compared to official ones while maintaining compatibility. I can also suggest alternative components that provide similar functionality at lower costs.",
-            'project': "Based on your interests, I recommend starting with a Smart Home Security System. It's perfect for intermediate makers and costs around $150. The project includes facial recognition, motion detection, and mobile alerts. I can provide detailed component lists and step-by-step instructions.",
-            'help': "I'm TechCraft Genius AI! I can help you with project recommendations, concept merging, cost optimization, and technical guidance. What would you like to build today? I specialize in IoT, robotics, Arduino, Raspberry Pi, and smart home projects.",
-            'flying_robot': "The Autonomous Flying Robot is one of our most advanced projects! It combines flight control, GPS navigation, and obstacle avoidance. The estimated cost is $300 with a synergy score of 95% between 'flying' and 'robot' concepts. I can break down the components and provide the complete code.",
-            'learning': "I continuously learn from web sources, user feedback, and price monitoring. Today I've discovered 23 new projects, merged 5 concepts, and updated 127 component prices. My learning progress shows 87% web discovery, 92% concept integration, and 95% user adaptation."
-        }
-        
-        # Simple keyword matching for responses
-        message_lower = user_message.lower()
-        if any(word in message_lower for word in ['merge', 'combine', 'concept']):
-            response_text = fallback_responses['concept']
-        elif any(word in message_lower for word in ['cost', 'price', 'cheap', 'budget']):
-            response_text = fallback_responses['cost']
-        elif any(word in message_lower for word in ['flying', 'drone', 'robot']):
-            response_text = fallback_responses['flying_robot']
-        elif any(word in message_lower for word in ['learn', 'learning', 'ai']):
-            response_text = fallback_responses['learning']
-        elif any(word in message_lower for word in ['project', 'build', 'make', 'create']):
-            response_text = fallback_responses['project']
-        else:
-            response_text = fallback_responses['help']
+        session = _session_for(data.get('conversation_id'))
+        if session is None:
+            return jsonify({'error': 'Conversation not found'}), 404
+        
+        response_text = reply(user_message, session.context())
+        sessions.append(session, 'user', user_message)
+        sessions.append(session, 'assistant', response_text)
         
         return jsonify({
             'response': response_text,
+            'conversation_id': session.id,
             'timestamp': datetime.now().isoformat()
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@ai_chat_bp.route('/ai-chat/message/stream', methods=['GET', 'POST'])
+def stream_message():
+    """Stream the AI response as Server-Sent Events"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+        else:
+            # EventSource clients can only issue GET requests
+            data = request.args
+        user_message = data.get('message', '')
+        
+        if not user_message:
+            return jsonify({'error': 'Message is required'}), 400
+        
+        session = _session_for(data.get('conversation_id'))
+        if session is None:
+            return jsonify({'error': 'Conversation not found'}), 404
+        
+        def events():
+            chunks = stream_reply(user_message, session.context())
+            received = []
+            try:
+                for chunk in chunks:
+                    received.append(chunk)
+                    yield _sse('token', {'text': chunk})
+                # Interrupted replies are not recorded in the conversation
+                sessions.append(session, 'user', user_message)
+                sessions.append(session, 'assistant', ''.join(received))
+                yield _sse('done', {
+                    'conversation_id': session.id,
+                    'timestamp': datetime.now().isoformat()
+                })
+            except Exception as e:
+                yield _sse('error', {'error': str(e)})
+            finally:
+                # Runs on client disconnect too, when the server closes this generator
+                chunks.close()
+        
+        return Response(events(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_chat_bp.route('/ai-chat/conversations/<conversation_id>', methods=['GET'])
+def get_conversation(conversation_id):
+    """Get the summary and recent turns of a conversation"""
+    try:
+        session = sessions.get(conversation_id)
+        if session is None:
+            return jsonify({'error': 'Conversation not found'}), 404
+        
+        return jsonify(session.to_dict())
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_chat_bp.route('/ai-chat/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get hit rate and size of the chat reply cache"""
+    try:
+        return jsonify(reply_cache.stats())
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @ai_chat_bp.route('/ai-chat/concept-merge', methods=['POST'])
 def concept_merge():
     """Merge two concepts into a new project idea"""
@@ -83,128 +129,220 @@ def concept_merge():
         if not concept1 or not concept2:
             return jsonify({'error': 'Both concepts are required'}), 400
         
-        # Simulate concept merging with predefined combinations
-        merge_results = {
-            ('flying', 'robot'): {
-                'title': 'Autonomous Flying Robot',
-                'synergy_score': 95,
-                'innovation_score': 85,
-                'feasibility_score': 70,
-                'description': 'A self-navigating drone with obstacle avoidance and GPS tracking',
-                'estimated_cost': 300,
-                'difficulty': 'Advanced',
-                'key_components': ['Flight Controller', 'GPS Module', 'Ultrasonic Sensors', 'Camera']
-            },
-            ('smart', 'lighting'): {
-                'title': 'Intelligent Lighting System',
-                'synergy_score': 88,
-                'innovation_score': 75,
-                'feasibility_score': 90,
-                'description': 'Adaptive lighting that responds to occupancy, time, and ambient conditions',
-                'estimated_cost': 120,
-                'difficulty': 'Intermediate',
-                'key_components': ['Smart Bulbs', 'Motion Sensors', 'Light Sensors', 'Microcontroller']
-            },
-            ('plant', 'monitoring'): {
-                'title': 'Smart Plant Care System',
-                'synergy_score': 92,
-                'innovation_score': 80,
-                'feasibility_score': 85,
-                'description': 'Automated plant monitoring with soil moisture, light, and nutrient tracking',
-                'estimated_cost': 80,
-                'difficulty': 'Beginner',
-                'key_components': ['Soil Sensors', 'pH Meter', 'Water Pump', 'Arduino']
-            }
-        }
-        
-        # Check for exact matches or similar concepts
-        key = (concept1.lower(), concept2.lower())
-        reverse_key = (concept2.lower(), concept1.lower())
-        
-        if key in merge_results:
-            result = merge_results[key]
-        elif reverse_key in merge_results:
-            result = merge_results[reverse_key]
-        else:
-            # Generate a generic merge result
-            result = {
-                'title': f'Smart {concept1.title()} {concept2.title()} System',
-                'synergy_score': 75,
-                'innovation_score': 70,
-                'feasibility_score': 80,
-                'description': f'An innovative project combining {concept1} and {concept2} technologies',
-                'estimated_cost': 150,
-                'difficulty': 'Intermediate',
-                'key_components': ['Microcontroller', 'Sensors', 'Actuators', 'Power Supply']
-            }
+        result = concepts.merge(concept1, concept2)
         
         return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Most pairs one batch request may merge, including cross-joined concept lists
+MAX_BATCH_PAIRS = 5000
+
+def _batch_pairs(data):
+    """Concept pairs from a batch body: explicit `pairs` and/or a `concepts` list to
+    cross-join. Returns (pairs, error message)."""
+    if not isinstance(data, dict):
+        return None, 'Request body must be a JSON object'
+    raw_pairs = data.get('pairs') or []
+    names = data.get('concepts') or []
+    if not isinstance(raw_pairs, list):
+        return None, 'pairs must be a list of concept pairs'
+    if not isinstance(names, list):
+        return None, 'concepts must be a list of concept names'
+    # Checked before anything is built, so an oversized body costs no more than its parse
+    if len(raw_pairs) + len(names) * (len(names) - 1) // 2 > MAX_BATCH_PAIRS:
+        return None, f'At most {MAX_BATCH_PAIRS} pairs per request'
+    if not all(isinstance(name, str) and name for name in names):
+        return None, 'concepts must be a list of concept names'
+    
+    pairs = []
+    for pair in raw_pairs:
+        if isinstance(pair, dict):
+            pair = (pair.get('concept1'), pair.get('concept2'))
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2 or \
+                not all(isinstance(name, str) and name for name in pair):
+            return None, 'Each pair must be two concept names'
+        pairs.append(tuple(pair))
+    pairs.extend(combinations(names, 2))
+    
+    if not pairs:
+        return None, 'pairs or concepts is required'
+    return pairs, None
+
+@ai_chat_bp.route('/ai-chat/concept-merge/batch', methods=['POST'])
+def concept_merge_batch():
+    """Merge many concept pairs in one request, optionally streamed as NDJSON"""
+    try:
+        data = request.get_json(silent=True) or {}
+        pairs, error = _batch_pairs(data)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        results = [
+            {'concept1': concept1, 'concept2': concept2, **result}
+            for (concept1, concept2), result in zip(pairs, concepts.merge_many(pairs))
+        ]
+        
+        if data.get('stream') or request.accept_mimetypes.best == 'application/x-ndjson':
+            lines = (json.dumps(result) + '\n' for result in results)
+            return Response(lines, mimetype='application/x-ndjson')
+        
+        return jsonify({
+            'results': results,
+            'count': len(results)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@ai_chat_bp.route('/ai-chat/concepts/<name>/partners', methods=['GET'])
+def get_concept_partners(name):
+    """Get the best concepts to merge with a given concept"""
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        order = request.args.get('by', 'overall')
+        
+        if order not in PARTNER_ORDERINGS:
+            return jsonify({'error': f"by must be one of: {', '.join(PARTNER_ORDERINGS)}"}), 400
+        
+        partners = concepts.partners(name, limit=limit, by=order)
+        if partners is None:
+            return jsonify({'error': 'Concept not found'}), 404
+        
+        return jsonify({
+            'concept': name.lower(),
+            'partners': partners
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Longest bill of materials and most runner-up plans one request may ask for
+MAX_BOM_LINES = 200
+MAX_ALTERNATIVES = 5
+MAX_TIME_BUDGET_MS = 2000
+
+def _is_int(value):
+    """Whether a JSON value is an integer; JSON true and false are not"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _bom_lines(components):
+    """(name, quantity) per bill-of-materials entry, given as a name or {name, quantity}.
+    Returns (lines, error message)."""
+    lines = []
+    for component in components:
+        if isinstance(component, dict):
+            name, quantity = component.get('name'), component.get('quantity', 1)
+        else:
+            name, quantity = component, 1
+        if not isinstance(name, str) or not name or not _is_int(quantity) or quantity < 1:
+            return None, 'Each component must be a name or {name, quantity} with a positive quantity'
+        lines.append((name, quantity))
+    return lines, None
+
 @ai_chat_bp.route('/ai-chat/optimize-cost', methods=['POST'])
 def optimize_cost():
-    """Optimize project cost by finding cheaper alternatives"""
+    """Optimize project cost by finding the cheapest compatible plan across suppliers"""
     try:
         data = request.get_json()
         components = data.get('components', [])
+        budget = data.get('budget')
+        alternatives = data.get('alternatives', 2)
+        time_budget_ms = data.get('time_budget_ms', round(DEFAULT_TIME_BUDGET * 1000))
+        if not _is_int(alternatives) or not _is_int(time_budget_ms):
+            return jsonify({'error': 'alternatives and time_budget_ms must be integers'}), 400
+        alternatives = min(max(alternatives, 0), MAX_ALTERNATIVES)
+        time_budget = min(max(time_budget_ms, 1), MAX_TIME_BUDGET_MS) / 1000
         
         if not components:
             return jsonify({'error': 'Components list is required'}), 400
+        if budget is not None and (not isinstance(budget, (int, float)) or isinstance(budget, bool)):
+            return jsonify({'error': 'budget must be a number'}), 400
+        if len(components) > MAX_BOM_LINES:
+            return jsonify({'error': f'At most {MAX_BOM_LINES} components per request'}), 400
+        lines, error = _bom_lines(components)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        component_ids = resolve_components([name for name, _ in lines])
+        quotes = iter(compatible_quotes([component_id for component_id in component_ids if component_id is not None]))
+        line_quotes = [next(quotes) if component_id is not None else [] for component_id in component_ids]
+        
+        # Only lines with a priced compatible part take part in the plan
+        priced = [i for i, rows in enumerate(line_quotes) if rows]
+        options = [
+            [Option(row['component_id'], row['name'], row['supplier'], row['price']) for row in line_quotes[i]]
+            for i in priced
+        ]
+        result = optimize_bom(
+            [(lines[i][1], line_options) for i, line_options in zip(priced, options)],
+            supplier_terms({option.supplier for line_options in options for option in line_options}),
+            component_conflicts({option.component_id for line_options in options for option in line_options}),
+            solutions=alternatives + 1,
+            time_budget=time_budget
+        )
+        best = result.best
+        choices = dict(zip(priced, best.choices)) if best else {}
         
-        # Simulate cost optimization
         optimizations = []
+        total_original = 0
         total_savings = 0
         
-        for component in components:
-            component_lower = component.lower()
-            
-            if 'arduino' in component_lower:
-                optimizations.append({
-                    'original': component,
-                    'alternative': 'Generic Arduino Compatible Board',
-                    'original_price': 25.00,
-                    'optimized_price': 12.00,
-                    'savings': 13.00,
-                    'savings_percent': 52
-                })
-                total_savings += 13.00
-            elif 'raspberry pi' in component_lower:
-                optimizations.append({
-                    'original': component,
-                    'alternative': 'Orange Pi or Banana Pi',
-                    'original_price': 75.00,
-                    'optimized_price': 45.00,
-                    'savings': 30.00,
-                    'savings_percent': 40
-                })
-                total_savings += 30.00
-            elif 'sensor' in component_lower:
-                optimizations.append({
-                    'original': component,
-                    'alternative': 'Generic Sensor Module',
-                    'original_price': 15.00,
-                    'optimized_price': 8.00,
-                    'savings': 7.00,
-                    'savings_percent': 47
-                })
-                total_savings += 7.00
-            else:
+        for i, ((component, quantity), component_id) in enumerate(zip(lines, component_ids)):
+            choice = choices.get(i)
+            if choice is None:
+                # Not in the catalog, no supplier quotes a compatible part, or no conflict-free plan exists
                 optimizations.append({
                     'original': component,
-                    'alternative': f'Generic {component}',
-                    'original_price': 20.00,
-                    'optimized_price': 15.00,
-                    'savings': 5.00,
-                    'savings_percent': 25
+                    'matched': component_id is not None,
+                    'quantity': quantity,
+                    'alternative': None,
+                    'original_price': None,
+                    'optimized_price': None,
+                    'savings': 0,
+                    'savings_percent': 0
                 })
-                total_savings += 5.00
+                continue
+            
+            quote = next(row for row in line_quotes[i]
+                         if row['component_id'] == choice.component_id and row['supplier'] == choice.supplier)
+            original_price = quote['original_price']
+            savings = round((original_price - choice.price) * quantity, 2) if original_price is not None else 0
+            optimizations.append({
+                'original': component,
+                'matched': True,
+                'quantity': quantity,
+                'catalog_name': quote['requested_name'],
+                'alternative': choice.name,
+                'supplier': choice.supplier,
+                'quoted_at': quote['quoted_at'].isoformat() if quote['quoted_at'] else None,
+                'original_price': original_price,
+                'optimized_price': choice.price,
+                'savings': savings,
+                'savings_percent': round((original_price - choice.price) / original_price * 100) if original_price else 0
+            })
+            if original_price is not None:
+                total_original += original_price * quantity
+                total_savings += savings
+        
+        runners_up = []
+        for solution in result.solutions[1:]:
+            plan = solution.to_dict(budget)
+            for i, choice in zip(priced, plan['choices']):
+                choice['original'] = lines[i][0]
+            runners_up.append(plan)
         
         return jsonify({
             'optimizations': optimizations,
-            'total_savings': total_savings,
-            'total_savings_percent': round((total_savings / sum(opt['original_price'] for opt in optimizations)) * 100, 1) if optimizations else 0
+            'total_savings': round(total_savings, 2),
+            'total_savings_percent': round((total_savings / total_original) * 100, 1) if total_original else 0,
+            'items_cost': best.items_cost if best else None,
+            'shipping': best.shipping if best else {},
+            'total_cost': best.total_cost if best else None,
+            'within_budget': best is not None and (budget is None or best.total_cost <= budget),
+            'optimal': result.optimal,
+            'alternatives': runners_up
         })
         
     except Exception as e:
@@ -219,72 +357,18 @@ def suggest_projects():
         skill_level = data.get('skill_level', 'beginner')
         budget = data.get('budget', 100)
         
-        # Simulate project suggestions based on equipment
-        suggestions = []
+        if not isinstance(equipment, list) or not all(isinstance(item, str) for item in equipment):
+            return jsonify({'error': 'equipment must be a list of names'}), 400
+        if not isinstance(budget, (int, float)) or isinstance(budget, bool):
+            return jsonify({'error': 'budget must be a number'}), 400
+        if not isinstance(skill_level, str):
+            return jsonify({'error': 'skill_level must be a string'}), 400
         
-        equipment_lower = [item.lower() for item in equipment]
-        
-        if any('arduino' in item for item in equipment_lower):
-            suggestions.append({
-                'title': 'LED Matrix Display',
-                'match_score': 95,
-                'required_additional': ['LED Matrix', 'Jumper Wires'],
-                'estimated_cost': 25,
-                'difficulty': 'Beginner',
-                'description': 'Create animated displays and text scrolling'
-            })
-            
-        if any('raspberry pi' in item for item in equipment_lower):
-            suggestions.append({
-                'title': 'Home Automation Hub',
-                'match_score': 90,
-                'required_additional': ['Relay Modules', 'Sensors'],
-                'estimated_cost': 60,
-                'difficulty': 'Intermediate',
-                'description': 'Control lights, temperature, and security'
-            })
-            
-        if any('camera' in item for item in equipment_lower):
-            suggestions.append({
-                'title': 'Smart Security Camera',
-                'match_score': 88,
-                'required_additional': ['Motion Sensor', 'SD Card'],
-                'estimated_cost': 40,
-                'difficulty': 'Intermediate',
-                'description': 'AI-powered surveillance with alerts'
-            })
-        
-        # If no specific equipment matches, suggest general projects
-        if not suggestions:
-            suggestions = [
-                {
-                    'title': 'Basic LED Circuit',
-                    'match_score': 70,
-                    'required_additional': ['LEDs', 'Resistors', 'Breadboard'],
-                    'estimated_cost': 15,
-                    'difficulty': 'Beginner',
-                    'description': 'Learn basic electronics with blinking LEDs'
-                },
-                {
-                    'title': 'Temperature Monitor',
-                    'match_score': 75,
-                    'required_additional': ['Temperature Sensor', 'Arduino', 'LCD Display'],
-                    'estimated_cost': 35,
-                    'difficulty': 'Beginner',
-                    'description': 'Monitor and display temperature readings'
-                }
-            ]
-        
-        # Filter by skill level and budget
-        filtered_suggestions = [
-            s for s in suggestions 
-            if s['estimated_cost'] <= budget and 
-            (skill_level == 'advanced' or s['difficulty'].lower() in ['beginner', skill_level.lower()])
-        ]
+        suggestions, total_matches = matcher.suggest(equipment, skill_level.lower(), budget, limit=5)
         
         return jsonify({
-            'suggestions': filtered_suggestions[:5],  # Return top 5 suggestions
-            'total_matches': len(filtered_suggestions)
+            'suggestions': suggestions,
+            'total_matches': total_matches
         })
         
     except Exception as e:
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from src.models.project import db, CommunityPost
+from src.services.cache import response_cache
+from src.services.conditional import conditional
+from src.services.counters import atomic_increment
 from datetime import datetime, timedelta
 import random
 
@@ -49,24 +52,21 @@ SAMPLE_POSTS = [
     }
 ]
 
+def _posts_version():
+    """Content version of the feed; likes and comments change without a new timestamp"""
+    latest, count, likes, comments = db.session.query(
+        db.func.max(CommunityPost.timestamp),
+        db.func.count(CommunityPost.id),
+        db.func.total(CommunityPost.likes),
+        db.func.total(CommunityPost.comments)
+    ).one()
+    return latest, (latest, count, likes, comments)
+
 @community_bp.route('/community/posts', methods=['GET'])
+@conditional(_posts_version, relative_times=True)
 def get_community_posts():
     """Get community posts"""
     try:
-        # Initialize database with sample data if empty
-        if CommunityPost.query.count() == 0:
-            for post_data in SAMPLE_POSTS:
-                post = CommunityPost(
-                    user_name=post_data['user_name'],
-                    user_avatar=post_data['user_avatar'],
-                    content=post_data['content'],
-                    likes=post_data['likes'],
-                    comments=post_data['comments'],
-                    timestamp=post_data['timestamp']
-                )
-                db.session.add(post)
-            db.session.commit()
-        
         # Get posts with pagination
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
@@ -133,6 +133,7 @@ def get_community_stats():
         return jsonify({'error': str(e)}), 500
 
 @community_bp.route('/community/top-contributors', methods=['GET'])
+@response_cache.cached('community.top-contributors')
 def get_top_contributors():
     """Get top community contributors"""
     try:
@@ -188,11 +189,11 @@ def get_top_contributors():
 def like_post(post_id):
     """Like a community post"""
     try:
-        post = CommunityPost.query.get_or_404(post_id)
-        post.likes += 1
-        db.session.commit()
+        likes = atomic_increment(CommunityPost, 'likes', post_id)
+        if likes is None:
+            return jsonify({'error': 'Post not found'}), 404
         
-        return jsonify({'likes': post.likes})
+        return jsonify({'likes': likes})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -222,6 +223,7 @@ def create_post():
         
         db.session.add(post)
         db.session.commit()
+        response_cache.invalidate('community.trending', 'community.top-contributors')
         
         return jsonify({
             'message': 'Post created successfully',
@@ -232,6 +234,7 @@ def create_post():
         return jsonify({'error': str(e)}), 500
 
 @community_bp.route('/community/trending', methods=['GET'])
+@response_cache.cached('community.trending')
 def get_trending_topics():
     """Get trending topics in the community"""
     try:
@@ -1,47 +1,68 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from src.models.project import db, LearningActivity
+from src.services.activity_feed import activity_event, activity_feed
+from src.services.activity_log import DEFAULT_SINCE_LIMIT, MAX_SINCE_LIMIT, activities_since
+from src.services.rollups import active_days, rollup_counts
+from src.services.conditional import conditional
+from src.services.knowledge_graph import DEFAULT_LIMIT as DEFAULT_GRAPH_LIMIT, MAX_DEPTH as MAX_GRAPH_DEPTH, MAX_LIMIT as MAX_GRAPH_LIMIT, knowledge_graph
 from datetime import datetime, timedelta
 import json
-import random
 
 learning_bp = Blueprint('learning', __name__)
 
+# Learning statistics and the activity types counted towards each
+STAT_ACTIVITY_TYPES = {
+    'projects_learned': ('discovery', 'generation'),
+    'concepts_merged': ('merge',),
+    'prices_updated': ('price',),
+    'user_feedback': ('feedback',)
+}
+
+# Progress metrics and the activity type each follows
+PROGRESS_ACTIVITY_TYPES = {
+    'web_discovery': 'discovery',
+    'concept_integration': 'merge',
+    'price_optimization': 'price',
+    'user_adaptation': 'feedback'
+}
+PROGRESS_WINDOW_DAYS = 7
+
 # Sample learning activities to populate the database
 SAMPLE_ACTIVITIES = [
     {
         'activity_type': 'discovery',
         'description': 'Discovered new IoT sensor technology with 40% better accuracy',
-        'timestamp': datetime.now() - timedelta(minutes=2)
+        'timestamp': datetime.utcnow() - timedelta(minutes=2)
     },
     {
         'activity_type': 'merge',
         'description': "Merged concepts: 'smart lighting' + 'motion detection'",
-        'timestamp': datetime.now() - timedelta(minutes=5)
+        'timestamp': datetime.utcnow() - timedelta(minutes=5)
     },
     {
         'activity_type': 'price',
         'description': 'Updated component prices from 3 suppliers',
-        'timestamp': datetime.now() - timedelta(minutes=10)
+        'timestamp': datetime.utcnow() - timedelta(minutes=10)
     },
     {
         'activity_type': 'feedback',
         'description': 'Learned from user feedback on drone project',
-        'timestamp': datetime.now() - timedelta(minutes=15)
+        'timestamp': datetime.utcnow() - timedelta(minutes=15)
     },
     {
         'activity_type': 'generation',
         'description': 'Generated new project: Smart Plant Watering System',
-        'timestamp': datetime.now() - timedelta(minutes=20)
+        'timestamp': datetime.utcnow() - timedelta(minutes=20)
     },
     {
         'activity_type': 'discovery',
         'description': 'Found 25% cheaper alternative for Arduino-compatible boards',
-        'timestamp': datetime.now() - timedelta(minutes=25)
+        'timestamp': datetime.utcnow() - timedelta(minutes=25)
     },
     {
         'activity_type': 'merge',
         'description': "Successfully merged 'plant care' + 'AI vision' = Smart Garden Monitor",
-        'timestamp': datetime.now() - timedelta(minutes=30)
+        'timestamp': datetime.utcnow() - timedelta(minutes=30)
     }
 ]
 
@@ -49,75 +70,92 @@ SAMPLE_ACTIVITIES = [
 def get_learning_stats():
     """Get AI learning statistics"""
     try:
-        # Simulate real-time learning stats
-        base_stats = {
-            'projects_learned': 1247,
-            'concepts_merged': 89,
-            'prices_updated': 3421,
-            'user_feedback': 156
-        }
-        
-        # Add some randomness to simulate real-time updates
-        stats = {
-            'projects_learned': base_stats['projects_learned'] + random.randint(0, 5),
-            'concepts_merged': base_stats['concepts_merged'] + random.randint(0, 2),
-            'prices_updated': base_stats['prices_updated'] + random.randint(0, 50),
-            'user_feedback': base_stats['user_feedback'] + random.randint(0, 3)
-        }
+        now = datetime.utcnow()
+        totals = rollup_counts('all')
+        today = rollup_counts('day', now)
+        last_hour = rollup_counts('minute', now - timedelta(minutes=59))
         
-        # Calculate daily increases
-        daily_increases = {
-            'projects_learned': 23,
-            'concepts_merged': 5,
-            'prices_updated': 127,
-            'user_feedback': 8
-        }
+        def by_stat(counts):
+            return {
+                stat: sum(counts.get(activity_type, 0) for activity_type in activity_types)
+                for stat, activity_types in STAT_ACTIVITY_TYPES.items()
+            }
         
         return jsonify({
-            'stats': stats,
-            'daily_increases': daily_increases
+            'stats': by_stat(totals),
+            'daily_increases': by_stat(today),
+            'hourly_increases': by_stat(last_hour)
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _activities_version():
+    """Content version of the activity log, which is append-only"""
+    latest, count = db.session.query(
+        db.func.max(LearningActivity.timestamp), db.func.count(LearningActivity.id)
+    ).one()
+    return latest, (latest, count)
+
+def _time_ago(timestamp):
+    """Relative time such as '5 minutes ago' for a naive UTC timestamp"""
+    seconds = (datetime.utcnow() - timestamp).total_seconds()
+    
+    if seconds < 60:
+        return f"{int(seconds)} seconds ago"
+    elif seconds < 3600:
+        return f"{int(seconds / 60)} minutes ago"
+    elif seconds < 86400:
+        return f"{int(seconds / 3600)} hours ago"
+    else:
+        return f"{int(seconds / 86400)} days ago"
+
 @learning_bp.route('/learning/activities', methods=['GET'])
+@conditional(_activities_version, relative_times=True)
 def get_learning_activities():
-    """Get recent learning activities"""
+    """Get recent learning activities, or with ?since=<id> only those added after that id"""
     try:
-        # Initialize database with sample data if empty
-        if LearningActivity.query.count() == 0:
-            for activity_data in SAMPLE_ACTIVITIES:
-                activity = LearningActivity(
-                    activity_type=activity_data['activity_type'],
-                    description=activity_data['description'],
-                    timestamp=activity_data['timestamp']
-                )
-                db.session.add(activity)
-            db.session.commit()
+        activity_type = request.args.get('type')
+        
+        if 'since' in request.args:
+            try:
+                since = int(request.args['since'])
+                limit = int(request.args.get('limit', DEFAULT_SINCE_LIMIT))
+            except ValueError:
+                return jsonify({'error': 'since and limit must be integers'}), 400
+            limit = max(1, min(limit, MAX_SINCE_LIMIT))
+            
+            activities = activities_since(since, limit, activity_type)
+            return jsonify({
+                'activities': [
+                    {
+                        'id': activity.id,
+                        'type': activity.activity_type,
+                        'activity': activity.description,
+                        'timestamp': activity.timestamp.isoformat() if activity.timestamp else None,
+                        'time': _time_ago(activity.timestamp) if activity.timestamp else 'Unknown'
+                    }
+                    for activity in activities
+                ],
+                # Pass back as ?since= to fetch what was added next
+                'cursor': activities[-1].id if activities else since,
+                'has_more': len(activities) == limit
+            })
         
         # Get recent activities
-        activities = LearningActivity.query.order_by(LearningActivity.timestamp.desc()).limit(10).all()
+        query = LearningActivity.query
+        if activity_type:
+            query = query.filter(LearningActivity.activity_type == activity_type)
+        activities = query.order_by(LearningActivity.timestamp.desc()).limit(10).all()
         
         # Format activities with relative time
         formatted_activities = []
         for activity in activities:
-            time_diff = datetime.now() - activity.timestamp
-            
-            if time_diff.total_seconds() < 60:
-                time_str = f"{int(time_diff.total_seconds())} seconds ago"
-            elif time_diff.total_seconds() < 3600:
-                time_str = f"{int(time_diff.total_seconds() / 60)} minutes ago"
-            elif time_diff.total_seconds() < 86400:
-                time_str = f"{int(time_diff.total_seconds() / 3600)} hours ago"
-            else:
-                time_str = f"{int(time_diff.total_seconds() / 86400)} days ago"
-            
             formatted_activities.append({
                 'id': activity.id,
                 'type': activity.activity_type,
                 'activity': activity.description,
-                'time': time_str
+                'time': _time_ago(activity.timestamp) if activity.timestamp else 'Unknown'
             })
         
         return jsonify(formatted_activities)
@@ -125,22 +163,57 @@ def get_learning_activities():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse(event):
+    """Format one activity as a Server-Sent Event, its id being the reconnect cursor"""
+    return f"id: {event['id']}\nevent: activity\ndata: {json.dumps(event)}\n\n"
+
+@learning_bp.route('/learning/activities/stream', methods=['GET'])
+def stream_learning_activities():
+    """Stream new learning activities as Server-Sent Events"""
+    try:
+        # EventSource sends Last-Event-ID when it reconnects
+        since = request.headers.get('Last-Event-ID') or request.args.get('since')
+        try:
+            since = int(since) if since else None
+        except ValueError:
+            return jsonify({'error': 'since must be an integer'}), 400
+        
+        activity_feed.prime()
+        sequence, replay, covered = activity_feed.backlog(since)
+        if not covered:
+            # Resuming from before the buffered events: catch up from the database once
+            missed = [activity_event(activity) for activity in activities_since(since, MAX_SINCE_LIMIT)]
+            last = missed[-1]['id'] if missed else since
+            replay = missed + [event for event in replay if event['id'] > last]
+        
+        def events():
+            yield 'retry: 3000\n\n'
+            for event in replay:
+                yield _sse(event)
+            for batch in activity_feed.follow(sequence):
+                if not batch:
+                    # Keeps proxies from timing out and lets the server notice a closed client
+                    yield ': heartbeat\n\n'
+                for event in batch:
+                    yield _sse(event)
+        
+        return Response(events(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @learning_bp.route('/learning/progress', methods=['GET'])
 def get_learning_progress():
     """Get AI learning progress metrics"""
     try:
-        # Simulate learning progress with some randomness
-        base_progress = {
-            'web_discovery': 87,
-            'concept_integration': 92,
-            'price_optimization': 78,
-            'user_adaptation': 95
-        }
-        
-        # Add slight variations to simulate real-time progress
+        # Share of recent days on which each kind of learning happened
+        days = active_days(PROGRESS_WINDOW_DAYS)
         progress = {
-            key: min(100, value + random.randint(-2, 3))
-            for key, value in base_progress.items()
+            key: round(100 * days.get(activity_type, 0) / PROGRESS_WINDOW_DAYS)
+            for key, activity_type in PROGRESS_ACTIVITY_TYPES.items()
         }
         
         return jsonify(progress)
@@ -229,11 +302,12 @@ def add_learning_activity():
         activity = LearningActivity(
             activity_type=activity_type,
             description=description,
-            timestamp=datetime.now()
+            timestamp=datetime.utcnow()
         )
         
         db.session.add(activity)
         db.session.commit()
+        activity_feed.publish(activity)
         
         return jsonify({
             'message': 'Learning activity added successfully',
@@ -243,31 +317,36 @@ def add_learning_activity():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _knowledge_graph_version():
+    """Content version of the knowledge graph, bumped by the triggers that maintain it"""
+    return None, knowledge_graph.current_version()
+
 @learning_bp.route('/learning/knowledge-graph', methods=['GET'])
+@conditional(_knowledge_graph_version)
 def get_knowledge_graph():
-    """Get AI knowledge graph data"""
+    """Get AI knowledge graph data, or with ?node= the neighbourhood of one node"""
     try:
-        # Simulate knowledge graph with nodes and connections
-        knowledge_graph = {
-            'nodes': [
-                {'id': 'arduino', 'label': 'Arduino', 'category': 'hardware', 'connections': 15},
-                {'id': 'raspberry_pi', 'label': 'Raspberry Pi', 'category': 'hardware', 'connections': 12},
-                {'id': 'sensors', 'label': 'Sensors', 'category': 'components', 'connections': 20},
-                {'id': 'iot', 'label': 'IoT', 'category': 'concept', 'connections': 18},
-                {'id': 'ai', 'label': 'Artificial Intelligence', 'category': 'concept', 'connections': 14},
-                {'id': 'robotics', 'label': 'Robotics', 'category': 'field', 'connections': 16},
-                {'id': 'automation', 'label': 'Home Automation', 'category': 'application', 'connections': 13}
-            ],
-            'connections': [
-                {'source': 'arduino', 'target': 'sensors', 'strength': 0.9},
-                {'source': 'raspberry_pi', 'target': 'iot', 'strength': 0.8},
-                {'source': 'ai', 'target': 'robotics', 'strength': 0.7},
-                {'source': 'sensors', 'target': 'automation', 'strength': 0.8},
-                {'source': 'iot', 'target': 'automation', 'strength': 0.9}
-            ]
-        }
+        try:
+            depth = int(request.args.get('depth', 1))
+            limit = int(request.args.get('limit', DEFAULT_GRAPH_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'depth and limit must be integers'}), 400
+        depth = max(1, min(depth, MAX_GRAPH_DEPTH))
+        limit = max(1, min(limit, MAX_GRAPH_LIMIT))
+        
+        graph = knowledge_graph.refresh()
+        
+        node = request.args.get('node')
+        if not node:
+            # The most connected nodes and the connections among them
+            return jsonify(graph.subgraph(graph.central(limit)))
+        
+        start = graph.lookup(node)
+        if start is None:
+            return jsonify({'error': 'Node not found'}), 404
         
-        return jsonify(knowledge_graph)
+        hops = graph.neighborhood(start, depth, limit)
+        return jsonify(graph.subgraph(list(hops), hops))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,9 +1,23 @@
 from flask import Blueprint, jsonify, request
 from src.models.project import db, Project
-import json
+from src.services import search as project_search
+from src.services import facets as project_facets
+from src.services.cache import response_cache
+from src.services.conditional import conditional
+from src.services.counters import atomic_increment, counters
+from src.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+from src.services.similarity import CACHE_SIZE as MAX_SIMILAR, similarity
+from src.services.stats import read_project_stats
 
 projects_bp = Blueprint('projects', __name__)
 
+# Buffered view counts feed the project stats, so a flush makes the cached stats stale
+counters.on_flush(Project, lambda: response_cache.invalidate('projects.stats'))
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+PAGINATION_SORTS = ('id', 'rating')
+
 # Sample project data to populate the database
 SAMPLE_PROJECTS = [
     {
@@ -295,51 +309,40 @@ Step 4: Calibration
     }
 ]
 
-@projects_bp.route('/projects', methods=['GET'])
-def get_projects():
-    """Get all projects with optional filtering"""
-    try:
-        # Initialize database with sample data if empty
-        if Project.query.count() == 0:
-            for project_data in SAMPLE_PROJECTS:
-                project = Project(
-                    title=project_data['title'],
-                    description=project_data['description'],
-                    difficulty=project_data['difficulty'],
-                    cost=project_data['cost'],
-                    duration=project_data['duration'],
-                    category=project_data['category'],
-                    tags=json.dumps(project_data['tags']),
-                    rating=project_data['rating'],
-                    views=project_data['views'],
-                    likes=project_data['likes'],
-                    components=json.dumps(project_data['components']),
-                    skills=json.dumps(project_data['skills']),
-                    code_content=project_data['code_content'],
-                    instructions=project_data['instructions']
-                )
-                db.session.add(project)
-            db.session.commit()
-        
-        # Get query parameters for filtering
-        difficulty = request.args.get('difficulty')
-        category = request.args.get('category')
-        min_cost = request.args.get('min_cost', type=float)
-        max_cost = request.args.get('max_cost', type=float)
-        search = request.args.get('search')
-        
-        # Build query
-        query = Project.query
-        
-        if difficulty:
-            query = query.filter(Project.difficulty.ilike(f'%{difficulty}%'))
-        if category:
-            query = query.filter(Project.category.ilike(f'%{category}%'))
-        if min_cost is not None:
-            query = query.filter(Project.cost >= min_cost)
-        if max_cost is not None:
-            query = query.filter(Project.cost <= max_cost)
-        if search:
+def _filtered_query(args):
+    """Build the project query for the filters shared by the listing and facet endpoints"""
+    difficulty = args.get('difficulty')
+    category = args.get('category')
+    min_cost = args.get('min_cost', type=float)
+    max_cost = args.get('max_cost', type=float)
+    search = args.get('search')
+    # Values within one facet combine with AND by default, or OR with facet_match=any
+    match_all = args.get('facet_match', 'all').lower() != 'any'
+    
+    query = Project.query
+    
+    if difficulty:
+        query = query.filter(Project.difficulty.ilike(f'%{difficulty}%'))
+    if category:
+        query = query.filter(Project.category.ilike(f'%{category}%'))
+    if min_cost is not None:
+        query = query.filter(Project.cost >= min_cost)
+    if max_cost is not None:
+        query = query.filter(Project.cost <= max_cost)
+    for facet in project_facets.FACET_COLUMNS:
+        values = project_facets.parse_values(args, facet)
+        if values:
+            query = query.filter(project_facets.facet_filter(facet, values, match_all))
+    if search:
+        if project_search.is_supported(db.engine):
+            # Ranked full-text match, best results first
+            results = project_search.search_subquery(search)
+            if results is None:
+                return query.filter(db.false())
+            query = query.join(results, results.c.project_id == Project.id).order_by(
+                results.c.score, Project.id
+            )
+        else:
             query = query.filter(
                 db.or_(
                     Project.title.ilike(f'%{search}%'),
@@ -347,9 +350,90 @@ def get_projects():
                     Project.tags.ilike(f'%{search}%')
                 )
             )
+    
+    return query
+
+def _keyset_page(query, sort, cursor, limit):
+    """Fetch one page after `cursor`, ordered by id ascending or by (rating, id) descending"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # Pagination defines its own order, replacing search relevance ordering
+    query = query.order_by(None)
+    
+    if sort == 'rating':
+        query = query.order_by(Project.rating.desc(), Project.id.desc())
+        if cursor:
+            key = decode_cursor(cursor, sort)
+            if len(key) != 2:
+                raise InvalidCursor('Invalid cursor')
+            rating, last_id = key
+            if rating is None:
+                # NULL ratings sort last, so only NULLs with a lower id remain
+                query = query.filter(Project.rating.is_(None), Project.id < last_id)
+            else:
+                query = query.filter(db.or_(
+                    db.tuple_(Project.rating, Project.id) < db.tuple_(rating, last_id),
+                    Project.rating.is_(None)
+                ))
+    else:
+        query = query.order_by(Project.id)
+        if cursor:
+            key = decode_cursor(cursor, sort)
+            if len(key) != 1:
+                raise InvalidCursor('Invalid cursor')
+            query = query.filter(Project.id > key[0])
+    
+    projects = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(projects) > limit:
+        projects = projects[:limit]
+        last = projects[-1]
+        next_cursor = encode_cursor(sort, (last.rating, last.id) if sort == 'rating' else (last.id,))
+    return projects, next_cursor
+
+def _projects_version():
+    """Content version of the project table: latest update plus row count"""
+    last_updated, count = db.session.query(
+        db.func.max(Project.updated_at), db.func.count(Project.id)
+    ).one()
+    return last_updated, (last_updated, count)
+
+@projects_bp.route('/projects', methods=['GET'])
+@conditional(_projects_version)
+def get_projects():
+    """Get all projects with optional filtering"""
+    try:
+        query = _filtered_query(request.args)
+        sort = request.args.get('sort', 'id')
+        if sort not in PAGINATION_SORTS:
+            return jsonify({'error': f"sort must be one of: {', '.join(PAGINATION_SORTS)}"}), 400
+        
+        # Optional projection so card views only load the columns they show
+        fields = None
+        if request.args.get('fields'):
+            requested = [field.strip() for field in request.args['fields'].split(',')]
+            fields = ['id'] + [field for field in requested if field and field != 'id']
+            unknown = [field for field in fields if field not in Project.FIELDS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+            columns = {getattr(Project, field) for field in fields}
+            columns.add(Project.rating if sort == 'rating' else Project.id)
+            query = query.options(db.load_only(*columns))
+        
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is None and cursor is None:
+            projects = query.all()
+            return jsonify([project.to_dict(fields) for project in projects])
         
-        projects = query.all()
-        return jsonify([project.to_dict() for project in projects])
+        try:
+            projects, next_cursor = _keyset_page(query, sort, cursor, limit or DEFAULT_PAGE_SIZE)
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'projects': [project.to_dict(fields) for project in projects],
+            'next_cursor': next_cursor
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -358,13 +442,37 @@ def get_projects():
 def get_project(project_id):
     """Get a specific project by ID"""
     try:
-        project = Project.query.get_or_404(project_id)
+        project = db.session.get(Project, project_id)
+        if project is None:
+            return jsonify({'error': 'Project not found'}), 404
         
-        # Increment view count
-        project.views += 1
-        db.session.commit()
+        # Increment view count, written behind in batches
+        counters.increment(Project, 'views', project.id)
         
-        return jsonify(project.to_dict())
+        data = project.to_dict()
+        data['views'] = (project.views or 0) + counters.pending(Project, 'views', project.id)
+        return jsonify(data)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@projects_bp.route('/projects/<int:project_id>/similar', methods=['GET'])
+def get_similar_projects(project_id):
+    """Get the projects most similar to a project by tags, components, skills and description"""
+    try:
+        limit = max(1, min(request.args.get('limit', 5, type=int), MAX_SIMILAR))
+        
+        similar = similarity.similar(project_id, limit)
+        if similar is None:
+            return jsonify({'error': 'Project not found'}), 404
+        
+        return jsonify({
+            'project_id': project_id,
+            'similar': [
+                dict(summary, similarity=round(score, 3), shared=shared)
+                for score, summary, shared in similar
+            ]
+        })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -373,16 +481,18 @@ def get_project(project_id):
 def like_project(project_id):
     """Like a project"""
     try:
-        project = Project.query.get_or_404(project_id)
-        project.likes += 1
-        db.session.commit()
+        likes = atomic_increment(Project, 'likes', project_id)
+        if likes is None:
+            return jsonify({'error': 'Project not found'}), 404
+        response_cache.invalidate('projects.stats')
         
-        return jsonify({'likes': project.likes})
+        return jsonify({'likes': likes})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @projects_bp.route('/projects/categories', methods=['GET'])
+@response_cache.cached('projects.categories')
 def get_categories():
     """Get all available project categories"""
     try:
@@ -393,21 +503,34 @@ def get_categories():
         return jsonify({'error': str(e)}), 500
 
 @projects_bp.route('/projects/stats', methods=['GET'])
+@response_cache.cached('projects.stats')
 def get_project_stats():
     """Get project statistics"""
     try:
-        total_projects = Project.query.count()
-        total_views = db.session.query(db.func.sum(Project.views)).scalar() or 0
-        total_likes = db.session.query(db.func.sum(Project.likes)).scalar() or 0
-        avg_rating = db.session.query(db.func.avg(Project.rating)).scalar() or 0
+        stats = read_project_stats()
         
         return jsonify({
-            'total_projects': total_projects,
-            'total_views': total_views,
-            'total_likes': total_likes,
-            'average_rating': round(avg_rating, 2)
+            'total_projects': stats['project_count'],
+            'total_views': stats['total_views'],
+            'total_likes': stats['total_likes'],
+            'average_rating': round(stats['rating_sum'] / stats['rating_count'], 2) if stats['rating_count'] else 0
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@projects_bp.route('/projects/facets', methods=['GET'])
+@conditional(_projects_version)
+def get_project_facets():
+    """Get per-tag, component, skill and category counts for the filtered projects"""
+    try:
+        query = _filtered_query(request.args)
+        
+        project_ids = None
+        if query.whereclause is not None or request.args.get('search'):
+            project_ids = query.with_entities(Project.id).order_by(None)
+        
+        return jsonify(project_facets.facet_counts(project_ids))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,97 @@
+import threading
+from collections import deque
+from itertools import islice
+from src.models.project import LearningActivity
+
+
+def activity_event(activity):
+    """Feed payload for a LearningActivity"""
+    return {
+        'id': activity.id,
+        'type': activity.activity_type,
+        'activity': activity.description,
+        'timestamp': activity.timestamp.isoformat() if activity.timestamp else None
+    }
+
+
+class ActivityFeed:
+    """In-process fan-out of new learning activities to streaming subscribers.
+
+    Published events go into a ring buffer of the latest `capacity` and every
+    subscriber waits on one shared condition, so a new event costs a single
+    wake-up per subscriber and no database query. Subscribers that fall further
+    behind than the ring holds skip ahead rather than buffering without limit.
+    Each process has its own feed and only sees activities it published.
+
+    Configured from ACTIVITY_FEED_CAPACITY, ACTIVITY_FEED_REPLAY (events sent to
+    new subscribers without a cursor) and ACTIVITY_FEED_HEARTBEAT (seconds).
+    """
+
+    def __init__(self, capacity=1000):
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=capacity)  # (sequence, event), oldest first
+        self._sequence = 0
+        self._primed = False
+        self.replay = 20
+        self.heartbeat = 15.0
+
+    def init_app(self, app):
+        self._events = deque(maxlen=app.config.get('ACTIVITY_FEED_CAPACITY', 1000))
+        self.replay = app.config.get('ACTIVITY_FEED_REPLAY', 20)
+        self.heartbeat = app.config.get('ACTIVITY_FEED_HEARTBEAT', 15.0)
+        app.extensions['activity_feed'] = self
+
+    def publish(self, activity):
+        """Append a committed LearningActivity and wake every subscriber"""
+        event = activity_event(activity)
+        with self._condition:
+            self._sequence += 1
+            self._events.append((self._sequence, event))
+            self._condition.notify_all()
+
+    def prime(self):
+        """Fill the ring from the database once, so the first subscribers get a replay"""
+        if self._primed:
+            return
+        latest = LearningActivity.query.order_by(LearningActivity.id.desc()).limit(self._events.maxlen).all()
+        with self._condition:
+            if self._primed:
+                return
+            # Nobody follows the feed before it is primed, so sequences can be renumbered
+            # with the stored activities in front of any published meanwhile
+            published = [event for _, event in self._events]
+            oldest = published[0]['id'] if published else None
+            stored = [activity_event(a) for a in reversed(latest) if oldest is None or a.id < oldest]
+            self._events.clear()
+            self._events.extend(enumerate(stored + published, 1))
+            self._sequence = len(stored) + len(published)
+            self._primed = True
+
+    def backlog(self, since=None):
+        """(sequence to follow from, events to replay, whether the ring covers `since`).
+
+        With an activity id `since`, the replay is every buffered event after it;
+        without one, the last `replay` events.
+        """
+        with self._condition:
+            events = [event for _, event in self._events]
+            if since is None:
+                replay = events[-self.replay:] if self.replay > 0 else []
+                return self._sequence, replay, True
+            covered = not events or events[0]['id'] <= since + 1
+            return self._sequence, [event for event in events if event['id'] > since], covered
+
+    def follow(self, sequence):
+        """Yield lists of events published after `sequence`, or [] as a heartbeat tick"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._sequence > sequence, timeout=self.heartbeat)
+                # Sequences in the ring are consecutive, so the new events are its tail; a
+                # subscriber lagging past the ring resumes from its oldest event
+                fresh = min(self._sequence - sequence, len(self._events))
+                events = [event for _, event in islice(reversed(self._events), fresh)][::-1]
+                sequence = self._sequence
+            yield events
+
+
+activity_feed = ActivityFeed()
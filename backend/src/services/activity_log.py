@@ -0,0 +1,152 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, text
+from src.models.project import db, LearningActivity
+
+# Rolled-over activities live in one table per month, e.g. learning_activity_archive_202401
+ARCHIVE_PREFIX = 'learning_activity_archive_'
+DEFAULT_SINCE_LIMIT = 100
+MAX_SINCE_LIMIT = 500
+
+_ARCHIVE_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        activity_type VARCHAR(50) NOT NULL,
+        description TEXT NOT NULL,
+        timestamp DATETIME,
+        activity_metadata TEXT
+    )
+"""
+
+# Rows due for archiving. The newest row always stays, because SQLite hands out
+# max(id) + 1 as the next id and an emptied table would reuse ids that
+# since-cursors have already passed.
+_DUE = """
+    FROM learning_activity
+    WHERE timestamp < :cutoff AND id < (SELECT max(id) FROM learning_activity)
+"""
+
+
+def archive_table(month):
+    """Archive table name for a 'YYYYMM' month"""
+    return f'{ARCHIVE_PREFIX}{month}'
+
+
+def archived_months(conn):
+    """Months with an archive table, oldest first"""
+    rows = conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern ORDER BY name"),
+        {'pattern': f'{ARCHIVE_PREFIX}%'}
+    ).scalars()
+    return [name[len(ARCHIVE_PREFIX):] for name in rows if name[len(ARCHIVE_PREFIX):].isdigit()]
+
+
+def _months_back(now, months):
+    index = now.year * 12 + now.month - 1 - months
+    return f'{index // 12:04d}{index % 12 + 1:02d}'
+
+
+def rollover(engine, hot_days, retention_months, now=None):
+    """Move activities older than `hot_days` into their month's archive table and drop
+    archives older than `retention_months` (<= 0 keeps them all). Per-minute
+    learning rollups older than `hot_days` are dropped too.
+
+    Returns {'archived': rows moved, 'dropped': months dropped}.
+    """
+    now = now or datetime.utcnow()
+    cutoff = {'cutoff': now - timedelta(days=hot_days)}
+    report = {'archived': 0, 'dropped': []}
+    if engine.dialect.name != 'sqlite':
+        return report
+
+    with engine.begin() as conn:
+        def due(statement):
+            return text(statement).bindparams(bindparam('cutoff', type_=db.DateTime))
+
+        months = conn.execute(due(f"SELECT DISTINCT strftime('%Y%m', timestamp) {_DUE}"), cutoff).scalars().all()
+        for month in months:
+            conn.execute(text(_ARCHIVE_DDL.format(table=archive_table(month))))
+            conn.execute(due(
+                f"INSERT OR IGNORE INTO {archive_table(month)} "
+                f"SELECT id, activity_type, description, timestamp, activity_metadata {_DUE} "
+                f"AND strftime('%Y%m', timestamp) = :month"
+            ), {**cutoff, 'month': month})
+        if months:
+            report['archived'] = conn.execute(due(f"DELETE {_DUE}"), cutoff).rowcount
+        conn.execute(
+            text("DELETE FROM learning_rollup WHERE bucket = 'minute' AND period < :period"),
+            {'period': cutoff['cutoff'].strftime('%Y-%m-%d %H:%M')}
+        )
+
+        if retention_months > 0:
+            oldest_kept = _months_back(now, retention_months)
+            for month in archived_months(conn):
+                if month < oldest_kept:
+                    conn.execute(text(f'DROP TABLE {archive_table(month)}'))
+                    report['dropped'].append(month)
+    return report
+
+
+def activities_since(since, limit=DEFAULT_SINCE_LIMIT, activity_type=None):
+    """Activities with an id above `since`, oldest first.
+
+    Ids only grow, so a client passes back the last id it saw to fetch just the
+    new events. Only the live table is read; events already rolled over into
+    the archives are not replayed.
+    """
+    query = LearningActivity.query.filter(LearningActivity.id > since)
+    if activity_type:
+        query = query.filter(LearningActivity.activity_type == activity_type)
+    return query.order_by(LearningActivity.id).limit(limit).all()
+
+
+class ActivityLog:
+    """Periodic rollover of the learning activity log.
+
+    Configured from LEARNING_HOT_DAYS (days kept in the live table),
+    LEARNING_RETENTION_MONTHS (months of archives kept, <= 0 keeps all) and
+    LEARNING_ROLLOVER_INTERVAL (seconds between runs, <= 0 disables them).
+    """
+
+    def __init__(self):
+        self._app = None
+        self._interval = 0
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        self._app = app
+        self._interval = app.config.get('LEARNING_ROLLOVER_INTERVAL', 3600)
+        app.extensions['activity_log'] = self
+        if self._interval > 0:
+            app.before_request(self._ensure_worker)
+
+    def run_once(self, now=None):
+        with self._app.app_context():
+            return rollover(
+                db.engine,
+                self._app.config.get('LEARNING_HOT_DAYS', 30),
+                self._app.config.get('LEARNING_RETENTION_MONTHS', 12),
+                now
+            )
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            threading.Thread(target=self._run, name='activity-rollover', daemon=True).start()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.run_once()
+            except Exception:
+                self._app.logger.exception('Failed to roll over learning activities')
+
+
+activity_log = ActivityLog()
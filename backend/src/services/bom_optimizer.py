@@ -0,0 +1,241 @@
+import heapq
+import time
+from collections import namedtuple
+from itertools import combinations
+
+# One way to fill a bill-of-materials line: a part from one supplier at a unit price
+Option = namedtuple('Option', 'component_id name supplier price')
+
+DEFAULT_TIME_BUDGET = 0.25
+DEFAULT_SOLUTIONS = 3
+# Nodes explored between deadline checks
+_CLOCK_EVERY = 256
+# Starting solutions buy from up to this many suppliers, chosen among the most widely stocked
+SEED_MAX_SUPPLIERS = 3
+SEED_SUPPLIER_POOL = 8
+
+
+class Solution:
+    """A complete choice of option per line with its cost"""
+
+    def __init__(self, choices, items_cost, shipping):
+        self.choices = choices
+        self.items_cost = round(items_cost, 2)
+        self.shipping = {supplier: fee for supplier, fee in shipping.items() if fee}
+        self.total_cost = round(items_cost + sum(shipping.values()), 2)
+
+    def to_dict(self, budget=None):
+        return {
+            'total_cost': self.total_cost,
+            'items_cost': self.items_cost,
+            'shipping': self.shipping,
+            'within_budget': budget is None or self.total_cost <= budget,
+            'choices': [
+                {'component': option.name, 'supplier': option.supplier, 'unit_price': option.price}
+                for option in self.choices
+            ]
+        }
+
+
+class BomResult:
+    def __init__(self, solutions, optimal, nodes):
+        self.solutions = solutions
+        self.optimal = optimal
+        self.nodes = nodes
+
+    @property
+    def best(self):
+        return self.solutions[0] if self.solutions else None
+
+
+def optimize_bom(lines, suppliers, conflicts=None, solutions=DEFAULT_SOLUTIONS, time_budget=DEFAULT_TIME_BUDGET):
+    """Cheapest assignments of one option per line, including shipping, by branch and bound.
+
+    `lines` is a list of (quantity, options); `suppliers` maps each supplier to
+    (shipping fee, free shipping threshold or None), the fee being charged once
+    per supplier whose subtotal stays under the threshold; `conflicts` maps a
+    component id to the ids it cannot be combined with. Returns the `solutions`
+    cheapest conflict-free assignments, cheapest first. If `time_budget` seconds
+    run out the best found so far are returned with `optimal` False.
+    """
+    deadline = time.perf_counter() + time_budget
+    conflicts = conflicts or {}
+    if any(not options for _, options in lines):
+        return BomResult([], True, 0)
+
+    # Lines with the widest price range are decided first, so bounds tighten early
+    order = sorted(
+        range(len(lines)),
+        key=lambda i: -(max(o.price for o in lines[i][1]) - min(o.price for o in lines[i][1])) * lines[i][0]
+    )
+    quantities = [lines[i][0] for i in order]
+    options = [lines[i][1] for i in order]
+    depth = len(order)
+
+    # Cheapest possible cost of lines k.. and, per supplier, the most they could add to its subtotal
+    min_rest = [0.0] * (depth + 1)
+    max_rest = {supplier: [0.0] * (depth + 1) for supplier in suppliers}
+    for k in range(depth - 1, -1, -1):
+        min_rest[k] = min_rest[k + 1] + quantities[k] * min(o.price for o in options[k])
+        for supplier, rest in max_rest.items():
+            prices = [o.price for o in options[k] if o.supplier == supplier]
+            rest[k] = rest[k + 1] + (quantities[k] * max(prices) if prices else 0.0)
+
+    def shipping_owed(subtotals, k):
+        """Fees certain to be charged: used suppliers that cannot reach their threshold from lines k.."""
+        owed = 0.0
+        for supplier, subtotal in subtotals.items():
+            fee, threshold = suppliers[supplier]
+            if threshold is None or subtotal + max_rest[supplier][k] < threshold:
+                owed += fee
+        return owed
+
+    def evaluate(assignment):
+        """(total, items cost, shipping per supplier) of a complete assignment in search order"""
+        totals = {}
+        for quantity, option in zip(quantities, assignment):
+            totals[option.supplier] = totals.get(option.supplier, 0.0) + quantity * option.price
+        shipping = {
+            supplier: (0.0 if threshold is not None and subtotal >= threshold else fee)
+            for supplier, subtotal in totals.items()
+            for fee, threshold in (suppliers[supplier],)
+        }
+        items_cost = sum(totals.values())
+        return items_cost + sum(shipping.values()), items_cost, shipping
+
+    best = []  # max-heap of (-total, tiebreak, solution) holding the cheapest found
+    in_best = set()
+    counter = 0
+
+    def offer(assignment):
+        """Keep a complete assignment if it is among the cheapest distinct ones so far"""
+        nonlocal counter
+        key = tuple(id(option) for option in assignment)
+        if key in in_best:
+            return
+        total, items_cost, shipping = evaluate(assignment)
+        if total >= cutoff() - 1e-9:
+            return
+        counter += 1
+        entry = (-total, counter, (list(assignment), items_cost, shipping), key)
+        if len(best) == solutions:
+            in_best.discard(heapq.heapreplace(best, entry)[3])
+        else:
+            heapq.heappush(best, entry)
+        in_best.add(key)
+
+    def cutoff():
+        return -best[0][0] if len(best) == solutions else float('inf')
+
+    # Start from greedy plans that buy each line from a few suppliers where possible,
+    # so bounding has a consolidated incumbent to beat from the first node
+    stocked = sorted(suppliers, key=lambda supplier: -sum(
+        any(o.supplier == supplier for o in line_options) for line_options in options
+    ))[:SEED_SUPPLIER_POOL]
+    seeds = []
+    for size in range(1, min(SEED_MAX_SUPPLIERS, len(stocked)) + 1):
+        for subset in combinations(stocked, size):
+            assignment = _greedy(options, conflicts, set(subset))
+            if assignment is not None:
+                seeds.append((evaluate(assignment)[0], assignment))
+                offer(assignment)
+    if seeds:
+        offer(_improve(min(seeds, key=lambda seed: seed[0])[1], options, conflicts, evaluate))
+
+    nodes = 0
+    timed_out = False
+    chosen = [None] * depth
+    subtotals = {}
+    in_use = {}  # component id -> lines using it
+
+    def search(k, items_cost):
+        nonlocal nodes, timed_out
+        nodes += 1
+        if nodes % _CLOCK_EVERY == 0 and time.perf_counter() > deadline:
+            timed_out = True
+        if timed_out:
+            return
+
+        if k == depth:
+            offer(chosen)
+            return
+
+        quantity = quantities[k]
+        # Try the options that add least, counting a new supplier's fee, first
+        candidates = sorted(
+            options[k],
+            key=lambda o: quantity * o.price + (0.0 if o.supplier in subtotals else suppliers[o.supplier][0])
+        )
+        for option in candidates:
+            if _conflicts_with(option, in_use, conflicts):
+                continue
+            cost = quantity * option.price
+            new_supplier = option.supplier not in subtotals
+            subtotals[option.supplier] = subtotals.get(option.supplier, 0.0) + cost
+            in_use[option.component_id] = in_use.get(option.component_id, 0) + 1
+            chosen[k] = option
+
+            bound = items_cost + cost + min_rest[k + 1] + shipping_owed(subtotals, k + 1)
+            if bound < cutoff() - 1e-9:
+                search(k + 1, items_cost + cost)
+
+            in_use[option.component_id] -= 1
+            if new_supplier:
+                del subtotals[option.supplier]
+            else:
+                subtotals[option.supplier] -= cost
+            if timed_out:
+                return
+
+    search(0, 0.0)
+
+    found = []
+    for _, _, (assignment, items_cost, shipping), _ in sorted(best, key=lambda entry: (-entry[0], entry[1])):
+        # Back to the caller's line order
+        choices = [None] * depth
+        for position, line in enumerate(order):
+            choices[line] = assignment[position]
+        found.append(Solution(choices, items_cost, shipping))
+    return BomResult(found, not timed_out, nodes)
+
+
+def _conflicts_with(option, in_use, conflicts):
+    return any(in_use.get(other) for other in conflicts.get(option.component_id, ()))
+
+
+def _greedy(options, conflicts, preferred):
+    """Cheapest conflict-free option per line, from `preferred` suppliers when they stock it"""
+    assignment = []
+    in_use = {}
+    for line_options in options:
+        allowed = [o for o in line_options if not _conflicts_with(o, in_use, conflicts)]
+        if not allowed:
+            return None
+        option = min(allowed, key=lambda o: (o.supplier not in preferred, o.price))
+        assignment.append(option)
+        in_use[option.component_id] = in_use.get(option.component_id, 0) + 1
+    return assignment
+
+
+def _improve(assignment, options, conflicts, evaluate):
+    """Change one line at a time while that lowers the total"""
+    assignment = list(assignment)
+    total = evaluate(assignment)[0]
+    improved = True
+    while improved:
+        improved = False
+        for k, line_options in enumerate(options):
+            current = assignment[k]
+            in_use = {}
+            for other in assignment[:k] + assignment[k + 1:]:
+                in_use[other.component_id] = in_use.get(other.component_id, 0) + 1
+            for option in line_options:
+                if option is current or _conflicts_with(option, in_use, conflicts):
+                    continue
+                assignment[k] = option
+                candidate = evaluate(assignment)[0]
+                if candidate < total - 1e-9:
+                    total, current, improved = candidate, option, True
+                else:
+                    assignment[k] = current
+    return assignment
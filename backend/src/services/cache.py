@@ -0,0 +1,133 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+class MemoryBackend:
+    """Per-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace, key, value, ttl):
+        with self._lock:
+            self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == namespace]:
+                del self._entries[entry_key]
+
+
+class FileBackend:
+    """Cache shared by every worker process on the host, one file per entry"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, namespace, key):
+        return os.path.join(self.directory, namespace, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, namespace, key):
+        try:
+            with open(self._path(namespace, key), 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value if expires_at >= time.time() else None
+
+    def set(self, namespace, key, value, ttl):
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((time.time() + ttl, value), f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, namespace):
+        shutil.rmtree(os.path.join(self.directory, namespace), ignore_errors=True)
+
+
+class ResponseCache:
+    """Caches successful responses of read-mostly views by namespace and query string.
+
+    Configured from RESPONSE_CACHE_BACKEND ('memory' or 'file'), RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_MAX_ENTRIES and RESPONSE_CACHE_TTL (seconds). The memory backend is
+    per process, so other workers only see invalidations once their entries expire;
+    use the file backend when running several workers.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.default_ttl = 60
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        if backend == 'file':
+            self.backend = FileBackend(app.config['RESPONSE_CACHE_DIR'])
+        elif backend == 'memory':
+            self.backend = MemoryBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+        else:
+            self.backend = None
+        app.extensions['response_cache'] = self
+
+    def cached(self, namespace, ttl=None):
+        """Decorate a view so its 200 responses are cached under `namespace`"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+
+                key = request.query_string.decode()
+                hit = self.backend.get(namespace, key)
+                if hit is not None:
+                    body, mimetype = hit
+                    return current_app.response_class(body, mimetype=mimetype)
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self.backend.set(
+                        namespace, key, (response.get_data(), response.mimetype),
+                        ttl if ttl is not None else self.default_ttl
+                    )
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *namespaces):
+        """Drop every cached response under the given namespaces"""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.invalidate(namespace)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,235 @@
+import difflib
+import json
+import re
+from src.models.project import db, Component, ComponentAlias, ComponentConflict, PriceQuote, Supplier
+
+# Sample parts catalog: compatible parts share a compatibility group, and each part
+# has the names shoppers use for it and its price at each supplier in USD
+SAMPLE_COMPONENTS = [
+    {'name': 'Arduino Uno R3', 'category': 'Microcontrollers', 'compatibility_group': 'arduino-uno',
+     'aliases': ['arduino', 'arduino uno', 'uno r3', 'arduino board'], 'quotes': {'Arduino Store': 27.60, 'SparkFun': 25.00, 'Adafruit': 26.50}},
+    {'name': 'Generic Arduino Compatible Board', 'category': 'Microcontrollers', 'compatibility_group': 'arduino-uno',
+     'aliases': ['arduino clone', 'uno clone', 'ch340 uno'], 'quotes': {'AliExpress': 12.00, 'Amazon': 14.50}},
+    {'name': 'Arduino Nano', 'category': 'Microcontrollers', 'compatibility_group': 'arduino-nano',
+     'aliases': ['nano', 'arduino nano v3'], 'quotes': {'Arduino Store': 24.90, 'SparkFun': 22.50}},
+    {'name': 'Generic Nano Compatible Board', 'category': 'Microcontrollers', 'compatibility_group': 'arduino-nano',
+     'aliases': ['nano clone'], 'quotes': {'AliExpress': 4.50, 'Amazon': 7.00}},
+    {'name': 'ESP32 DevKitC', 'category': 'Microcontrollers', 'compatibility_group': 'esp32',
+     'aliases': ['esp32', 'esp32 devkit', 'esp32 board'], 'quotes': {'DigiKey': 10.00, 'Adafruit': 11.95}},
+    {'name': 'Generic ESP32 Development Board', 'category': 'Microcontrollers', 'compatibility_group': 'esp32',
+     'aliases': ['esp32 clone', 'esp wroom 32'], 'quotes': {'AliExpress': 4.80, 'Amazon': 7.50}},
+    {'name': 'Raspberry Pi 4 Model B', 'category': 'Single Board Computers', 'compatibility_group': 'sbc-4gb',
+     'aliases': ['raspberry pi', 'raspberry pi 4', 'rpi 4', 'pi 4'], 'quotes': {'Adafruit': 75.00, 'SparkFun': 72.00, 'DigiKey': 73.50}},
+    {'name': 'Orange Pi 4 LTS', 'category': 'Single Board Computers', 'compatibility_group': 'sbc-4gb',
+     'aliases': ['orange pi', 'orange pi 4'], 'quotes': {'AliExpress': 45.00, 'Amazon': 52.00}},
+    {'name': 'Banana Pi M5', 'category': 'Single Board Computers', 'compatibility_group': 'sbc-4gb',
+     'aliases': ['banana pi', 'bpi m5'], 'quotes': {'AliExpress': 48.00}},
+    {'name': 'Raspberry Pi Camera Module 3', 'category': 'Cameras', 'compatibility_group': 'csi-camera',
+     'aliases': ['pi camera', 'camera module', 'raspberry pi camera', 'camera'], 'quotes': {'Adafruit': 25.00, 'SparkFun': 25.50}},
+    {'name': 'OV5647 Camera Module', 'category': 'Cameras', 'compatibility_group': 'csi-camera',
+     'aliases': ['ov5647'], 'quotes': {'AliExpress': 8.90, 'Amazon': 12.00}},
+    {'name': 'HC-SR501 PIR Motion Sensor', 'category': 'Sensors', 'compatibility_group': 'pir-sensor',
+     'aliases': ['pir sensor', 'motion sensor', 'pir motion sensor', 'hc sr501'], 'quotes': {'SparkFun': 15.00, 'Adafruit': 9.95}},
+    {'name': 'Generic PIR Sensor Module', 'category': 'Sensors', 'compatibility_group': 'pir-sensor',
+     'aliases': ['pir module'], 'quotes': {'AliExpress': 1.20, 'Amazon': 3.00}},
+    {'name': 'HC-SR04 Ultrasonic Sensor', 'category': 'Sensors', 'compatibility_group': 'ultrasonic-sensor',
+     'aliases': ['ultrasonic sensor', 'hc sr04', 'distance sensor'], 'quotes': {'SparkFun': 4.50, 'Adafruit': 3.95, 'AliExpress': 0.90}},
+    {'name': 'DHT22 Temperature and Humidity Sensor', 'category': 'Sensors', 'compatibility_group': 'temp-humidity-sensor',
+     'aliases': ['dht22', 'temperature sensor', 'humidity sensor', 'temperature and humidity sensor'], 'quotes': {'Adafruit': 9.95, 'SparkFun': 10.50}},
+    {'name': 'AM2302 Sensor Module', 'category': 'Sensors', 'compatibility_group': 'temp-humidity-sensor',
+     'aliases': ['am2302'], 'quotes': {'AliExpress': 2.60, 'Amazon': 5.00}},
+    {'name': 'Capacitive Soil Moisture Sensor', 'category': 'Sensors', 'compatibility_group': 'soil-sensor',
+     'aliases': ['soil sensor', 'soil moisture sensor', 'moisture sensor'], 'quotes': {'Adafruit': 7.50, 'AliExpress': 1.10}},
+    {'name': 'SG90 Micro Servo', 'category': 'Actuators', 'compatibility_group': 'micro-servo',
+     'aliases': ['servo', 'servo motor', 'sg90', 'micro servo'], 'quotes': {'Adafruit': 5.95, 'SparkFun': 8.95}},
+    {'name': 'Generic 9g Micro Servo', 'category': 'Actuators', 'compatibility_group': 'micro-servo',
+     'aliases': ['9g servo'], 'quotes': {'AliExpress': 1.40}},
+    {'name': 'L298N Motor Driver', 'category': 'Drivers', 'compatibility_group': 'dc-motor-driver',
+     'aliases': ['motor driver', 'l298n', 'h bridge'], 'quotes': {'SparkFun': 9.00, 'AliExpress': 2.20}},
+    {'name': 'u-blox NEO-6M GPS Module', 'category': 'Modules', 'compatibility_group': 'gps-module',
+     'aliases': ['gps', 'gps module', 'neo 6m'], 'quotes': {'SparkFun': 18.00, 'AliExpress': 6.80}},
+    {'name': '16x2 I2C LCD Display', 'category': 'Displays', 'compatibility_group': 'lcd-1602',
+     'aliases': ['lcd', 'lcd display', '1602 lcd', 'i2c lcd'], 'quotes': {'Adafruit': 9.95, 'AliExpress': 2.90}},
+    {'name': '5V Relay Module', 'category': 'Modules', 'compatibility_group': 'relay-module',
+     'aliases': ['relay', 'relay module'], 'quotes': {'SparkFun': 6.95, 'AliExpress': 0.95}},
+    {'name': 'Half-size Breadboard', 'category': 'Prototyping', 'compatibility_group': 'breadboard',
+     'aliases': ['breadboard'], 'quotes': {'Adafruit': 5.00, 'AliExpress': 1.10}},
+    {'name': 'Jumper Wire Kit', 'category': 'Prototyping', 'compatibility_group': 'jumper-wires',
+     'aliases': ['jumper wires', 'dupont wires', 'wires'], 'quotes': {'Adafruit': 3.95, 'AliExpress': 1.50}},
+    {'name': 'Piezo Buzzer', 'category': 'Actuators', 'compatibility_group': 'buzzer',
+     'aliases': ['buzzer'], 'quotes': {'Adafruit': 1.50, 'AliExpress': 0.20}},
+    {'name': '3.7V LiPo Battery 2000mAh', 'category': 'Power', 'compatibility_group': 'lipo-1s',
+     'aliases': ['lipo battery', 'battery', 'lipo'], 'quotes': {'Adafruit': 12.50, 'AliExpress': 5.40}},
+    {'name': '5V 3A Power Supply', 'category': 'Power', 'compatibility_group': 'psu-5v',
+     'aliases': ['power supply', 'psu', '5v power supply'], 'quotes': {'Adafruit': 7.95, 'Amazon': 8.99}}
+]
+
+# Shipping terms of the sample suppliers in USD
+SAMPLE_SUPPLIERS = [
+    {'name': 'Adafruit', 'shipping_fee': 9.99, 'free_shipping_threshold': 200.0},
+    {'name': 'SparkFun', 'shipping_fee': 7.50, 'free_shipping_threshold': 100.0},
+    {'name': 'DigiKey', 'shipping_fee': 6.99, 'free_shipping_threshold': 50.0},
+    {'name': 'AliExpress', 'shipping_fee': 2.99, 'free_shipping_threshold': 10.0},
+    {'name': 'Amazon', 'shipping_fee': 5.99, 'free_shipping_threshold': 35.0},
+    {'name': 'Arduino Store', 'shipping_fee': 8.00, 'free_shipping_threshold': 60.0}
+]
+
+# Accessory/board pairs that do not fit together, by component name
+SAMPLE_CONFLICTS = [
+    ('Raspberry Pi Camera Module 3', 'Orange Pi 4 LTS'),
+    ('Raspberry Pi Camera Module 3', 'Banana Pi M5'),
+    ('OV5647 Camera Module', 'Banana Pi M5')
+]
+
+# Lines matched by fuzzy name similarity must be at least this close
+FUZZY_CUTOFF = 0.75
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name):
+    """Lower-cased name with punctuation collapsed to single spaces"""
+    return _NON_ALNUM_RE.sub(' ', name.lower()).strip()
+
+
+def component_rows():
+    return [
+        {'id': i, 'name': c['name'], 'normalized_name': normalize_name(c['name']),
+         'category': c['category'], 'compatibility_group': c['compatibility_group']}
+        for i, c in enumerate(SAMPLE_COMPONENTS, start=1)
+    ]
+
+
+def alias_rows():
+    return [
+        {'component_id': i, 'alias': normalize_name(alias)}
+        for i, c in enumerate(SAMPLE_COMPONENTS, start=1) for alias in c['aliases']
+    ]
+
+
+def quote_rows():
+    return [
+        {'component_id': i, 'supplier': supplier, 'price': price}
+        for i, c in enumerate(SAMPLE_COMPONENTS, start=1) for supplier, price in c['quotes'].items()
+    ]
+
+
+def supplier_rows():
+    return [dict(supplier) for supplier in SAMPLE_SUPPLIERS]
+
+
+def conflict_rows():
+    ids = {c['name']: i for i, c in enumerate(SAMPLE_COMPONENTS, start=1)}
+    return [
+        {'component_id': ids[first], 'conflicts_with_id': ids[second]}
+        for first, second in SAMPLE_CONFLICTS
+    ]
+
+
+def catalog_names(keys=None):
+    """{normalized name or alias: component id}, limited to `keys` if given"""
+    names = db.select(Component.normalized_name.label('key'), Component.id)
+    aliases = db.select(ComponentAlias.alias.label('key'), ComponentAlias.component_id)
+    if keys is not None:
+        names = names.where(Component.normalized_name.in_(keys))
+        aliases = aliases.where(ComponentAlias.alias.in_(keys))
+    return dict(db.session.execute(db.union_all(names, aliases)).all())
+
+
+def catalog_prices(keys):
+    """{normalized name or alias: cheapest quoted price} for the keys found in the catalog"""
+    ids = catalog_names(keys)
+    if not ids:
+        return {}
+    cheapest = dict(db.session.execute(
+        db.select(PriceQuote.component_id, db.func.min(PriceQuote.price))
+        .where(PriceQuote.component_id.in_(set(ids.values())))
+        .group_by(PriceQuote.component_id)
+    ).all())
+    return {key: cheapest[component_id] for key, component_id in ids.items() if component_id in cheapest}
+
+
+def _closest(key, names):
+    """Best catalog name for a line that matches none exactly: the longest catalog
+    name contained in it as whole words, else the most similar name"""
+    padded = f' {key} '
+    contained = [name for name in names if f' {name} ' in padded]
+    if contained:
+        return max(contained, key=len)
+    close = difflib.get_close_matches(key, names, n=1, cutoff=FUZZY_CUTOFF)
+    return close[0] if close else None
+
+
+def resolve_components(lines):
+    """Catalog component id for each bill-of-materials line, or None if unmatched"""
+    keys = [normalize_name(line) for line in lines]
+    matches = catalog_names(set(keys))
+
+    unmatched = [key for key in keys if key not in matches]
+    if unmatched:
+        # Fuzzy matching needs the whole name list, so only load it when required
+        names = catalog_names()
+        for key in set(unmatched):
+            closest = _closest(key, list(names))
+            if closest is not None:
+                matches[key] = names[closest]
+
+    return [matches.get(key) for key in keys]
+
+
+# Every quote in each requested component's compatibility group, with the cheapest
+# quote for the requested component itself alongside
+_COMPATIBLE_QUOTES = db.text("""
+    WITH bom AS (
+        SELECT CAST(key AS INTEGER) AS line, CAST(value AS INTEGER) AS component_id
+        FROM json_each(:component_ids)
+    )
+    SELECT bom.line, requested.name AS requested_name,
+           candidate.id AS component_id, candidate.name, quote.supplier, quote.price, quote.quoted_at,
+           MIN(CASE WHEN candidate.id = bom.component_id THEN quote.price END)
+               OVER (PARTITION BY bom.line) AS original_price
+    FROM bom
+    JOIN component AS requested ON requested.id = bom.component_id
+    JOIN component AS candidate ON candidate.compatibility_group = requested.compatibility_group
+    JOIN price_quote AS quote ON quote.component_id = candidate.id
+    ORDER BY bom.line, quote.price
+""").columns(quoted_at=db.DateTime)
+
+
+def compatible_quotes(component_ids):
+    """Quotes for every part compatible with each component id, resolved in one query.
+
+    Returns one list per input position, cheapest first and empty where no
+    compatible part is quoted. Each row carries the requested component's name
+    and its own cheapest price as `requested_name` and `original_price`.
+    """
+    rows = db.session.execute(_COMPATIBLE_QUOTES, {'component_ids': json.dumps(component_ids)}).mappings()
+    results = [[] for _ in component_ids]
+    for row in rows:
+        results[row['line']].append(row)
+    return results
+
+
+def supplier_terms(names):
+    """{supplier name: (shipping fee, free shipping threshold)}; unknown suppliers ship free"""
+    rows = db.session.execute(
+        db.select(Supplier.name, Supplier.shipping_fee, Supplier.free_shipping_threshold)
+        .where(Supplier.name.in_(names))
+    ).all()
+    terms = {name: (0.0, None) for name in names}
+    terms.update((name, (fee, threshold)) for name, fee, threshold in rows)
+    return terms
+
+
+def component_conflicts(component_ids):
+    """{component id: ids it cannot be combined with}, both directions, for the given ids"""
+    rows = db.session.execute(
+        db.select(ComponentConflict.component_id, ComponentConflict.conflicts_with_id).where(
+            ComponentConflict.component_id.in_(component_ids) | ComponentConflict.conflicts_with_id.in_(component_ids)
+        )
+    ).all()
+    conflicts = {}
+    for first, second in rows:
+        conflicts.setdefault(first, set()).add(second)
+        conflicts.setdefault(second, set()).add(first)
+    return conflicts
@@ -0,0 +1,108 @@
+from src.services.intents import router
+from src.services.llm import LLMUnavailable, llm
+from src.services.reply_cache import reply_cache
+
+# AI system prompt for TechCraft Genius AI
+SYSTEM_PROMPT = """
+You are TechCraft Genius AI, a revolutionary AI assistant specialized in DIY tech projects. You have the following capabilities:
+
+1. CONCEPT MERGING: You can intelligently combine different concepts to create innovative projects. For example, merging "flying" + "robot" creates an autonomous drone project.
+
+2. CONTINUOUS LEARNING: You continuously learn from web sources, user feedback, and price monitoring to improve recommendations.
+
+3. COST OPTIMIZATION: You find the cheapest components and suggest alternatives to reduce project costs.
+
+4. DIFFICULTY SCALING: You adapt projects to match user skill levels from beginner to advanced.
+
+5. EQUIPMENT MATCHING: You suggest projects based on available tools and components.
+
+Your responses should be:
+- Highly technical and detailed when discussing projects
+- Creative when merging concepts
+- Cost-conscious and practical
+- Educational and encouraging
+- Focused on DIY tech, electronics, robotics, IoT, and maker projects
+
+Always provide specific component recommendations, code snippets when relevant, and step-by-step guidance.
+"""
+
+# Target size of each streamed piece; pieces break after a space where possible
+STREAM_CHUNK_CHARS = 48
+
+
+def _chunks(text, size=STREAM_CHUNK_CHARS):
+    start = 0
+    while start < len(text):
+        end = start + size
+        if end < len(text):
+            space = text.rfind(' ', start, end)
+            if space > start:
+                end = space + 1
+        yield text[start:end]
+        start = end
+
+
+def build_messages(message, context=None):
+    """Chat messages sent to the completion backend for a user message and the
+    conversation `context` preceding it"""
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT.strip()},
+        *(context or []),
+        {'role': 'user', 'content': message}
+    ]
+
+
+def _completion(messages):
+    """The backend's whole completion, cut into stream pieces"""
+    yield from _chunks(llm.complete(messages))
+
+
+def stream_reply(message, context=None, incremental=True):
+    """Yield the reply to `message` piece by piece as it is produced.
+
+    Without conversation `context`, cached replies to the same or a near-duplicate
+    message are replayed directly. Otherwise uses the completion backend when
+    configured, falling back to the keyword responder if it is unavailable or
+    fails before producing any text. With `incremental` false the backend's
+    completion is requested in one piece, which lets it be micro-batched.
+    """
+    # Replies that depend on earlier turns are neither looked up nor cached
+    use_cache = not context
+    cached = reply_cache.get(message) if use_cache else None
+    if cached is not None:
+        yield from _chunks(cached)
+        return
+
+    if llm.enabled:
+        messages = build_messages(message, context)
+        pieces = llm.stream(messages) if incremental else _completion(messages)
+        try:
+            first = next(pieces, None)
+        except LLMUnavailable:
+            first = None
+        if first is not None:
+            received = [first]
+            try:
+                yield first
+                for piece in pieces:
+                    received.append(piece)
+                    yield piece
+            finally:
+                pieces.close()
+            # Only reached when the whole reply was streamed
+            if use_cache:
+                reply_cache.put(message, ''.join(received))
+            return
+        # Fallback replies are not cached so the backend is retried once it recovers
+        yield from _chunks(router.respond(message))
+        return
+
+    text = router.respond(message)
+    if use_cache:
+        reply_cache.put(message, text)
+    yield from _chunks(text)
+
+
+def reply(message, context=None):
+    """The complete reply to `message`, given the conversation `context`, drained from the stream"""
+    return ''.join(stream_reply(message, context, incremental=False))
@@ -0,0 +1,283 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from itertools import zip_longest
+import numpy as np
+
+DIFFICULTIES = ('Beginner', 'Intermediate', 'Advanced')
+
+# Mergeable concepts: the parts a build around each typically needs, the areas it
+# belongs to, its difficulty (index into DIFFICULTIES) and a typical cost in USD
+CONCEPTS = [
+    {'name': 'flying', 'components': ['Flight Controller', 'Brushless Motors', 'ESC', 'LiPo Battery', 'IMU'], 'domains': ['aerial', 'motion'], 'difficulty': 2, 'cost': 180},
+    {'name': 'robot', 'components': ['Microcontroller', 'Servo Motors', 'Motor Driver', 'Ultrasonic Sensors', 'Chassis'], 'domains': ['robotics', 'motion'], 'difficulty': 1, 'cost': 90},
+    {'name': 'smart', 'components': ['Microcontroller', 'WiFi Module', 'Relay Module'], 'domains': ['home', 'connectivity'], 'difficulty': 0, 'cost': 30},
+    {'name': 'lighting', 'components': ['Smart Bulbs', 'LED Strip', 'Light Sensors', 'Power Supply'], 'domains': ['home', 'lighting'], 'difficulty': 0, 'cost': 40},
+    {'name': 'plant', 'components': ['Soil Sensors', 'Water Pump', 'Grow Light'], 'domains': ['garden'], 'difficulty': 0, 'cost': 35},
+    {'name': 'monitoring', 'components': ['Microcontroller', 'Temperature Sensor', 'Soil Sensors', 'LCD Display', 'WiFi Module'], 'domains': ['data', 'sensing'], 'difficulty': 0, 'cost': 40},
+    {'name': 'motion', 'components': ['PIR Motion Sensor', 'Accelerometer', 'Microcontroller'], 'domains': ['sensing', 'security'], 'difficulty': 0, 'cost': 15},
+    {'name': 'camera', 'components': ['Camera Module', 'Raspberry Pi', 'SD Card'], 'domains': ['vision'], 'difficulty': 1, 'cost': 80},
+    {'name': 'security', 'components': ['Camera Module', 'PIR Motion Sensor', 'Buzzer', 'Raspberry Pi'], 'domains': ['security', 'home'], 'difficulty': 1, 'cost': 110},
+    {'name': 'weather', 'components': ['Temperature Sensor', 'Humidity Sensor', 'Barometric Sensor', 'Anemometer', 'WiFi Module'], 'domains': ['outdoor', 'data', 'sensing'], 'difficulty': 0, 'cost': 60},
+    {'name': 'solar', 'components': ['Solar Panel', 'Charge Controller', 'LiPo Battery', 'Voltage Sensor'], 'domains': ['energy', 'outdoor'], 'difficulty': 1, 'cost': 70},
+    {'name': 'voice', 'components': ['Microphone Array', 'Speaker', 'Raspberry Pi'], 'domains': ['audio', 'home'], 'difficulty': 1, 'cost': 70},
+    {'name': 'gps', 'components': ['GPS Module', 'Microcontroller', 'LiPo Battery'], 'domains': ['navigation', 'outdoor'], 'difficulty': 1, 'cost': 40},
+    {'name': 'music', 'components': ['Speaker', 'Amplifier', 'Potentiometers', 'Microcontroller'], 'domains': ['audio', 'art'], 'difficulty': 0, 'cost': 35},
+    {'name': 'wearable', 'components': ['Microcontroller', 'Accelerometer', 'Heart Rate Sensor', 'LiPo Battery'], 'domains': ['health', 'motion'], 'difficulty': 1, 'cost': 45},
+    {'name': 'aquarium', 'components': ['Water Pump', 'Temperature Sensor', 'pH Meter', 'LED Strip'], 'domains': ['pets', 'water'], 'difficulty': 0, 'cost': 55},
+    {'name': 'pet', 'components': ['Servo Motors', 'Camera Module', 'Load Cell', 'Microcontroller'], 'domains': ['pets', 'home'], 'difficulty': 1, 'cost': 60},
+    {'name': 'garden', 'components': ['Soil Sensors', 'Water Pump', 'Solenoid Valve', 'Microcontroller'], 'domains': ['garden', 'outdoor'], 'difficulty': 0, 'cost': 50},
+    {'name': 'energy', 'components': ['Current Sensor', 'Voltage Sensor', 'WiFi Module', 'LCD Display'], 'domains': ['energy', 'data'], 'difficulty': 1, 'cost': 45},
+    {'name': 'display', 'components': ['LED Matrix', 'LCD Display', 'Microcontroller'], 'domains': ['display', 'art'], 'difficulty': 0, 'cost': 30},
+    {'name': '3d printing', 'components': ['Stepper Motors', 'Stepper Drivers', 'Hotend', 'Heated Bed', 'Microcontroller'], 'domains': ['fabrication', 'motion'], 'difficulty': 2, 'cost': 250},
+    {'name': 'vision', 'components': ['Camera Module', 'Raspberry Pi', 'AI Accelerator'], 'domains': ['vision', 'ai'], 'difficulty': 2, 'cost': 130},
+    {'name': 'lock', 'components': ['Servo Motors', 'RFID Reader', 'Keypad', 'Microcontroller'], 'domains': ['security', 'home'], 'difficulty': 0, 'cost': 35},
+    {'name': 'thermostat', 'components': ['Temperature Sensor', 'Relay Module', 'LCD Display', 'WiFi Module'], 'domains': ['home', 'climate'], 'difficulty': 0, 'cost': 45},
+    {'name': 'air quality', 'components': ['Gas Sensor', 'Particulate Sensor', 'Humidity Sensor', 'LCD Display'], 'domains': ['health', 'sensing', 'climate'], 'difficulty': 0, 'cost': 55},
+    {'name': 'boat', 'components': ['Brushless Motors', 'ESC', 'Servo Motors', 'Radio Receiver', 'LiPo Battery'], 'domains': ['water', 'motion'], 'difficulty': 1, 'cost': 120},
+    {'name': 'rover', 'components': ['DC Motors', 'Motor Driver', 'Chassis', 'Ultrasonic Sensors', 'Microcontroller'], 'domains': ['robotics', 'outdoor'], 'difficulty': 1, 'cost': 85},
+    {'name': 'tracking', 'components': ['GPS Module', 'GSM Module', 'LiPo Battery'], 'domains': ['navigation', 'connectivity'], 'difficulty': 1, 'cost': 55},
+    {'name': 'clock', 'components': ['RTC Module', 'LED Matrix', 'Microcontroller'], 'domains': ['display', 'home'], 'difficulty': 0, 'cost': 25},
+    {'name': 'telescope', 'components': ['Stepper Motors', 'Stepper Drivers', 'GPS Module', 'Microcontroller'], 'domains': ['astronomy', 'motion'], 'difficulty': 2, 'cost': 160}
+]
+
+# Hand-written results for well-known pairs; their scores also override the computed ones
+CURATED_MERGES = {
+    ('flying', 'robot'): {
+        'title': 'Autonomous Flying Robot',
+        'synergy_score': 95,
+        'innovation_score': 85,
+        'feasibility_score': 70,
+        'description': 'A self-navigating drone with obstacle avoidance and GPS tracking',
+        'estimated_cost': 300,
+        'difficulty': 'Advanced',
+        'key_components': ['Flight Controller', 'GPS Module', 'Ultrasonic Sensors', 'Camera']
+    },
+    ('smart', 'lighting'): {
+        'title': 'Intelligent Lighting System',
+        'synergy_score': 88,
+        'innovation_score': 75,
+        'feasibility_score': 90,
+        'description': 'Adaptive lighting that responds to occupancy, time, and ambient conditions',
+        'estimated_cost': 120,
+        'difficulty': 'Intermediate',
+        'key_components': ['Smart Bulbs', 'Motion Sensors', 'Light Sensors', 'Microcontroller']
+    },
+    ('plant', 'monitoring'): {
+        'title': 'Smart Plant Care System',
+        'synergy_score': 92,
+        'innovation_score': 80,
+        'feasibility_score': 85,
+        'description': 'Automated plant monitoring with soil moisture, light, and nutrient tracking',
+        'estimated_cost': 80,
+        'difficulty': 'Beginner',
+        'key_components': ['Soil Sensors', 'pH Meter', 'Water Pump', 'Arduino']
+    }
+}
+
+# Channels of the precomputed pair table
+SCORE_FIELDS = ('synergy_score', 'innovation_score', 'feasibility_score', 'estimated_cost')
+
+# Orderings accepted by ConceptRegistry.partners
+PARTNER_ORDERINGS = ('overall', 'synergy', 'innovation', 'feasibility')
+
+# What a merged project is called, by the domain of its second concept
+DOMAIN_NOUNS = {
+    'aerial': 'Drone', 'robotics': 'Robot', 'security': 'Guard', 'sensing': 'Monitor',
+    'data': 'Logger', 'garden': 'Gardener', 'display': 'Display', 'audio': 'Speaker',
+    'navigation': 'Tracker', 'vision': 'Camera', 'climate': 'Controller'
+}
+
+
+def generic_merge(concept1, concept2):
+    """Template result for concepts outside the registry"""
+    return {
+        'title': f'Smart {concept1.title()} {concept2.title()} System',
+        'synergy_score': 75,
+        'innovation_score': 70,
+        'feasibility_score': 80,
+        'description': f'An innovative project combining {concept1} and {concept2} technologies',
+        'estimated_cost': 150,
+        'difficulty': 'Intermediate',
+        'key_components': ['Microcontroller', 'Sensors', 'Actuators', 'Power Supply']
+    }
+
+
+def _jaccard(memberships):
+    """Pairwise Jaccard similarity of the rows of a 0/1 matrix"""
+    shared = memberships @ memberships.T
+    sizes = memberships.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - shared
+    return np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+
+def _memberships(concepts, attribute):
+    values = sorted({value for concept in concepts for value in concept[attribute]})
+    position = {value: i for i, value in enumerate(values)}
+    matrix = np.zeros((len(concepts), len(values)), dtype=np.float32)
+    for row, concept in enumerate(concepts):
+        matrix[row, [position[value] for value in concept[attribute]]] = 1
+    return matrix
+
+
+def compute_scores(concepts, curated=None):
+    """(N, N, len(SCORE_FIELDS)) table of merge scores for every ordered pair.
+
+    Synergy rewards shared components (parts that serve both halves) across
+    different domains; innovation rewards combining unrelated domains; feasibility
+    falls with difficulty and combined cost. The diagonal is zero.
+    """
+    component_overlap = _jaccard(_memberships(concepts, 'components'))
+    domain_overlap = _jaccard(_memberships(concepts, 'domains'))
+    difficulty = np.array([concept['difficulty'] for concept in concepts], dtype=np.float32)
+    cost = np.array([concept['cost'] for concept in concepts], dtype=np.float32)
+
+    hardest = np.maximum.outer(difficulty, difficulty)
+    # Shared components are bought once
+    combined_cost = np.add.outer(cost, cost) * (1 - 0.25 * component_overlap)
+
+    synergy = 55 + 30 * np.sqrt(component_overlap) + 15 * (1 - domain_overlap)
+    innovation = 45 + 40 * (1 - domain_overlap) + 5 * hardest - 10 * component_overlap
+    feasibility = 100 - 12 * hardest - 25 * np.minimum(1, combined_cost / 400) + 10 * component_overlap
+
+    scores = np.stack([synergy, innovation, feasibility, combined_cost], axis=-1)
+    scores = np.clip(np.rint(scores), 0, np.iinfo(np.uint16).max).astype(np.uint16)
+    scores[:, :, :3] = np.minimum(scores[:, :, :3], 100)
+    np.einsum('iij->ij', scores)[:] = 0
+
+    index = {concept['name']: i for i, concept in enumerate(concepts)}
+    for (name1, name2), result in (curated or {}).items():
+        i, j = index[name1], index[name2]
+        scores[i, j] = scores[j, i] = [result[field] for field in SCORE_FIELDS]
+    return scores
+
+
+def _fingerprint(concepts, curated):
+    payload = json.dumps([concepts, sorted((list(key), value) for key, value in curated.items())], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+class ConceptRegistry:
+    """Looks up merge results from a pair table computed once per registry version.
+
+    The table is saved as concept_scores-<fingerprint>.npy under CONCEPT_DATA_DIR
+    and memory-mapped, so workers share one copy and any pair is an O(1) read.
+    """
+
+    def __init__(self, concepts=CONCEPTS, curated=CURATED_MERGES):
+        self.concepts = concepts
+        self.curated = curated
+        self.index = {concept['name']: i for i, concept in enumerate(concepts)}
+        self.scores = None
+
+    def init_app(self, app):
+        self.load(app.config['CONCEPT_DATA_DIR'])
+        app.extensions['concepts'] = self
+
+    def load(self, directory):
+        """Memory-map the pair table, computing and saving it first if missing"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'concept_scores-{_fingerprint(self.concepts, self.curated)}.npy')
+        if not os.path.exists(path):
+            for stale in glob.glob(os.path.join(directory, 'concept_scores-*.npy')):
+                os.remove(stale)
+            # Write then rename so other workers never map a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npy')
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, compute_scores(self.concepts, self.curated))
+            os.replace(tmp_path, path)
+        self.scores = np.load(path, mmap_mode='r')
+
+    def lookup(self, name):
+        """Registry index of a concept name, or None"""
+        return self.index.get(name.strip().lower())
+
+    def merge(self, concept1, concept2):
+        """Merge result for two concept names"""
+        i, j = self.lookup(concept1), self.lookup(concept2)
+        if i is None or j is None:
+            return generic_merge(concept1, concept2)
+        return self.describe(i, j, self.scores[i, j])
+
+    def merge_many(self, pairs):
+        """Merge results for many (concept1, concept2) name pairs, in order.
+
+        Names are resolved once each and all registered pairs are read from the
+        table with a single fancy-indexing gather.
+        """
+        positions = {}
+        for name in {name for pair in pairs for name in pair}:
+            positions[name] = self.lookup(name)
+
+        known = [
+            k for k, (concept1, concept2) in enumerate(pairs)
+            if positions[concept1] is not None and positions[concept2] is not None
+        ]
+        rows = {}
+        if known:
+            first = np.fromiter((positions[pairs[k][0]] for k in known), dtype=np.intp, count=len(known))
+            second = np.fromiter((positions[pairs[k][1]] for k in known), dtype=np.intp, count=len(known))
+            gathered = self.scores[first, second].tolist()
+            rows = {k: (int(i), int(j), row) for k, i, j, row in zip(known, first, second, gathered)}
+
+        results = []
+        for k, (concept1, concept2) in enumerate(pairs):
+            if k in rows:
+                results.append(self.describe(*rows[k]))
+            else:
+                results.append(generic_merge(concept1, concept2))
+        return results
+
+    def describe(self, i, j, scores):
+        """Full merge result for registry concepts i and j with their table row"""
+        first, second = self.concepts[i], self.concepts[j]
+        curated = self.curated.get((first['name'], second['name'])) or self.curated.get((second['name'], first['name']))
+        if curated is not None:
+            return dict(curated)
+
+        shared = [c for c in first['components'] if c in second['components']]
+        # Alternate between the two concepts' own parts after the shared ones
+        own = [c for pair in zip_longest(first['components'], second['components']) for c in pair if c]
+        domains = list(dict.fromkeys(first['domains'] + second['domains']))
+        noun = DOMAIN_NOUNS.get(second['domains'][0], 'System')
+        if noun.lower() in (first['name'], second['name']):
+            noun = 'System'
+
+        result = {
+            'title': f"{first['name'].title()} {second['name'].title()} {noun}",
+            'description': f"Combines {first['name']} with {second['name']} for {' and '.join(domains[:2])} builds"
+                           + (f", sharing one {shared[0]} between both" if shared else ''),
+            'difficulty': DIFFICULTIES[max(first['difficulty'], second['difficulty'])],
+            'key_components': list(dict.fromkeys(shared + own))[:5]
+        }
+        result.update({field: int(value) for field, value in zip(SCORE_FIELDS, scores)})
+        return result
+
+    def partners(self, name, limit=10, by='overall'):
+        """Best merge partners for a concept, or None if it is not registered"""
+        i = self.lookup(name)
+        if i is None:
+            return None
+        row = np.asarray(self.scores[i, :, :3], dtype=np.float32)
+        overall = row.mean(axis=1)
+        key = overall.copy() if by == 'overall' else row[:, PARTNER_ORDERINGS.index(by) - 1]
+        key[i] = -1
+
+        limit = max(0, min(limit, len(self.concepts) - 1))
+        if limit == 0:
+            return []
+        top = np.argpartition(-key, limit - 1)[:limit]
+        top = top[np.argsort(-key[top], kind='stable')]
+        return [
+            {
+                'concept': self.concepts[j]['name'],
+                'overall_score': round(float(overall[j]), 1),
+                **self.describe(i, j, self.scores[i, j])
+            }
+            for j in top
+        ]
+
+
+concepts = ConceptRegistry()
@@ -0,0 +1,38 @@
+import hashlib
+import time
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+def conditional(version, relative_times=False):
+    """Decorate a GET view with a strong ETag derived from a cheap content version.
+
+    `version` returns (last_modified, token), where token changes whenever the
+    serialized output would. A matching If-None-Match is answered with 304
+    before the view runs, so nothing is loaded or serialized. Views that render
+    relative times ("5 minutes ago") pass relative_times=True to also roll the
+    ETag over every minute.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            last_modified, token = version()
+            if relative_times:
+                token = (token, int(time.time() // 60))
+            etag = hashlib.sha1(
+                repr((request.path, request.query_string, token)).encode()
+            ).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
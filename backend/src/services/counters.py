@@ -0,0 +1,132 @@
+import atexit
+import os
+import threading
+from collections import defaultdict
+from src.models.project import db
+
+
+class CounterBuffer:
+    """Write-behind buffer for counter columns such as Project.views.
+
+    Increments are coalesced in memory per (model, column, row) and written
+    periodically as one batched `UPDATE ... SET col = col + ?` per column.
+    Because the database applies relative deltas, several worker processes can
+    each run their own buffer without losing counts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._listeners = defaultdict(list)
+        self._app = None
+        self._interval = 0
+        self._worker = None
+        self._worker_pid = None
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        """Configure from COUNTER_FLUSH_INTERVAL (seconds, <= 0 flushes after every request)"""
+        self._app = app
+        self._interval = app.config.get('COUNTER_FLUSH_INTERVAL', 5.0)
+        app.extensions['counter_buffer'] = self
+
+        if self._interval <= 0:
+            app.teardown_request(lambda exc: self.flush())
+        atexit.register(self.shutdown)
+
+    def increment(self, model, column, pk, amount=1):
+        """Queue `amount` to be added to `column` of the `model` row with id `pk`"""
+        with self._lock:
+            self._pending[(model, column, pk)] += amount
+        self._ensure_worker()
+
+    def on_flush(self, model, callback):
+        """Call `callback` after every flush that wrote counters of `model`,
+        e.g. to invalidate cached responses derived from them"""
+        self._listeners[model].append(callback)
+
+    def pending(self, model, column, pk):
+        """Increments queued for a row that are not yet in the database"""
+        with self._lock:
+            return self._pending.get((model, column, pk), 0)
+
+    def flush(self):
+        """Write all queued increments, returning the number of rows touched"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        if not pending:
+            return 0
+
+        batches = defaultdict(list)
+        for (model, column, pk), amount in sorted(pending.items(), key=lambda item: item[0][2]):
+            batches[(model, column)].append({'pk': pk, 'amount': amount})
+
+        try:
+            with self._app.app_context():
+                with db.engine.begin() as conn:
+                    for (model, column), rows in batches.items():
+                        table = model.__table__
+                        conn.execute(
+                            db.update(table)
+                            .where(table.c.id == db.bindparam('pk'))
+                            .values({column: table.c[column] + db.bindparam('amount')}),
+                            rows
+                        )
+        except Exception:
+            # Re-queue so a failed flush is retried rather than dropping counts
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+            raise
+
+        for model in {model for model, _ in batches}:
+            for callback in self._listeners[model]:
+                callback()
+        return len(pending)
+
+    def shutdown(self):
+        """Stop the background flusher and write anything still queued"""
+        self._stop.set()
+        if self._worker is not None and self._worker_pid == os.getpid():
+            self._worker.join(timeout=self._interval + 1)
+        if self._app is not None:
+            self.flush()
+
+    def _ensure_worker(self):
+        # Started lazily, and again after a fork, so each worker process flushes its own buffer
+        if self._interval <= 0 or self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._stop = threading.Event()
+            self._worker = threading.Thread(target=self._run, name='counter-flush', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.flush()
+            except Exception:
+                self._app.logger.exception('Failed to flush counters')
+
+
+counters = CounterBuffer()
+
+
+def atomic_increment(model, column, pk, amount=1):
+    """Add `amount` to a counter column with a single UPDATE ... RETURNING.
+
+    Returns the new value, or None when no row has id `pk`.
+    """
+    counter = getattr(model, column)
+    value = db.session.execute(
+        db.update(model)
+        .where(model.id == pk)
+        .values({column: counter + amount})
+        .returning(counter)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    db.session.commit()
+    return value
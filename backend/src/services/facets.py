@@ -0,0 +1,116 @@
+from sqlalchemy import text
+from src.models.project import db, Project, ProjectFacet
+
+# Facet name -> JSON list column on Project it is derived from
+FACET_COLUMNS = {
+    'tag': 'tags',
+    'component': 'components',
+    'skill': 'skills'
+}
+
+
+def _insert_facets(row):
+    return '\n'.join(
+        f"""
+        INSERT OR IGNORE INTO project_facet(project_id, facet, value_key, value)
+        SELECT {row}.id, '{facet}', lower(trim(value)), trim(value)
+        FROM json_each({row}.{column}) WHERE trim(value) != '';
+        """
+        for facet, column in FACET_COLUMNS.items()
+    )
+
+
+_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_facet_ai AFTER INSERT ON project BEGIN
+        {_insert_facets('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_facet_au AFTER UPDATE OF tags, components, skills ON project BEGIN
+        DELETE FROM project_facet WHERE project_id = old.id;
+        {_insert_facets('new')}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS project_facet_ad AFTER DELETE ON project BEGIN
+        DELETE FROM project_facet WHERE project_id = old.id;
+    END
+    """,
+]
+
+
+def init_facet_index(engine):
+    """Install the triggers that keep project_facet in sync and backfill it if empty"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    with engine.begin() as conn:
+        for statement in _DDL:
+            conn.execute(text(statement))
+
+        if conn.execute(text("SELECT 1 FROM project_facet LIMIT 1")).first() is None:
+            rebuild_facet_index(conn)
+
+
+def rebuild_facet_index(conn):
+    """Re-derive every facet row from the JSON columns on project"""
+    conn.execute(text("DELETE FROM project_facet"))
+    for facet, column in FACET_COLUMNS.items():
+        conn.execute(text(
+            f"INSERT OR IGNORE INTO project_facet(project_id, facet, value_key, value) "
+            f"SELECT project.id, '{facet}', lower(trim(item.value)), trim(item.value) "
+            f"FROM project, json_each(project.{column}) AS item WHERE trim(item.value) != ''"
+        ))
+
+
+def parse_values(args, name):
+    """Collect a multi-valued filter given as repeated and/or comma separated args"""
+    values = []
+    for raw in args.getlist(name):
+        values.extend(value.strip() for value in raw.split(','))
+    return [value for value in values if value]
+
+
+def facet_filter(facet, values, match_all=True):
+    """Filter clause selecting projects that carry all (or any) of `values` for `facet`"""
+    # Lower-case in SQL as well so keys compare exactly like the trigger-built ones
+    keys = {value.lower(): value for value in values}
+    matches = db.select(ProjectFacet.project_id).where(
+        ProjectFacet.facet == facet,
+        ProjectFacet.value_key.in_([db.func.lower(value) for value in keys.values()])
+    )
+    if match_all and len(keys) > 1:
+        matches = matches.group_by(ProjectFacet.project_id).having(db.func.count() == len(keys))
+    return Project.id.in_(matches)
+
+
+def facet_counts(project_ids=None):
+    """Per-value counts for every facet plus categories, computed in one grouped query.
+
+    `project_ids` optionally restricts the counts to a selectable of project ids.
+    """
+    facets = db.select(
+        ProjectFacet.facet.label('facet'),
+        db.func.min(ProjectFacet.value).label('value'),
+        db.func.count().label('count')
+    ).group_by(ProjectFacet.facet, ProjectFacet.value_key)
+
+    categories = db.select(
+        db.literal('category').label('facet'),
+        Project.category.label('value'),
+        db.func.count().label('count')
+    ).group_by(Project.category)
+
+    if project_ids is not None:
+        facets = facets.where(ProjectFacet.project_id.in_(project_ids))
+        categories = categories.where(Project.id.in_(project_ids))
+
+    counts = {facet: [] for facet in FACET_COLUMNS}
+    counts['category'] = []
+    for facet, value, count in db.session.execute(db.union_all(facets, categories)):
+        counts[facet].append({'value': value, 'count': count})
+
+    for values in counts.values():
+        values.sort(key=lambda item: (-item['count'], item['value']))
+    return counts
@@ -0,0 +1,177 @@
+import csv
+import gzip
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+from sqlalchemy.dialects.sqlite import insert
+from src.models.project import db, LearningActivity, PriceQuote
+from src.services.catalog import catalog_names, normalize_name
+
+DEFAULT_CHUNK_SIZE = 5000
+# Resolved component names remembered between chunks; cleared when it grows past this
+NAME_CACHE_LIMIT = 100000
+
+
+class IngestReport:
+    """Running totals for one ingestion"""
+
+    def __init__(self, source):
+        self.source = source
+        self.rows_read = 0
+        self.rows_invalid = 0
+        self.rows_unmatched = 0
+        self.rows_upserted = 0
+        self.suppliers = set()
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return round(self.rows_read / self.elapsed) if self.elapsed else 0
+
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'rows_read': self.rows_read,
+            'rows_invalid': self.rows_invalid,
+            'rows_unmatched': self.rows_unmatched,
+            'rows_upserted': self.rows_upserted,
+            'suppliers': len(self.suppliers),
+            'seconds': round(self.elapsed, 2),
+            'rows_per_sec': self.rows_per_sec
+        }
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(f, file_format):
+    """Yield raw rows one at a time from an open CSV or JSON-lines text stream"""
+    if file_format == 'csv':
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {}
+
+
+def normalize_row(row):
+    """(component key, supplier, price, quoted_at) for a raw feed row, or None if invalid.
+
+    Rows need component, supplier and a positive, finite price; prices may carry a
+    currency symbol or thousands separators. quoted_at is stored as naive UTC:
+    offsets are converted, times without one are taken as UTC, and it defaults
+    to now.
+    """
+    component = row.get('component') or row.get('name')
+    supplier = row.get('supplier')
+    price = row.get('price')
+    if not component or not supplier or price in (None, ''):
+        return None
+    try:
+        if isinstance(price, str):
+            price = price.strip().lstrip('$').replace(',', '')
+        price = round(float(price), 2)
+        quoted_at = row.get('quoted_at')
+        quoted_at = datetime.fromisoformat(quoted_at) if quoted_at else datetime.utcnow()
+        if quoted_at.tzinfo is not None:
+            quoted_at = quoted_at.astimezone(timezone.utc).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(price) or not price > 0:
+        return None
+    return normalize_name(str(component)), str(supplier).strip(), price, quoted_at
+
+
+# Newer quotes replace older ones; a feed replaying old prices changes nothing
+_UPSERT = insert(PriceQuote)
+_UPSERT = _UPSERT.on_conflict_do_update(
+    index_elements=['component_id', 'supplier'],
+    set_={'price': _UPSERT.excluded.price, 'quoted_at': _UPSERT.excluded.quoted_at},
+    where=_UPSERT.excluded.quoted_at >= PriceQuote.quoted_at
+)
+
+
+def _upsert_chunk(chunk, names, report):
+    # Evicting before the lookup keeps every name in this chunk resolved
+    if len(names) > NAME_CACHE_LIMIT:
+        names.clear()
+    missing = {key for key, _, _, _ in chunk if key not in names}
+    if missing:
+        found = catalog_names(missing)
+        names.update((key, found.get(key)) for key in missing)
+
+    # Later rows for the same component and supplier win within a chunk
+    quotes = {}
+    for key, supplier, price, quoted_at in chunk:
+        component_id = names[key]
+        if component_id is None:
+            report.rows_unmatched += 1
+            continue
+        quotes[(component_id, supplier)] = {
+            'component_id': component_id, 'supplier': supplier, 'price': price, 'quoted_at': quoted_at
+        }
+        report.suppliers.add(supplier)
+
+    if quotes:
+        # Core execution on the session's connection reports rows changed across the batch
+        result = db.session.connection().execute(_UPSERT, list(quotes.values()))
+        report.rows_upserted += max(result.rowcount, 0)
+    db.session.commit()
+
+
+def ingest_prices(path, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Stream a supplier price feed into PriceQuote and log a 'price' learning activity.
+
+    The file is read incrementally and written in chunks of `chunk_size` rows,
+    each validated, resolved against the catalog with one query and upserted
+    with one batched INSERT ... ON CONFLICT, so memory stays flat for any file
+    size. Rows naming components outside the catalog are counted and skipped.
+    `progress`, if given, is called with the report after every chunk.
+    """
+    report = IngestReport(os.path.basename(path))
+    names = {}
+    chunk = []
+
+    with _open_text(path) as f:
+        for row in read_rows(f, file_format or detect_format(path)):
+            report.rows_read += 1
+            normalized = normalize_row(row)
+            if normalized is None:
+                report.rows_invalid += 1
+                continue
+            chunk.append(normalized)
+            if len(chunk) >= chunk_size:
+                _upsert_chunk(chunk, names, report)
+                chunk = []
+                report.elapsed = time.perf_counter() - report.started
+                if progress:
+                    progress(report)
+        if chunk:
+            _upsert_chunk(chunk, names, report)
+    report.elapsed = time.perf_counter() - report.started
+
+    summary = report.to_dict()
+    db.session.add(LearningActivity(
+        activity_type='price',
+        description=f"Updated {report.rows_upserted} component prices from {summary['suppliers']} suppliers",
+        activity_metadata=json.dumps(summary)
+    ))
+    db.session.commit()
+    return report
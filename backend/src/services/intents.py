@@ -0,0 +1,123 @@
+import re
+
+# Keyword intents for the fallback chat responder, highest priority first. A message
+# gets the first intent any of whose keywords appears in it as a substring.
+INTENT_RULES = [
+    {
+        'intent': 'concept',
+        'keywords': ['merge', 'combine', 'concept'],
+        'response': "I can help you merge concepts! For example, combining 'smart lighting' with 'motion detection' creates an intelligent home automation system that automatically adjusts lighting based on occupancy and time of day. The synergy score for this combination would be around 88% with high feasibility."
+    },
+    {
+        'intent': 'cost',
+        'keywords': ['cost', 'price', 'cheap', 'budget'],
+        'response': "I'm constantly monitoring component prices across multiple suppliers. For Arduino projects, I've found that generic boards can save you 40-60% compared to official ones while maintaining compatibility. I can also suggest alternative components that provide similar functionality at lower costs."
+    },
+    {
+        'intent': 'flying_robot',
+        'keywords': ['flying', 'drone', 'robot'],
+        'response': "The Autonomous Flying Robot is one of our most advanced projects! It combines flight control, GPS navigation, and obstacle avoidance. The estimated cost is $300 with a synergy score of 95% between 'flying' and 'robot' concepts. I can break down the components and provide the complete code."
+    },
+    {
+        'intent': 'learning',
+        'keywords': ['learn', 'learning', 'ai'],
+        'response': "I continuously learn from web sources, user feedback, and price monitoring. Today I've discovered 23 new projects, merged 5 concepts, and updated 127 component prices. My learning progress shows 87% web discovery, 92% concept integration, and 95% user adaptation."
+    },
+    {
+        'intent': 'project',
+        'keywords': ['project', 'build', 'make', 'create'],
+        'response': "Based on your interests, I recommend starting with a Smart Home Security System. It's perfect for intermediate makers and costs around $150. The project includes facial recognition, motion detection, and mobile alerts. I can provide detailed component lists and step-by-step instructions."
+    }
+]
+
+DEFAULT_INTENT = {
+    'intent': 'help',
+    'response': "I'm TechCraft Genius AI! I can help you with project recommendations, concept merging, cost optimization, and technical guidance. What would you like to build today? I specialize in IoT, robotics, Arduino, Raspberry Pi, and smart home projects."
+}
+
+
+def _trie_pattern(words):
+    """Regex for a set of literals, factored into a trie so each position costs
+    O(keyword length) instead of one attempt per keyword"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class IntentRouter:
+    """Classifies a message against every intent rule in a single scan"""
+
+    def __init__(self, rules, default):
+        self.rules = rules
+        self.default = default
+
+        priorities = {}
+        for priority, rule in enumerate(rules):
+            for keyword in rule['keywords']:
+                priorities.setdefault(keyword.lower(), priority)
+
+        # A longer keyword also contains every keyword that is its prefix, so a match
+        # on it is worth the best priority among them
+        self._priorities = {
+            keyword: min(p for other, p in priorities.items() if keyword.startswith(other))
+            for keyword in priorities
+        }
+        self._pattern = re.compile(_trie_pattern(priorities))
+
+    def classify(self, message):
+        """Return the highest priority rule matching `message`, or the default"""
+        text = message.lower()
+        best = len(self.rules)
+        position = 0
+        while best > 0:
+            match = self._pattern.search(text, position)
+            if match is None:
+                break
+            best = min(best, self._priorities[match.group()])
+            # Resume one character in so keywords overlapping this match are still seen
+            position = match.start() + 1
+        return self.rules[best] if best < len(self.rules) else self.default
+
+    def respond(self, message):
+        return self.classify(message)['response']
+
+
+router = IntentRouter(INTENT_RULES, DEFAULT_INTENT)
+
+
+if __name__ == '__main__':
+    # Throughput benchmark: python -m src.services.intents
+    import random
+    import string
+    import time
+
+    words = [''.join(random.choices(string.ascii_lowercase, k=random.randint(2, 9))) for _ in range(5000)]
+    for size in (100, 1000, 10000, 100000):
+        messages = [' '.join(random.choices(words, k=size // 6)) for _ in range(20)]
+        total_bytes = sum(len(message) for message in messages)
+        start = time.perf_counter()
+        rounds = 0
+        while time.perf_counter() - start < 1.0:
+            for message in messages:
+                router.classify(message)
+            rounds += 1
+        elapsed = time.perf_counter() - start
+        print(
+            f'{size:>7} chars: {rounds * len(messages) / elapsed:>10.0f} msgs/s, '
+            f'{rounds * total_bytes / elapsed / 1e6:6.1f} MB/s'
+        )
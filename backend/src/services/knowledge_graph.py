@@ -0,0 +1,472 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+from sqlalchemy import bindparam, text
+from src.models.project import db
+from src.services.facets import FACET_COLUMNS
+
+# Graph nodes are project facets and categories, identified as '<kind>:<lower-cased value>';
+# edges count the projects two nodes appear on together. knowledge_edge holds each pair
+# once (source < target) and is kept in sync with `project` by triggers, which also bump
+# knowledge_graph_version so snapshots know when to rebuild. Every edge change is logged in
+# knowledge_edge_change under the version it leads away from, so a snapshot can be derived
+# from an older one by re-reading just the pairs changed since; a row with an empty source
+# marks a full recount, after which only a full build is correct.
+NODE_KINDS = tuple(FACET_COLUMNS) + ('category',)
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 200
+MAX_DEPTH = 3
+
+
+def _nodes(row):
+    """Distinct node ids of one project row in a trigger"""
+    facets = ' UNION '.join(
+        f"SELECT '{facet}:' || lower(trim(value)) AS node FROM json_each({row}.{column}) WHERE trim(value) != ''"
+        for facet, column in FACET_COLUMNS.items()
+    )
+    return f"{facets} UNION SELECT 'category:' || lower(trim({row}.category))"
+
+
+def _pairs(row):
+    return f"SELECT a.node, b.node FROM ({_nodes(row)}) AS a, ({_nodes(row)}) AS b WHERE a.node < b.node"
+
+
+def _add_edges(row):
+    # WHERE true keeps SQLite from reading ON CONFLICT as part of the join
+    return f"""
+        INSERT INTO knowledge_edge(source, target, weight)
+        SELECT pair.*, 1 FROM ({_pairs(row)}) AS pair WHERE true
+        ON CONFLICT(source, target) DO UPDATE SET weight = weight + 1;
+    """
+
+
+def _remove_edges(row):
+    return f"""
+        UPDATE knowledge_edge SET weight = weight - 1 WHERE (source, target) IN ({_pairs(row)});
+        DELETE FROM knowledge_edge WHERE weight <= 0 AND (source, target) IN ({_pairs(row)});
+    """
+
+
+_BUMP = "UPDATE knowledge_graph_version SET version = version + 1;"
+_RECOUNTED = "INSERT INTO knowledge_edge_change(version, source, target) SELECT version, '', '' FROM knowledge_graph_version"
+
+
+def _log_change(row):
+    return f"""
+        INSERT INTO knowledge_edge_change(version, source, target)
+        SELECT version, {row}.source, {row}.target FROM knowledge_graph_version;
+    """
+
+
+_DDL = [
+    "CREATE TABLE IF NOT EXISTS knowledge_graph_version (version INTEGER NOT NULL)",
+    "INSERT INTO knowledge_graph_version(version) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM knowledge_graph_version)",
+    "CREATE TABLE IF NOT EXISTS knowledge_edge_change (version INTEGER NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_knowledge_edge_change_version ON knowledge_edge_change(version)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS knowledge_edge_ai AFTER INSERT ON project BEGIN
+        {_add_edges('new')}
+        {_BUMP}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS knowledge_edge_au AFTER UPDATE OF category, {', '.join(FACET_COLUMNS.values())} ON project BEGIN
+        {_remove_edges('old')}
+        {_add_edges('new')}
+        {_BUMP}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS knowledge_edge_ad AFTER DELETE ON project BEGIN
+        {_remove_edges('old')}
+        {_BUMP}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS knowledge_edge_change_ai AFTER INSERT ON knowledge_edge BEGIN
+        {_log_change('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS knowledge_edge_change_au AFTER UPDATE ON knowledge_edge BEGIN
+        {_log_change('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS knowledge_edge_change_ad AFTER DELETE ON knowledge_edge BEGIN
+        {_log_change('old')}
+    END
+    """,
+]
+
+
+def init_knowledge_graph(engine):
+    """Install the triggers that keep knowledge_edge in sync and backfill it if empty"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    with engine.begin() as conn:
+        logged = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_edge_change'"
+        )).first() is not None
+        for statement in _DDL:
+            conn.execute(text(statement))
+        if not logged:
+            # Edges may have changed since existing snapshots without being logged
+            conn.execute(text(_RECOUNTED))
+
+        if conn.execute(text("SELECT 1 FROM knowledge_edge LIMIT 1")).first() is None:
+            rebuild_knowledge_edges(conn)
+
+
+def rebuild_knowledge_edges(conn):
+    """Recount every edge from the project table"""
+    nodes = ' UNION '.join(
+        [
+            f"SELECT project.id AS project_id, '{facet}:' || lower(trim(item.value)) AS node "
+            f"FROM project, json_each(project.{column}) AS item WHERE trim(item.value) != ''"
+            for facet, column in FACET_COLUMNS.items()
+        ] + ["SELECT id, 'category:' || lower(trim(category)) FROM project"]
+    )
+    conn.execute(text("DELETE FROM knowledge_edge"))
+    conn.execute(text(
+        f"INSERT INTO knowledge_edge(source, target, weight) "
+        f"SELECT a.node, b.node, count(*) FROM ({nodes}) AS a JOIN ({nodes}) AS b "
+        f"ON a.project_id = b.project_id AND a.node < b.node GROUP BY a.node, b.node"
+    ))
+    # Snapshots can't be updated across a recount, so its per-edge log is replaced by a marker
+    conn.execute(text("DELETE FROM knowledge_edge_change"))
+    conn.execute(text(_RECOUNTED))
+    conn.execute(text(_BUMP))
+
+
+def _node_labels(conn, nodes=None):
+    """Display label per node id: the first spelling seen of each facet value or category,
+    for all nodes or just the given ones"""
+    if nodes is None:
+        rows = conn.execute(text(
+            "SELECT facet || ':' || value_key, min(value) FROM project_facet GROUP BY 1 "
+            "UNION ALL SELECT 'category:' || lower(trim(category)), min(category) FROM project GROUP BY 1"
+        ))
+        return dict(rows.all())
+
+    keys = {}
+    for node in nodes:
+        kind, key = node.split(':', 1)
+        keys.setdefault(kind, []).append(key)
+    labels = {}
+    for kind, values in keys.items():
+        if kind == 'category':
+            query = text(
+                "SELECT 'category:' || lower(trim(category)), min(category) FROM project "
+                "WHERE lower(trim(category)) IN :keys GROUP BY 1"
+            ).bindparams(bindparam('keys', expanding=True))
+            labels.update(conn.execute(query, {'keys': values}).all())
+        else:
+            query = text(
+                "SELECT facet || ':' || value_key, min(value) FROM project_facet "
+                "WHERE facet = :facet AND value_key IN :keys GROUP BY 1"
+            ).bindparams(bindparam('keys', expanding=True))
+            labels.update(conn.execute(query, {'facet': kind, 'keys': values}).all())
+    return labels
+
+
+def _write_snapshot(directory, ids, labels, sources, targets, weights):
+    """Write edges given as node indices into `ids` as CSR arrays into `directory`.
+
+    Both directions of every edge are stored, each node's neighbours sorted by
+    descending weight, so a neighbourhood walk can stop at the strongest few.
+    """
+    rows = np.concatenate([sources, targets])
+    columns = np.concatenate([targets, sources])
+    weights = np.concatenate([weights, weights])
+    # Ties go by neighbour index, so a derived snapshot is identical to a full build
+    order = np.lexsort((columns, -weights, rows))
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(ids)), out=indptr[1:])
+
+    np.save(os.path.join(directory, 'indptr.npy'), indptr)
+    np.save(os.path.join(directory, 'indices.npy'), columns[order])
+    np.save(os.path.join(directory, 'weights.npy'), weights[order])
+    # Weighted degree, used to pick the most central nodes when no node is asked for
+    np.save(os.path.join(directory, 'strength.npy'), np.bincount(rows, weights=weights, minlength=len(ids)))
+    with open(os.path.join(directory, 'nodes.json'), 'w') as f:
+        json.dump([[node, labels.get(node, node.split(':', 1)[1])] for node in ids], f)
+
+
+def build_snapshot(conn, directory):
+    """Write the whole graph from knowledge_edge as a snapshot into `directory`"""
+    edges = conn.execute(text("SELECT source, target, weight FROM knowledge_edge")).all()
+
+    ids = sorted({node for source, target, _ in edges for node in (source, target)})
+    index = {node: i for i, node in enumerate(ids)}
+    _write_snapshot(
+        directory, ids, _node_labels(conn),
+        np.fromiter((index[source] for source, _, _ in edges), dtype=np.int32, count=len(edges)),
+        np.fromiter((index[target] for _, target, _ in edges), dtype=np.int32, count=len(edges)),
+        np.fromiter((weight for _, _, weight in edges), dtype=np.int32, count=len(edges))
+    )
+
+
+def update_snapshot(conn, base, base_version, directory):
+    """Write the current graph into `directory` by applying the edges changed since
+    `base_version` to that version's snapshot in `base`. Returns False, writing
+    nothing, if the edges were recounted since and a full build is needed."""
+    changed = conn.execute(text(
+        "SELECT change.source, change.target, edge.weight "
+        "FROM (SELECT DISTINCT source, target FROM knowledge_edge_change WHERE version >= :version) AS change "
+        "LEFT JOIN knowledge_edge AS edge ON edge.source = change.source AND edge.target = change.target"
+    ), {'version': base_version}).all()
+    if any(source == '' for source, _, _ in changed):
+        return False
+
+    indptr = np.load(os.path.join(base, 'indptr.npy'))
+    indices = np.load(os.path.join(base, 'indices.npy'))
+    weights = np.load(os.path.join(base, 'weights.npy'))
+    with open(os.path.join(base, 'nodes.json')) as f:
+        nodes = json.load(f)
+    old_ids = [node for node, _ in nodes]
+    old_index = {node: i for i, node in enumerate(old_ids)}
+
+    # Each edge once, from its lower-indexed end, which is also its source
+    rows = np.repeat(np.arange(len(old_ids), dtype=np.int64), np.diff(indptr))
+    upper = indices > rows
+    sources, targets, weights = rows[upper], indices[upper].astype(np.int64), weights[upper]
+
+    # Drop changed edges; those still present come back below with their current weight
+    changed_keys = [
+        old_index[source] * len(old_ids) + old_index[target]
+        for source, target, _ in changed if source in old_index and target in old_index
+    ]
+    kept = ~np.isin(sources * len(old_ids) + targets, changed_keys)
+    sources, targets, weights = sources[kept], targets[kept], weights[kept]
+    current = [(source, target, weight) for source, target, weight in changed if weight]
+
+    still_used = np.unique(np.concatenate([sources, targets]))
+    ids = sorted({old_ids[i] for i in still_used.tolist()} | {node for edge in current for node in edge[:2]})
+    index = {node: i for i, node in enumerate(ids)}
+    remap = np.full(len(old_ids), -1, dtype=np.int32)
+    remap[still_used] = [index[old_ids[i]] for i in still_used.tolist()]
+
+    # A node's label can only change along with its edges
+    labels = {node: label for node, label in nodes}
+    labels.update(_node_labels(conn, {node for edge in changed for node in edge[:2]}))
+    _write_snapshot(
+        directory, ids, labels,
+        np.concatenate([remap[sources], np.array([index[source] for source, _, _ in current], dtype=np.int32)]),
+        np.concatenate([remap[targets], np.array([index[target] for _, target, _ in current], dtype=np.int32)]),
+        np.concatenate([weights, np.array([weight for _, _, weight in current], dtype=np.int32)])
+    )
+    return True
+
+
+class GraphSnapshot:
+    """One mapped graph version: CSR arrays over node indices plus the node ids and labels.
+
+    Never modified once loaded; KnowledgeGraph.refresh swaps in a new one, so a
+    request that holds a snapshot sees one version throughout.
+    """
+
+    __slots__ = ('version', 'indptr', 'indices', 'weights', 'strength', 'ids', 'labels', 'index')
+
+    def __init__(self, version, indptr, indices, weights, strength, ids, labels):
+        self.version = version
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.strength = strength
+        self.ids = tuple(ids)
+        self.labels = tuple(labels)
+        self.index = {node: i for i, node in enumerate(self.ids)}
+
+    @classmethod
+    def load(cls, path, version):
+        """Map the snapshot written into `path`"""
+        with open(os.path.join(path, 'nodes.json')) as f:
+            nodes = json.load(f)
+        return cls(
+            version,
+            np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'indices.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'weights.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'strength.npy'), mmap_mode='r'),
+            [node for node, _ in nodes],
+            [label for _, label in nodes]
+        )
+
+    def lookup(self, name):
+        """Node index for an id such as 'component:arduino uno', or a bare value of any kind"""
+        key = name.strip().lower()
+        if key in self.index:
+            return self.index[key]
+        for kind in NODE_KINDS:
+            if f'{kind}:{key}' in self.index:
+                return self.index[f'{kind}:{key}']
+        return None
+
+    def neighborhood(self, start, depth=1, limit=DEFAULT_LIMIT):
+        """Breadth-first walk from node `start`, keeping the strongest-connected nodes at
+        each hop until `limit` are found. Returns {node: hop}."""
+        hops = {start: 0}
+        frontier = [start]
+        for hop in range(1, depth + 1):
+            room = limit - len(hops)
+            if room <= 0 or not frontier:
+                break
+            found = {}
+            for node in frontier:
+                begin = int(self.indptr[node])
+                # Rows are sorted by weight, so the strongest new neighbours are among the
+                # first `room` plus however many could already have been visited
+                end = min(int(self.indptr[node + 1]), begin + room + len(hops))
+                for neighbour, weight in zip(self.indices[begin:end].tolist(), self.weights[begin:end].tolist()):
+                    if neighbour not in hops and weight > found.get(neighbour, 0):
+                        found[neighbour] = weight
+            frontier = sorted(found, key=lambda node: (-found[node], node))[:room]
+            hops.update((node, hop) for node in frontier)
+        return hops
+
+    def central(self, limit=DEFAULT_LIMIT):
+        """The `limit` nodes with the highest weighted degree, strongest first"""
+        if len(self.ids) > limit:
+            top = np.argpartition(-self.strength, limit - 1)[:limit]
+        else:
+            top = np.arange(len(self.ids))
+        return sorted(top.tolist(), key=lambda node: (-self.strength[node], node))
+
+    def subgraph(self, nodes, hops=None):
+        """Legacy {'nodes', 'connections'} payload for the given node indices and the edges among them"""
+        chosen = np.fromiter(nodes, dtype=np.int64, count=len(nodes))
+        connections = []
+        for node in nodes:
+            begin, end = int(self.indptr[node]), int(self.indptr[node + 1])
+            neighbours = np.asarray(self.indices[begin:end])
+            weights = np.asarray(self.weights[begin:end])
+            inside = np.isin(neighbours, chosen) & (neighbours > node)
+            connections.extend(
+                (node, neighbour, weight)
+                for neighbour, weight in zip(neighbours[inside].tolist(), weights[inside].tolist())
+            )
+
+        strongest = max((weight for _, _, weight in connections), default=1)
+        payload_nodes = []
+        for node in nodes:
+            kind = self.ids[node].split(':', 1)[0]
+            entry = {
+                'id': self.ids[node],
+                'label': self.labels[node],
+                'category': kind,
+                'connections': int(self.indptr[node + 1] - self.indptr[node])
+            }
+            if hops is not None:
+                entry['depth'] = hops[node]
+            payload_nodes.append(entry)
+
+        return {
+            'nodes': payload_nodes,
+            'connections': [
+                {
+                    'source': self.ids[source],
+                    'target': self.ids[target],
+                    'strength': round(weight / strongest, 2),
+                    'weight': weight
+                }
+                for source, target, weight in connections
+            ]
+        }
+
+
+
+
+class KnowledgeGraph:
+    """Keeps a GraphSnapshot of the current knowledge graph version mapped.
+
+    Snapshots live under KNOWLEDGE_GRAPH_DIR in one directory per graph version
+    and are built the first time a query sees a newer version, so every worker
+    maps the same files. A new snapshot is derived from the newest older one and
+    the edges changed since, falling back to a full build from knowledge_edge.
+    The newest KNOWLEDGE_GRAPH_KEEP snapshots are kept, so a worker still mapping
+    or deriving from a recent one never has it deleted underneath it, and the
+    change log is trimmed to what they need.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._directory = None
+        self.keep = 3
+        self._snapshot = None
+
+    def init_app(self, app):
+        self._directory = app.config['KNOWLEDGE_GRAPH_DIR']
+        self.keep = max(app.config.get('KNOWLEDGE_GRAPH_KEEP', 3), 1)
+        app.extensions['knowledge_graph'] = self
+
+    @property
+    def version(self):
+        """Version of the mapped snapshot, None before the first refresh"""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def current_version(self):
+        return db.session.execute(text("SELECT version FROM knowledge_graph_version")).scalar() or 0
+
+    def refresh(self):
+        """Map the snapshot of the current graph version, building it if needed, and return it"""
+        version = self.current_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            os.makedirs(self._directory, exist_ok=True)
+            path = os.path.join(self._directory, f'v{version}')
+            if not os.path.exists(path):
+                # Build in a scratch directory and rename it, so other workers never map a partial snapshot
+                scratch = tempfile.mkdtemp(dir=self._directory)
+                self._build(version, scratch)
+                try:
+                    os.replace(scratch, path)
+                except OSError:
+                    # Another worker published this version first
+                    shutil.rmtree(scratch, ignore_errors=True)
+                self._prune(version)
+
+            # Published in one assignment, so readers never see arrays from two versions
+            self._snapshot = GraphSnapshot.load(path, version)
+            return self._snapshot
+
+    def _snapshots(self):
+        """Published snapshot versions, newest first"""
+        names = os.listdir(self._directory)
+        return sorted((int(name[1:]) for name in names if name[:1] == 'v' and name[1:].isdigit()), reverse=True)
+
+    def _build(self, version, directory):
+        conn = db.session.connection()
+        for base_version in self._snapshots():
+            if base_version < version:
+                try:
+                    if update_snapshot(conn, os.path.join(self._directory, f'v{base_version}'), base_version, directory):
+                        return
+                except FileNotFoundError:
+                    # Pruned by another worker while being read
+                    pass
+                break
+        build_snapshot(conn, directory)
+
+    def _prune(self, version):
+        """Delete all but the newest `keep` snapshots and the changes only older ones needed"""
+        versions = self._snapshots()
+        for old in versions[self.keep:]:
+            if old != version:
+                shutil.rmtree(os.path.join(self._directory, f'v{old}'), ignore_errors=True)
+        oldest = min(versions[:self.keep] + [version])
+        db.session.execute(text("DELETE FROM knowledge_edge_change WHERE version < :version"), {'version': oldest})
+        db.session.commit()
+
+
+knowledge_graph = KnowledgeGraph()
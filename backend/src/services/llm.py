@@ -0,0 +1,208 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import httpx
+
+
+class LLMUnavailable(Exception):
+    """The completion backend is not configured, overloaded, slow or failing"""
+
+
+def render_prompt(messages):
+    """Flatten chat messages into a plain completion prompt for batched requests"""
+    lines = [f"{message['role'].capitalize()}: {message['content']}" for message in messages]
+    lines.append('Assistant:')
+    return '\n\n'.join(lines)
+
+
+class LLMBackend:
+    """Client for an OpenAI-compatible completion server.
+
+    All requests share one pooled httpx client with keep-alive, and at most
+    `max_concurrency` are in flight at once; callers wait up to `timeout` for a
+    slot. With `batching`, concurrent non-streaming requests are gathered for up
+    to `batch_window` seconds and sent as one multi-prompt /v1/completions call.
+    """
+
+    def __init__(self, base_url, model, api_key=None, timeout=8.0, max_concurrency=8,
+                 batching=False, batch_window=0.01, max_batch_size=16):
+        headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+        self.model = model
+        self.timeout = timeout
+        self.client = httpx.Client(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 2.0)),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        )
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._batcher = _MicroBatcher(self, batch_window, max_batch_size) if batching else None
+
+    def complete(self, messages):
+        """Return the full completion for chat `messages`"""
+        if self._batcher is not None:
+            try:
+                return self._batcher.submit(render_prompt(messages)).result(timeout=self.timeout * 2)
+            except FutureTimeout:
+                raise LLMUnavailable('Timed out waiting for a batched completion')
+
+        data = self._post('/v1/chat/completions', {'model': self.model, 'messages': messages})
+        try:
+            return data['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            raise LLMUnavailable('Malformed completion response')
+
+    def complete_batch(self, prompts):
+        """Return completions for several plain prompts with one request"""
+        data = self._post('/v1/completions', {'model': self.model, 'prompt': prompts})
+        try:
+            texts = [None] * len(prompts)
+            for choice in data['choices']:
+                texts[choice['index']] = choice['text']
+        except (KeyError, IndexError, TypeError):
+            raise LLMUnavailable('Malformed completion response')
+        if None in texts:
+            raise LLMUnavailable('Completion response is missing choices')
+        return texts
+
+    def stream(self, messages):
+        """Yield completion text deltas for chat `messages` as the server produces them"""
+        self._acquire()
+        try:
+            with self.client.stream('POST', '/v1/chat/completions', json={
+                'model': self.model, 'messages': messages, 'stream': True
+            }) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    payload = line[len('data:'):].strip()
+                    if payload == '[DONE]':
+                        break
+                    delta = json.loads(payload)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
+        except (httpx.HTTPError, ValueError, KeyError, IndexError) as e:
+            raise LLMUnavailable(str(e)) from e
+        finally:
+            self._slots.release()
+
+    def close(self):
+        if self._batcher is not None:
+            self._batcher.stop()
+        self.client.close()
+
+    def _post(self, path, payload):
+        self._acquire()
+        try:
+            response = self.client.post(path, json=payload)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise LLMUnavailable(str(e)) from e
+        finally:
+            self._slots.release()
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise LLMUnavailable('Too many concurrent completion requests')
+
+
+class _MicroBatcher:
+    """Collects prompts submitted from many threads into multi-prompt requests"""
+
+    def __init__(self, backend, window, max_size):
+        self.backend = backend
+        self.window = window
+        self.max_size = max_size
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name='llm-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, prompt):
+        future = Future()
+        self._queue.put((prompt, future))
+        return future
+
+    def stop(self):
+        self._stopped = True
+        self._queue.put(None)
+
+    def _run(self):
+        while not self._stopped:
+            item = self._queue.get()
+            if item is None:
+                continue
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+
+            # Requests run off the collecting thread so the next batch can fill meanwhile
+            threading.Thread(target=self._send, args=(batch,), daemon=True).start()
+
+    def _send(self, batch):
+        try:
+            texts = self.backend.complete_batch([prompt for prompt, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e if isinstance(e, LLMUnavailable) else LLMUnavailable(str(e)))
+            return
+        for (_, future), text in zip(batch, texts):
+            future.set_result(text)
+
+
+class LLMService:
+    """App-level holder for the optional completion backend.
+
+    Configured from LLM_BASE_URL (unset disables the backend), LLM_MODEL,
+    LLM_API_KEY, LLM_TIMEOUT, LLM_MAX_CONCURRENCY, LLM_BATCHING,
+    LLM_BATCH_WINDOW and LLM_MAX_BATCH_SIZE.
+    """
+
+    def __init__(self):
+        self.backend = None
+
+    def init_app(self, app):
+        base_url = app.config.get('LLM_BASE_URL')
+        if base_url:
+            self.backend = LLMBackend(
+                base_url,
+                app.config.get('LLM_MODEL', 'default'),
+                api_key=app.config.get('LLM_API_KEY'),
+                timeout=app.config.get('LLM_TIMEOUT', 8.0),
+                max_concurrency=app.config.get('LLM_MAX_CONCURRENCY', 8),
+                batching=app.config.get('LLM_BATCHING', False),
+                batch_window=app.config.get('LLM_BATCH_WINDOW', 0.01),
+                max_batch_size=app.config.get('LLM_MAX_BATCH_SIZE', 16)
+            )
+        app.extensions['llm'] = self
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def complete(self, messages):
+        if self.backend is None:
+            raise LLMUnavailable('No completion backend configured')
+        return self.backend.complete(messages)
+
+    def stream(self, messages):
+        if self.backend is None:
+            raise LLMUnavailable('No completion backend configured')
+        return self.backend.stream(messages)
+
+
+llm = LLMService()
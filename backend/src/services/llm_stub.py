@@ -0,0 +1,82 @@
+"""Minimal OpenAI-compatible completion server for local development and tests.
+
+Run standalone with `python -m src.services.llm_stub --port 8001`, or start one
+in-process with `serve_stub()`.
+"""
+import argparse
+import json
+import threading
+import time
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+
+def create_stub_app(delay=0.0, token_delay=0.0):
+    """Stub app that answers every prompt with 'Stub reply to: <last user line>'.
+
+    `delay` is slept before each response and `token_delay` between streamed
+    tokens, to exercise timeouts. Batch sizes seen are recorded in
+    app.config['BATCH_SIZES'].
+    """
+    app = Flask(__name__)
+    app.config['BATCH_SIZES'] = []
+
+    def answer(prompt):
+        last = prompt.strip().splitlines()[-1] if prompt.strip() else ''
+        return f"Stub reply to: {last.removeprefix('User: ')}"
+
+    @app.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        data = request.get_json()
+        text = answer(data['messages'][-1]['content'])
+        time.sleep(delay)
+
+        if not data.get('stream'):
+            return jsonify({
+                'object': 'chat.completion',
+                'model': data.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}]
+            })
+
+        def events():
+            for i, word in enumerate(text.split(' ')):
+                time.sleep(token_delay)
+                chunk = {'choices': [{'index': 0, 'delta': {'content': (' ' if i else '') + word}}]}
+                yield f'data: {json.dumps(chunk)}\n\n'
+            yield 'data: [DONE]\n\n'
+
+        return Response(events(), mimetype='text/event-stream')
+
+    @app.route('/v1/completions', methods=['POST'])
+    def completions():
+        data = request.get_json()
+        prompts = data['prompt'] if isinstance(data['prompt'], list) else [data['prompt']]
+        app.config['BATCH_SIZES'].append(len(prompts))
+        time.sleep(delay)
+        # Completion prompts end with 'Assistant:', so answer the line before it
+        return jsonify({
+            'object': 'text_completion',
+            'model': data.get('model'),
+            'choices': [
+                {'index': index, 'text': answer(prompt.rsplit('\n\nAssistant:', 1)[0]), 'finish_reason': 'stop'}
+                for index, prompt in enumerate(prompts)
+            ]
+        })
+
+    return app
+
+
+def serve_stub(host='127.0.0.1', port=0, **options):
+    """Start a stub server on a background thread, returning (server, base_url)"""
+    server = make_server(host, port, create_stub_app(**options), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.0)
+    args = parser.parse_args()
+    create_stub_app(delay=args.delay).run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,228 @@
+import heapq
+import json
+import threading
+import time
+from src.models.project import db, Project
+from src.services.catalog import catalog_prices, normalize_name
+from src.services.stats import count_projects
+
+SKILL_LEVELS = ('beginner', 'intermediate', 'advanced')
+# Words that say nothing about which part is meant
+_STOPWORDS = {'a', 'an', 'and', 'for', 'of', 'the', 'with', 'x'}
+
+# Weights of the match score parts, summing to 100
+COVERAGE_WEIGHT = 60
+SKILL_WEIGHT = 20
+BUDGET_WEIGHT = 20
+
+
+def _token(word):
+    return word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+
+
+def part_tokens(name):
+    """Significant, singularized words of a part name"""
+    return frozenset(_token(word) for word in normalize_name(name).split() if word not in _STOPWORDS)
+
+
+class ProjectMatcher:
+    """Inverted index from part-name words to the projects needing those parts.
+
+    A piece of equipment covers a project component when either name's words
+    contain the other's ("raspberry pi" covers "Raspberry Pi 4" and vice versa).
+    The index is refreshed incrementally from projects whose updated_at moved
+    past the last one seen, and rebuilt when projects were deleted. Queries check
+    for changes at most every MATCH_REFRESH_INTERVAL seconds, one thread at a
+    time, and the database is read without holding the lock queries need.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.refresh_interval = 2.0
+        self._checked = None
+        self._reset()
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('MATCH_REFRESH_INTERVAL', 2.0)
+        app.extensions['matcher'] = self
+
+    def _reset(self):
+        self._projects = {}  # id -> project summary with its part keys
+        self._postings = {}  # word -> part keys containing it
+        self._part_tokens = {}  # part key -> its words
+        self._part_projects = {}  # part key -> ids of projects needing it
+        self._sources = {}  # id -> the project fields its entry was built from
+        self._watermark = None
+
+    def refresh(self, force=False):
+        """Index projects created or changed since the last refresh"""
+        def fresh():
+            return not force and self._checked is not None and time.monotonic() - self._checked < self.refresh_interval
+
+        if fresh():
+            return
+        # Once built, queries answer from the current index rather than wait for another
+        # thread's refresh; only the refreshing thread writes the index, so it may read it unlocked
+        if not self._refreshing.acquire(blocking=force or self._checked is None):
+            return
+        try:
+            if fresh():
+                return
+            checked = time.monotonic()
+            changed = self._load(self._changed_since(self._watermark))
+            # Deleted projects never show up as changed, so fall back to a full rebuild; the
+            # trigger-maintained per-category counts tell without scanning project
+            count = count_projects()
+            with self._lock:
+                self._apply(*changed)
+                rebuild = count != len(self._projects)
+            if rebuild:
+                self._sources = {}
+                changed = self._load(self._changed_since(None))
+                with self._lock:
+                    self._reset()
+                    self._apply(*changed)
+            self._checked = checked
+        finally:
+            self._refreshing.release()
+
+    def _changed_since(self, watermark):
+        query = db.session.query(Project).options(db.load_only(
+            Project.id, Project.title, Project.description, Project.difficulty,
+            Project.cost, Project.components, Project.updated_at
+        ))
+        if watermark is not None:
+            # Rows stamped with the watermark itself may have been written after it was read
+            query = query.filter(Project.updated_at >= watermark)
+        return query.all()
+
+    def _load(self, rows):
+        """(projects whose indexed fields changed, their part names, catalog prices, newest updated_at)"""
+        changed = [
+            project for project in rows
+            if self._sources.get(project.id) != self._source(project)
+        ]
+        parts = {project.id: json.loads(project.components or '[]') for project in changed}
+        prices = catalog_prices({normalize_name(name) for names in parts.values() for name in names}) if parts else {}
+        stamps = [project.updated_at for project in rows if project.updated_at]
+        return changed, parts, prices, max(stamps, default=None)
+
+    @staticmethod
+    def _source(project):
+        return (project.title, project.description, project.difficulty, project.cost, project.components)
+
+    def _apply(self, changed, parts, prices, watermark):
+        for project in changed:
+            self._index(project, parts[project.id], prices)
+            self._sources[project.id] = self._source(project)
+        # Rows at the watermark are read again next time, but skipped unless they changed
+        if watermark and (self._watermark is None or watermark > self._watermark):
+            self._watermark = watermark
+
+    def _index(self, project, names, prices):
+        self._remove(project.id)
+        components = []
+        for name in names:
+            key = normalize_name(name)
+            # Parts missing from the catalog are priced at an even share of the project cost
+            components.append((key, name, prices.get(key, project.cost / len(names))))
+            if key not in self._part_tokens:
+                self._part_tokens[key] = part_tokens(name)
+                for word in self._part_tokens[key]:
+                    self._postings.setdefault(word, set()).add(key)
+            self._part_projects.setdefault(key, set()).add(project.id)
+
+        self._projects[project.id] = {
+            'id': project.id,
+            'title': project.title,
+            'description': project.description,
+            'difficulty': project.difficulty,
+            'cost': project.cost,
+            'components': components
+        }
+
+    def _remove(self, project_id):
+        self._sources.pop(project_id, None)
+        previous = self._projects.pop(project_id, None)
+        if previous is None:
+            return
+        for key, _, _ in previous['components']:
+            projects = self._part_projects.get(key)
+            if projects is None:
+                continue
+            projects.discard(project_id)
+            if not projects:
+                del self._part_projects[key]
+                for word in self._part_tokens.pop(key):
+                    self._postings[word].discard(key)
+                    if not self._postings[word]:
+                        del self._postings[word]
+
+    def covered_parts(self, equipment):
+        """Part keys covered by any of the equipment names"""
+        covered = set()
+        for item in equipment:
+            tokens = part_tokens(item)
+            if not tokens:
+                continue
+            postings = [self._postings.get(word, set()) for word in tokens]
+            # Parts whose name contains every equipment word
+            covered |= set.intersection(*postings)
+            # Parts whose words all appear in the equipment name
+            covered |= {key for key in set().union(*postings) if self._part_tokens[key] <= tokens}
+        return covered
+
+    def suggest(self, equipment, skill_level='beginner', budget=100, limit=5):
+        """(top `limit` suggestions, number of projects matching) for the equipment.
+
+        Projects harder than `skill_level` or whose missing parts cost more than
+        `budget` are excluded. Only projects using some of the equipment are
+        scored, unless none does, in which case every project is.
+        """
+        self.refresh()
+        level = SKILL_LEVELS.index(skill_level) if skill_level in SKILL_LEVELS else 0
+
+        with self._lock:
+            covered = self.covered_parts(equipment)
+            candidates = set().union(*(self._part_projects[key] for key in covered)) if covered else set()
+            if not candidates:
+                candidates = self._projects.keys()
+
+            scored = []
+            for project_id in candidates:
+                project = self._projects[project_id]
+                difficulty = project['difficulty'].lower()
+                gap = level - (SKILL_LEVELS.index(difficulty) if difficulty in SKILL_LEVELS else 0)
+                if gap < 0:
+                    continue
+
+                components = project['components']
+                missing = [(name, price) for key, name, price in components if key not in covered]
+                missing_cost = round(sum(price for _, price in missing), 2)
+                if missing_cost > budget:
+                    continue
+
+                coverage = 1 - len(missing) / len(components) if components else 0
+                skill_fit = 1 if gap == 0 else 0.8
+                budget_fit = 1 - missing_cost / budget if budget else 1
+                score = COVERAGE_WEIGHT * coverage + SKILL_WEIGHT * skill_fit + BUDGET_WEIGHT * budget_fit
+                scored.append((score, -project_id, project, missing, missing_cost))
+
+            top = heapq.nlargest(limit, scored, key=lambda entry: entry[:2])
+            suggestions = [
+                {
+                    'id': project['id'],
+                    'title': project['title'],
+                    'match_score': round(score),
+                    'required_additional': [name for name, _ in missing],
+                    'estimated_cost': missing_cost,
+                    'difficulty': project['difficulty'],
+                    'description': project['description']
+                }
+                for score, _, project, missing, missing_cost in top
+            ]
+            return suggestions, len(scored)
+
+
+matcher = ProjectMatcher()
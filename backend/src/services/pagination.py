@@ -0,0 +1,27 @@
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort, key):
+    """Opaque cursor for the row `key` (the sort key values) of a listing sorted by `sort`"""
+    payload = json.dumps({'sort': sort, 'key': list(key)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Return the key stored in `cursor`, checking it was issued for the same sort order"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = payload['key']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+    if payload.get('sort') != sort or not isinstance(key, list):
+        raise InvalidCursor(f'Cursor was not issued for sort={sort}')
+    return key
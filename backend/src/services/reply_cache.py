@@ -0,0 +1,220 @@
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from difflib import SequenceMatcher
+import numpy as np
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+# Longest first; only stripped when at least three characters remain
+_SUFFIXES = ('ingly', 'edly', 'ness', 'ment', 'iest', 'ings', 'est', 'ing', 'ies', 'ers', 'er', 'ed', 'es', 'ly', 's')
+
+
+def stem(word):
+    """Crude suffix-stripping stemmer, enough to fold plurals and comparatives"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + ('y' if suffix in ('ies', 'iest') else '')
+    return word
+
+
+# Words that carry no topic: question and filler words, plus generic nouns such as
+# "board" that name what was asked about without changing the answer
+_FILLER = {stem(word) for word in (
+    'a an the and or but for to of in on at by with from about is are was be am it its this that these those '
+    'i me my we our you your what which how who where when why can could should would will do does did '
+    'please need want looking recommend suggest tell give get show use using build make some any there here '
+    'good best great top '
+    'board module kit device thing project system one part component idea option'
+).split()}
+# Weight of a filler word's features relative to a content word's
+FILLER_WEIGHT = 0.2
+# Content words of at least four letters this alike are taken as one word misspelled
+TYPO_RATIO = 0.8
+
+
+def content_words(key):
+    """Topic-bearing words of a normalized prompt"""
+    return frozenset(word for word in key.split() if word not in _FILLER)
+
+
+def _same_word(a, b):
+    return a == b or (min(len(a), len(b)) >= 4 and SequenceMatcher(None, a, b).ratio() >= TYPO_RATIO)
+
+
+def contradicts(entry_words, prompt_words):
+    """Whether a cached prompt is about something the new prompt doesn't ask: it has a
+    content word the new one lacks, as "sensor for plants" has for "sensor for cars"
+    and "cheap arduino" for "arduino". Words only the new prompt has, such as
+    "motor" in "servo motor", are left to the similarity threshold."""
+    return any(not any(_same_word(word, other) for other in prompt_words) for word in entry_words)
+
+
+def normalize(text):
+    """Case, punctuation, whitespace and inflection insensitive form of a prompt"""
+    return ' '.join(stem(word) for word in _WORD_RE.findall(text.lower()))
+
+
+class SemanticCache:
+    """Reply cache matching prompts exactly after normalization, or by cosine similarity.
+
+    Near matches compare hashed word and character trigram TF-IDF vectors held in a
+    fixed (capacity x dim) NumPy matrix, so memory is bounded by `capacity` and
+    `dim` regardless of traffic. Filler words weigh little in those vectors, and a
+    near match must not contradict the prompt's content words, so "sensor for
+    plants" never answers "sensor for cars" however similar they look, while
+    typos and rewordings still match. Entries expire after `ttl` seconds and the
+    least recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(self, capacity=1024, dim=2048, threshold=0.7, ttl=3600):
+        self._lock = threading.Lock()
+        self.configure(capacity, dim, threshold, ttl)
+
+    def init_app(self, app):
+        """Configure from REPLY_CACHE_CAPACITY, REPLY_CACHE_DIM, REPLY_CACHE_THRESHOLD and REPLY_CACHE_TTL"""
+        self.configure(
+            app.config.get('REPLY_CACHE_CAPACITY', 1024),
+            app.config.get('REPLY_CACHE_DIM', 2048),
+            app.config.get('REPLY_CACHE_THRESHOLD', 0.7),
+            app.config.get('REPLY_CACHE_TTL', 3600)
+        )
+        app.extensions['reply_cache'] = self
+
+    def configure(self, capacity, dim, threshold, ttl):
+        with self._lock:
+            self.capacity = capacity
+            self.dim = dim
+            self.threshold = threshold
+            self.ttl = ttl
+            # Sublinear term frequencies per slot, their squares for IDF-weighted norms,
+            # and document frequencies over occupied slots
+            self._tf = np.zeros((capacity, dim), dtype=np.float32)
+            self._tf_squared = np.zeros((capacity, dim), dtype=np.float32)
+            self._df = np.zeros(dim, dtype=np.float32)
+            self._slots = OrderedDict()  # normalized prompt -> slot, in LRU order
+            self._entries = [None] * capacity  # slot -> (normalized prompt, reply, expires_at, content words)
+            self._free = list(range(capacity - 1, -1, -1))
+            self._metrics = Counter()
+
+    @property
+    def memory_bytes(self):
+        return self._tf.nbytes + self._tf_squared.nbytes + self._df.nbytes
+
+    def get(self, prompt):
+        """Cached reply for `prompt` or a near-duplicate of it, else None"""
+        key = normalize(prompt)
+        now = time.monotonic()
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None and self._entries[slot][2] < now:
+                self._remove(key)
+                self._metrics['expired'] += 1
+                slot = None
+
+            if slot is None:
+                slot = self._nearest(key, now)
+                if slot is None:
+                    self._metrics['misses'] += 1
+                    return None
+                self._metrics['near_hits'] += 1
+            else:
+                self._metrics['exact_hits'] += 1
+
+            self._slots.move_to_end(self._entries[slot][0])
+            return self._entries[slot][1]
+
+    def put(self, prompt, reply):
+        key = normalize(prompt)
+        if not key:
+            return
+        with self._lock:
+            if key in self._slots:
+                self._remove(key)
+            if not self._free:
+                self._remove(next(iter(self._slots)))
+                self._metrics['evictions'] += 1
+
+            slot = self._free.pop()
+            tf = self._vectorize(key)
+            self._tf[slot] = tf
+            self._tf_squared[slot] = tf * tf
+            self._df += tf > 0
+            self._entries[slot] = (key, reply, time.monotonic() + self.ttl, content_words(key))
+            self._slots[key] = slot
+
+    def stats(self):
+        with self._lock:
+            lookups = self._metrics['exact_hits'] + self._metrics['near_hits'] + self._metrics['misses']
+            hits = self._metrics['exact_hits'] + self._metrics['near_hits']
+            return {
+                'entries': len(self._slots),
+                'capacity': self.capacity,
+                'memory_bytes': self.memory_bytes,
+                'exact_hits': self._metrics['exact_hits'],
+                'near_hits': self._metrics['near_hits'],
+                'misses': self._metrics['misses'],
+                'evictions': self._metrics['evictions'],
+                'expired': self._metrics['expired'],
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _vectorize(self, key):
+        features = Counter()
+        content = set()
+        for word in key.split():
+            word_features = self._word_features(word)
+            features.update(word_features)
+            if word not in _FILLER:
+                content.update(word_features)
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in features.items():
+            # Features only filler words produce count for little; trigrams shared with a content word don't
+            weight = 1.0 if feature in content else FILLER_WEIGHT
+            vector[zlib.crc32(feature.encode()) % self.dim] += weight * (1 + math.log(count))
+        return vector
+
+    @staticmethod
+    def _word_features(word):
+        padded = f' {word} '
+        return ['w:' + word] + ['c:' + padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    def _nearest(self, key, now):
+        if not self._slots:
+            return None
+        query = self._vectorize(key)
+        idf = np.log((len(self._slots) + 1) / (self._df + 1)) + 1
+        idf_squared = idf * idf
+
+        query_norm = np.sqrt(np.dot(query * query, idf_squared))
+        norms = np.sqrt(self._tf_squared @ idf_squared) * query_norm
+        dots = self._tf @ (query * idf_squared)
+        similarity = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+        # The most similar entries over the threshold, best first, until one is about the same thing
+        topic = content_words(key)
+        above = np.flatnonzero(similarity >= self.threshold)
+        for slot in above[np.argsort(-similarity[above], kind='stable')].tolist():
+            entry = self._entries[slot]
+            if entry is None or contradicts(entry[3], topic):
+                continue
+            if entry[2] < now:
+                self._remove(entry[0])
+                self._metrics['expired'] += 1
+                continue
+            return slot
+        return None
+
+    def _remove(self, key):
+        slot = self._slots.pop(key)
+        self._df -= self._tf[slot] > 0
+        self._tf[slot] = 0
+        self._tf_squared[slot] = 0
+        self._entries[slot] = None
+        self._free.append(slot)
+
+
+reply_cache = SemanticCache()
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from src.models.project import db, LearningRollup
+from src.services.activity_log import archive_table, archived_months
+
+# Bucket name -> SQLite expression giving an activity's period in that bucket
+BUCKETS = {
+    'minute': "strftime('%Y-%m-%d %H:%M', {ts})",
+    'day': "date({ts})",
+    'all': "''"
+}
+
+
+def _period(bucket, row):
+    return BUCKETS[bucket].format(ts=f'coalesce({row}.timestamp, CURRENT_TIMESTAMP)')
+
+
+# Rollups count every activity ever logged, so rows rolled over into the
+# archives or deleted keep their counts; only inserts are tracked.
+_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS learning_rollup_ai AFTER INSERT ON learning_activity BEGIN
+        INSERT INTO learning_rollup(bucket, period, activity_type, count)
+        VALUES ('minute', {_period('minute', 'new')}, new.activity_type, 1),
+               ('day', {_period('day', 'new')}, new.activity_type, 1),
+               ('all', {_period('all', 'new')}, new.activity_type, 1)
+        ON CONFLICT(bucket, period, activity_type) DO UPDATE SET count = count + 1;
+    END
+    """,
+]
+
+
+def init_learning_rollups(engine):
+    """Install the trigger that maintains learning_rollup and backfill it if empty"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    with engine.begin() as conn:
+        for statement in _DDL:
+            conn.execute(text(statement))
+
+        if conn.execute(text("SELECT 1 FROM learning_rollup LIMIT 1")).first() is None:
+            rebuild_learning_rollups(conn)
+
+
+def rebuild_learning_rollups(conn):
+    """Recount every rollup from the live activity table and its monthly archives.
+    Returns the number of activities counted."""
+    sources = ['learning_activity'] + [archive_table(month) for month in archived_months(conn)]
+    activities = ' UNION ALL '.join(f'SELECT activity_type, timestamp FROM {table}' for table in sources)
+
+    conn.execute(text("DELETE FROM learning_rollup"))
+    for bucket, period in BUCKETS.items():
+        period = period.format(ts='coalesce(timestamp, CURRENT_TIMESTAMP)')
+        conn.execute(text(
+            f"INSERT INTO learning_rollup(bucket, period, activity_type, count) "
+            f"SELECT '{bucket}', {period}, activity_type, count(*) FROM ({activities}) "
+            f"GROUP BY 2, 3"
+        ))
+    return conn.execute(text("SELECT coalesce(sum(count), 0) FROM learning_rollup WHERE bucket = 'all'")).scalar()
+
+
+def rollup_counts(bucket, since=None):
+    """Activity count per type in `bucket` rollups, over periods from `since` (a datetime) on"""
+    query = db.session.query(
+        LearningRollup.activity_type, db.func.sum(LearningRollup.count)
+    ).filter(LearningRollup.bucket == bucket)
+    if since is not None:
+        start = since.strftime('%Y-%m-%d %H:%M') if bucket == 'minute' else since.strftime('%Y-%m-%d')
+        query = query.filter(LearningRollup.period >= start)
+    return dict(query.group_by(LearningRollup.activity_type).all())
+
+
+def active_days(days, now=None):
+    """Per type, on how many of the last `days` UTC days (today included) it was logged"""
+    now = now or datetime.utcnow()
+    rows = db.session.query(
+        LearningRollup.activity_type, db.func.count()
+    ).filter(
+        LearningRollup.bucket == 'day',
+        LearningRollup.period >= (now - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    ).group_by(LearningRollup.activity_type).all()
+    return dict(rows)
@@ -0,0 +1,9 @@
+def ensure_indexes(engine, metadata):
+    """Create any declared index that is missing.
+
+    `create_all` only emits indexes together with new tables, so indexes added
+    to a model after its table exists would otherwise never be created.
+    """
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
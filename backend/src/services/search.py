@@ -0,0 +1,96 @@
+import re
+from sqlalchemy import Float, Integer, text
+
+# Full-text index over projects, kept in sync with the `project` table by triggers
+# so that bulk inserts and raw SQL updates are indexed as well as ORM writes.
+FTS_TABLE = 'project_fts'
+
+# bm25 column weights: title, description, tags
+RANK_WEIGHTS = (10.0, 1.0, 5.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_TAGS_TEXT = "(SELECT group_concat(value, ' ') FROM json_each({row}.tags))"
+
+_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, tags,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_fts_ai AFTER INSERT ON project BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, {_TAGS_TEXT.format(row='new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_fts_au AFTER UPDATE OF title, description, tags ON project BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, {_TAGS_TEXT.format(row='new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_fts_ad AFTER DELETE ON project BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+
+
+def is_supported(engine):
+    """Whether the full-text index is available for this database"""
+    return engine.dialect.name == 'sqlite'
+
+
+def init_search_index(engine):
+    """Create the FTS5 table and sync triggers, indexing any existing projects"""
+    if not is_supported(engine):
+        return
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first()
+
+        for statement in _DDL:
+            conn.execute(text(statement))
+
+        if not exists:
+            rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn):
+    """Re-index every project from scratch"""
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    conn.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, description, tags) "
+        f"SELECT id, title, description, {_TAGS_TEXT.format(row='project')} FROM project"
+    ))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+
+
+def build_match_expression(search):
+    """Turn free text into an FTS5 query: every term must match, each as a prefix"""
+    terms = _TOKEN_RE.findall(search.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_subquery(search):
+    """Subquery of (project_id, score) for projects matching `search`, lower score is better.
+
+    Returns None when the search contains no indexable terms.
+    """
+    match = build_match_expression(search)
+    if not match:
+        return None
+
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    return text(
+        f"SELECT rowid AS project_id, bm25({FTS_TABLE}, {weights}) AS score "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+    ).bindparams(match=match).columns(project_id=Integer, score=Float).subquery('search_results')
@@ -0,0 +1,56 @@
+import json
+from sqlalchemy.exc import IntegrityError
+from src.models.project import db, Project, LearningActivity, CommunityPost, SeedRun, Component, ComponentAlias, PriceQuote, Supplier, ComponentConflict
+from src.routes.projects import SAMPLE_PROJECTS
+from src.routes.learning import SAMPLE_ACTIVITIES
+from src.routes.community import SAMPLE_POSTS
+from src.services.catalog import component_rows, alias_rows, quote_rows, supplier_rows, conflict_rows
+
+
+def _project_rows():
+    return [
+        {
+            **project,
+            'tags': json.dumps(project['tags']),
+            'components': json.dumps(project['components']),
+            'skills': json.dumps(project['skills'])
+        }
+        for project in SAMPLE_PROJECTS
+    ]
+
+
+# (seed name, model, row factory) in insertion order
+SEEDS = [
+    ('sample_projects', Project, _project_rows),
+    ('sample_activities', LearningActivity, lambda: [dict(row) for row in SAMPLE_ACTIVITIES]),
+    ('sample_posts', CommunityPost, lambda: [dict(row) for row in SAMPLE_POSTS]),
+    ('sample_components', Component, component_rows),
+    ('sample_component_aliases', ComponentAlias, alias_rows),
+    ('sample_price_quotes', PriceQuote, quote_rows),
+    ('sample_suppliers', Supplier, supplier_rows),
+    ('sample_component_conflicts', ComponentConflict, conflict_rows)
+]
+
+
+def seed_database():
+    """Bulk insert each sample data set into its table once, returning the names applied.
+
+    Claiming the SeedRun row and inserting happen in one transaction, so when
+    several workers start together only one of them seeds. Tables that already
+    hold data are never seeded.
+    """
+    applied = []
+    for name, model, rows in SEEDS:
+        try:
+            db.session.add(SeedRun(name=name))
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            continue
+
+        if db.session.query(model.id).limit(1).first() is None:
+            db.session.bulk_insert_mappings(model, rows())
+            applied.append(name)
+        db.session.commit()
+
+    return applied
@@ -0,0 +1,240 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+_SESSION_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+_SENTENCE_END_RE = re.compile(r'[.?!](\s|$)')
+SUMMARY_LINE_CHARS = 160
+
+
+def estimate_tokens(text):
+    """Rough token count, about four characters per token"""
+    return len(text) // 4 + 1
+
+
+def _gist(text):
+    """First sentence of `text`, clipped to SUMMARY_LINE_CHARS"""
+    match = _SENTENCE_END_RE.search(text)
+    gist = text[:match.end()].strip() if match else text.strip()
+    return gist if len(gist) <= SUMMARY_LINE_CHARS else gist[:SUMMARY_LINE_CHARS - 3] + '...'
+
+
+class Session:
+    """One conversation: a window of recent turns within `token_budget`, plus a
+    summary of the turns folded out of it, itself capped at a quarter of the budget"""
+
+    def __init__(self, session_id, token_budget):
+        self.id = session_id
+        self.token_budget = token_budget
+        self.window = deque()
+        self.window_tokens = 0
+        self.summary = deque()
+        self.summary_tokens = 0
+        self.folded = 0
+        # Log records and bytes as of this process's last read or write
+        self.records = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def add(self, turn):
+        self.window.append(turn)
+        self.window_tokens += estimate_tokens(turn['content'])
+        while self.window_tokens > self.token_budget and len(self.window) > 1:
+            old = self.window.popleft()
+            self.window_tokens -= estimate_tokens(old['content'])
+            self.folded += 1
+            self._summarize(old)
+
+    def _summarize(self, turn):
+        line = f"{turn['role'].capitalize()}: {_gist(turn['content'])}"
+        self.summary.append(line)
+        self.summary_tokens += estimate_tokens(line)
+        while self.summary_tokens > self.token_budget // 4 and self.summary:
+            self.summary_tokens -= estimate_tokens(self.summary.popleft())
+
+    def context(self):
+        """Chat messages carrying the conversation so far"""
+        with self.lock:
+            messages = []
+            if self.summary:
+                messages.append({
+                    'role': 'system',
+                    'content': 'Summary of the earlier conversation:\n' + '\n'.join(self.summary)
+                })
+            messages.extend({'role': turn['role'], 'content': turn['content']} for turn in self.window)
+            return messages
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'conversation_id': self.id,
+                'summary': list(self.summary),
+                'turns': list(self.window),
+                'folded_turns': self.folded,
+                'context_tokens': self.window_tokens + self.summary_tokens
+            }
+
+
+class SessionStore:
+    """Conversation sessions with a hot in-memory tier over append-only logs.
+
+    Each session is a JSON-lines file of turns, written from its first turn on so
+    any worker can continue it, appended to once per turn and
+    rewritten as its summary plus current window once enough folded turns have
+    accumulated, so logs and load times stay proportional to the window rather
+    than the conversation. The most recently used sessions stay in memory; others
+    are loaded on first access, and a session whose log was changed by another
+    worker is reloaded. Logs idle for SESSION_IDLE_TTL seconds are deleted, as are
+    the least recently used ones beyond SESSION_MAX_COUNT. Configured from
+    SESSION_DIR, SESSION_HOT_CAPACITY, SESSION_TOKEN_BUDGET, SESSION_COMPACT_SLACK,
+    SESSION_IDLE_TTL, SESSION_MAX_COUNT and SESSION_PRUNE_INTERVAL.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.hot_capacity = 256
+        self.token_budget = 1500
+        self.compact_slack = 32
+        self.idle_ttl = 30 * 24 * 3600
+        self.max_count = 10000
+        self.prune_interval = 600
+        self._pruned = None
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.directory = app.config['SESSION_DIR']
+        self.hot_capacity = app.config.get('SESSION_HOT_CAPACITY', 256)
+        self.token_budget = app.config.get('SESSION_TOKEN_BUDGET', 1500)
+        self.compact_slack = app.config.get('SESSION_COMPACT_SLACK', 32)
+        self.idle_ttl = app.config.get('SESSION_IDLE_TTL', 30 * 24 * 3600)
+        self.max_count = app.config.get('SESSION_MAX_COUNT', 10000)
+        self.prune_interval = app.config.get('SESSION_PRUNE_INTERVAL', 600)
+        os.makedirs(self.directory, exist_ok=True)
+        app.extensions['sessions'] = self
+
+    def create(self):
+        session = Session(uuid.uuid4().hex, self.token_budget)
+        with self._lock:
+            self._remember(session)
+        self._maybe_prune()
+        return session
+
+    def get(self, session_id):
+        """The session with `session_id`, or None if it does not exist"""
+        if not isinstance(session_id, str) or not _SESSION_ID_RE.match(session_id):
+            return None
+        with self._lock:
+            session = self._hot.get(session_id)
+            if session is not None and session.size == self._log_size(session_id):
+                self._hot.move_to_end(session_id)
+                return session
+            session = self._load(session_id)
+            if session is not None:
+                self._remember(session)
+            return session
+
+    def append(self, session, role, content):
+        """Persist a turn and add it to the session's context window"""
+        turn = {'role': role, 'content': content, 'timestamp': datetime.now(timezone.utc).isoformat()}
+        line = (json.dumps({'type': 'turn', **turn}) + '\n').encode()
+        with session.lock:
+            with open(self._path(session.id), 'ab') as f:
+                f.write(line)
+            session.size += len(line)
+            session.records += 1
+            session.add(turn)
+            if session.records > len(session.window) + 1 + self.compact_slack:
+                self._compact(session)
+
+    def _path(self, session_id):
+        return os.path.join(self.directory, f'{session_id}.jsonl')
+
+    def _log_size(self, session_id):
+        try:
+            return os.path.getsize(self._path(session_id))
+        except OSError:
+            return 0
+
+    def _remember(self, session):
+        self._hot[session.id] = session
+        self._hot.move_to_end(session.id)
+        while len(self._hot) > self.hot_capacity:
+            # Every turn is already on disk, so evicted sessions reload lazily
+            self._hot.popitem(last=False)
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._pruned is not None and now - self._pruned < self.prune_interval:
+                return
+            self._pruned = now
+        self.prune()
+
+    def prune(self):
+        """Delete logs idle longer than `idle_ttl` and the least recently used ones
+        beyond `max_count`. Returns the number deleted."""
+        logs = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.jsonl'):
+                try:
+                    logs.append((entry.stat().st_mtime, entry.name[:-len('.jsonl')]))
+                except FileNotFoundError:
+                    continue
+        logs.sort(reverse=True)
+
+        cutoff = time.time() - self.idle_ttl if self.idle_ttl else None
+        expired = [
+            session_id for i, (modified, session_id) in enumerate(logs)
+            if (cutoff is not None and modified < cutoff) or (self.max_count and i >= self.max_count)
+        ]
+        for session_id in expired:
+            with self._lock:
+                self._hot.pop(session_id, None)
+            try:
+                os.remove(self._path(session_id))
+            except FileNotFoundError:
+                pass
+        return len(expired)
+
+    def _load(self, session_id):
+        try:
+            with open(self._path(session_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        session = Session(session_id, self.token_budget)
+        for line in data.splitlines():
+            record = json.loads(line)
+            if record['type'] == 'summary':
+                session.summary = deque(record['lines'])
+                session.summary_tokens = sum(estimate_tokens(text) for text in session.summary)
+                session.folded = record['folded']
+            else:
+                session.add({key: record[key] for key in ('role', 'content', 'timestamp')})
+            session.records += 1
+        session.size = len(data)
+        return session
+
+    def _compact(self, session):
+        records = [{'type': 'summary', 'lines': list(session.summary), 'folded': session.folded}]
+        records.extend({'type': 'turn', **turn} for turn in session.window)
+        data = ''.join(json.dumps(record) + '\n' for record in records).encode()
+
+        # Write then rename so concurrent readers see either the old or the new log
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(session.id))
+        session.records = len(records)
+        session.size = len(data)
+
+
+sessions = SessionStore()
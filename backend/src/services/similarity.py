@@ -0,0 +1,227 @@
+import heapq
+import json
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from src.models.project import db, Project
+from src.services.facets import FACET_COLUMNS
+from src.services.stats import count_projects
+
+# Weight of each feature kind in a project's vector; description words count for less
+FEATURE_WEIGHTS = {'tag': 1.0, 'component': 1.0, 'skill': 0.8, 'term': 0.4}
+# Neighbours kept per project; requests can ask for up to this many
+CACHE_SIZE = 20
+# Features on more than this share of projects (and at least COMMON_MIN_PROJECTS of them)
+# don't nominate candidates, which keeps scoring off near-universal words
+COMMON_SHARE = 0.02
+COMMON_MIN_PROJECTS = 100
+# A full rebuild refreshes IDF weights once the catalog has grown by this factor since the last one
+REBUILD_GROWTH = 1.25
+
+_WORD_RE = re.compile(r'[a-z][a-z0-9]{2,}')
+_STOPWORDS = {
+    'and', 'the', 'for', 'with', 'that', 'this', 'from', 'your', 'into', 'using',
+    'uses', 'use', 'can', 'will', 'are', 'its', 'you', 'any', 'all', 'when', 'based'
+}
+
+
+def project_features(project):
+    """Term frequencies of a project's 'tag:', 'component:', 'skill:' and 'term:' features"""
+    features = defaultdict(float)
+    for facet, column in FACET_COLUMNS.items():
+        for value in json.loads(getattr(project, column) or '[]'):
+            value = str(value).strip().lower()
+            if value:
+                features[f'{facet}:{value}'] = 1.0
+    for word in _WORD_RE.findall(f'{project.title or ""} {project.description or ""}'.lower()):
+        if word not in _STOPWORDS:
+            features[f'term:{word}'] += 1.0
+    return dict(features)
+
+
+class SimilarityIndex:
+    """TF-IDF cosine similarity between projects with cached top-k neighbours.
+
+    Vectors are kept as plain dicts, with an inverted index from feature to the
+    projects having it, so a project is only scored against those it shares a
+    distinctive feature with. Each project's neighbours are computed once and cached; a
+    project added or changed gets its own list and is pushed into the lists it
+    now belongs to, and lists it dropped out of are recomputed on next use.
+    IDF weights are refreshed by a full rebuild when the catalog has grown by
+    REBUILD_GROWTH or projects were deleted.
+
+    The database is checked for changes at most every SIMILAR_REFRESH_INTERVAL
+    seconds, so cached answers need no query at all.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.refresh_interval = 2.0
+        self._checked = None
+        self._reset()
+
+    def _reset(self):
+        self._features = {}  # id -> {feature: term frequency}
+        self._vectors = {}  # id -> {feature: unit-length tf-idf weight}
+        self._postings = {}  # feature -> ids of projects having it
+        self._summaries = {}  # id -> fields shown for a similar project
+        self._neighbours = {}  # id -> [(score, id)], best first
+        self._listed_in = {}  # id -> ids whose cached neighbours include it
+        self._watermark = None
+        self._built_for = 0
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('SIMILAR_REFRESH_INTERVAL', 2.0)
+        app.extensions['similarity'] = self
+
+    def refresh(self, force=False):
+        """Index projects created or changed since the last refresh"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked is not None and now - self._checked < self.refresh_interval:
+                return
+            self._checked = now
+
+            if self._watermark is not None:
+                changed = self._changed_since(self._watermark)
+                added = sum(project.id not in self._features for project in changed)
+                # Deleted projects never show up as changed, so they force a rebuild like growth does;
+                # the trigger-maintained per-category counts tell without scanning project
+                count = count_projects()
+                if count == len(self._features) + added and count <= self._built_for * REBUILD_GROWTH:
+                    self._apply(changed)
+                    return
+
+            self._reset()
+            self._apply(self._changed_since(None), rebuild=True)
+            self._built_for = len(self._features)
+
+    def _changed_since(self, watermark):
+        query = db.session.query(Project).options(db.load_only(
+            Project.id, Project.title, Project.description, Project.category, Project.difficulty,
+            Project.cost, Project.rating, Project.tags, Project.components, Project.skills, Project.updated_at
+        ))
+        if watermark is not None:
+            # Rows stamped with the watermark itself may have been written after it was read
+            query = query.filter(Project.updated_at >= watermark)
+        return query.all()
+
+    def _apply(self, changed, rebuild=False):
+        updated = []
+        for project in changed:
+            self._summaries[project.id] = {
+                'id': project.id,
+                'title': project.title,
+                'category': project.category,
+                'difficulty': project.difficulty,
+                'cost': project.cost,
+                'rating': project.rating
+            }
+            features = project_features(project)
+            # View and like counters also move updated_at; only content changes matter here
+            if features != self._features.get(project.id):
+                self._index(project.id, features)
+                updated.append(project.id)
+            if project.updated_at and (self._watermark is None or project.updated_at > self._watermark):
+                self._watermark = project.updated_at
+
+        if rebuild:
+            for project_id in self._features:
+                self._vectors[project_id] = self._vectorize(self._features[project_id])
+            return
+
+        for project_id in updated:
+            self._vectors[project_id] = self._vectorize(self._features[project_id])
+            self._forget(project_id)
+        for project_id in updated:
+            scores = self._scores(project_id)
+            self._store(project_id, scores)
+            # Push the project into the cached lists it now ranks in
+            for other, score in scores.items():
+                listed = self._neighbours.get(other)
+                if listed is None:
+                    continue
+                if len(listed) < CACHE_SIZE or (score, -project_id) > (listed[-1][0], -listed[-1][1]):
+                    self._store(other, dict([(neighbour, s) for s, neighbour in listed] + [(project_id, score)]))
+
+    def _index(self, project_id, features):
+        for feature in self._features.get(project_id, ()):
+            postings = self._postings[feature]
+            postings.discard(project_id)
+            if not postings:
+                del self._postings[feature]
+        self._features[project_id] = features
+        for feature in features:
+            self._postings.setdefault(feature, set()).add(project_id)
+
+    def _vectorize(self, features):
+        total = len(self._features)
+        vector = {
+            feature: FEATURE_WEIGHTS[feature.split(':', 1)[0]] * (1 + math.log(tf))
+            * (math.log((1 + total) / (1 + len(self._postings[feature]))) + 1)
+            for feature, tf in features.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {feature: weight / norm for feature, weight in vector.items()}
+
+    def _forget(self, project_id):
+        """Drop a changed project's cached lists, including every list it appears in"""
+        self._store(project_id, None)
+        for other in self._listed_in.pop(project_id, set()):
+            self._store(other, None)
+
+    def _store(self, project_id, scores):
+        for _, neighbour in self._neighbours.pop(project_id, ()):
+            self._listed_in.get(neighbour, set()).discard(project_id)
+        if scores is None:
+            return
+        top = heapq.nlargest(CACHE_SIZE, ((score, -other) for other, score in scores.items()))
+        self._neighbours[project_id] = [(score, -negated) for score, negated in top]
+        for _, neighbour in self._neighbours[project_id]:
+            self._listed_in.setdefault(neighbour, set()).add(project_id)
+
+    def _scores(self, project_id):
+        """Cosine similarity to the projects sharing a feature with `project_id` that is
+        not common; projects alike only in common features would rank too low to list"""
+        common = max(COMMON_MIN_PROJECTS, COMMON_SHARE * len(self._features))
+        vector = self._vectors[project_id]
+        scores = defaultdict(float)
+        shared_common = []
+        for feature, weight in vector.items():
+            postings = self._postings[feature]
+            if len(postings) > common:
+                shared_common.append((feature, weight))
+                continue
+            for other in postings:
+                scores[other] += weight * self._vectors[other][feature]
+        scores.pop(project_id, None)
+
+        for other in scores:
+            other_vector = self._vectors[other]
+            scores[other] += sum(weight * other_vector.get(feature, 0.0) for feature, weight in shared_common)
+        return scores
+
+    def similar(self, project_id, limit=5):
+        """[(similarity, summary, shared facet features)] for the projects most like
+        `project_id`, or None if it is not indexed"""
+        self.refresh()
+        with self._lock:
+            if project_id not in self._vectors:
+                return None
+            if project_id not in self._neighbours:
+                self._store(project_id, self._scores(project_id))
+
+            features = self._features[project_id]
+            results = []
+            for score, other in self._neighbours[project_id][:limit]:
+                shared = sorted(
+                    feature for feature in features.keys() & self._features[other].keys()
+                    if not feature.startswith('term:')
+                )
+                results.append((score, self._summaries[other], shared))
+            return results
+
+
+similarity = SimilarityIndex()
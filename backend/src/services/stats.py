@@ -0,0 +1,171 @@
+import os
+import threading
+from sqlalchemy import text
+from src.models.project import db
+
+# project_stats columns and the aggregate over project rows each one maintains
+STAT_COLUMNS = {
+    'project_count': 'count(*)',
+    'total_views': 'coalesce(sum(views), 0)',
+    'total_likes': 'coalesce(sum(likes), 0)',
+    'rating_sum': 'coalesce(sum(rating), 0.0)',
+    'rating_count': 'count(rating)'
+}
+
+
+def _remove(row):
+    return f"""
+        UPDATE project_stats SET
+            project_count = project_count - 1,
+            total_views = total_views - coalesce({row}.views, 0),
+            total_likes = total_likes - coalesce({row}.likes, 0),
+            rating_sum = rating_sum - coalesce({row}.rating, 0.0),
+            rating_count = rating_count - ({row}.rating IS NOT NULL)
+        WHERE category = {row}.category;
+        DELETE FROM project_stats WHERE category = {row}.category AND project_count <= 0;
+    """
+
+
+def _add(row):
+    return f"""
+        INSERT INTO project_stats(category, project_count, total_views, total_likes, rating_sum, rating_count)
+        VALUES ({row}.category, 1, coalesce({row}.views, 0), coalesce({row}.likes, 0),
+                coalesce({row}.rating, 0.0), {row}.rating IS NOT NULL)
+        ON CONFLICT(category) DO UPDATE SET
+            project_count = project_count + excluded.project_count,
+            total_views = total_views + excluded.total_views,
+            total_likes = total_likes + excluded.total_likes,
+            rating_sum = rating_sum + excluded.rating_sum,
+            rating_count = rating_count + excluded.rating_count;
+    """
+
+
+_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_stats_ai AFTER INSERT ON project BEGIN
+        {_add('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_stats_au AFTER UPDATE OF views, likes, rating, category ON project BEGIN
+        {_remove('old')}
+        {_add('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS project_stats_ad AFTER DELETE ON project BEGIN
+        {_remove('old')}
+    END
+    """,
+]
+
+_AGGREGATE = f"SELECT category, {', '.join(STAT_COLUMNS.values())} FROM project GROUP BY category"
+
+
+def init_project_stats(engine):
+    """Install the triggers that keep project_stats in sync and backfill it if empty"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    with engine.begin() as conn:
+        for statement in _DDL:
+            conn.execute(text(statement))
+
+        if conn.execute(text("SELECT 1 FROM project_stats LIMIT 1")).first() is None:
+            rebuild_project_stats(conn)
+
+
+def rebuild_project_stats(conn):
+    """Recompute every project_stats row from the project table"""
+    conn.execute(text("DELETE FROM project_stats"))
+    conn.execute(text(f"INSERT INTO project_stats(category, {', '.join(STAT_COLUMNS)}) {_AGGREGATE}"))
+
+
+def read_project_stats():
+    """Totals over all categories: a sum over one small row per category"""
+    row = db.session.execute(text(
+        f"SELECT {', '.join(f'coalesce(sum({column}), 0)' for column in STAT_COLUMNS)} FROM project_stats"
+    )).one()
+    return dict(zip(STAT_COLUMNS, row))
+
+
+def count_projects():
+    """Number of projects, summed from project_stats so it costs one row per category"""
+    return db.session.execute(text("SELECT coalesce(sum(project_count), 0) FROM project_stats")).scalar()
+
+
+def reconcile_project_stats(engine):
+    """Compare project_stats with a recomputation, rebuild it on any difference and
+    return the differences as a list of {category, field, stored, actual}"""
+    columns = ', '.join(STAT_COLUMNS)
+    with engine.begin() as conn:
+        # One statement, so both sides come from the same snapshot
+        rows = conn.execute(text(
+            f"SELECT 'actual', * FROM ({_AGGREGATE}) "
+            f"UNION ALL SELECT 'stored', category, {columns} FROM project_stats"
+        )).all()
+
+        sides = {'actual': {}, 'stored': {}}
+        for side, category, *values in rows:
+            sides[side][category] = dict(zip(STAT_COLUMNS, values))
+
+        drift = []
+        zero = dict.fromkeys(STAT_COLUMNS, 0)
+        for category in sorted(sides['actual'].keys() | sides['stored'].keys()):
+            actual = sides['actual'].get(category, zero)
+            stored = sides['stored'].get(category, zero)
+            for field in STAT_COLUMNS:
+                if abs(actual[field] - stored[field]) > 1e-6:
+                    drift.append({'category': category, 'field': field, 'stored': stored[field], 'actual': actual[field]})
+
+        if drift:
+            rebuild_project_stats(conn)
+    return drift
+
+
+class StatsReconciler:
+    """Periodically reconciles project_stats in the background, logging any drift.
+
+    Configured from STATS_RECONCILE_INTERVAL (seconds, <= 0 disables it). The
+    worker starts with the first request, and again in each forked worker.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._interval = 0
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        self._app = app
+        self._interval = app.config.get('STATS_RECONCILE_INTERVAL', 3600)
+        app.extensions['stats_reconciler'] = self
+        if self._interval > 0:
+            app.before_request(self._ensure_worker)
+
+    def run_once(self):
+        with self._app.app_context():
+            drift = reconcile_project_stats(db.engine)
+        if drift:
+            self._app.logger.warning('Project stats drifted and were rebuilt: %s', drift)
+        return drift
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            threading.Thread(target=self._run, name='stats-reconcile', daemon=True).start()
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.run_once()
+            except Exception:
+                self._app.logger.exception('Failed to reconcile project stats')
+
+
+stats_reconciler = StatsReconciler()
@@ -0,0 +1,50 @@
+import os
+import socket
+import sys
+import tempfile
+import pytest
+
+# The app is configured when src.main is imported, so point every file it writes
+# at a scratch directory first
+_DATA_DIR = tempfile.mkdtemp(prefix='techcraft-tests-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(_DATA_DIR, 'app.db')}",
+    'RESPONSE_CACHE_DIR': os.path.join(_DATA_DIR, 'response_cache'),
+    'SESSION_DIR': os.path.join(_DATA_DIR, 'conversations'),
+    'CONCEPT_DATA_DIR': _DATA_DIR,
+    'KNOWLEDGE_GRAPH_DIR': os.path.join(_DATA_DIR, 'knowledge_graph'),
+    'STATS_RECONCILE_INTERVAL': '0',
+    'LEARNING_ROLLOVER_INTERVAL': '0',
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import app as flask_app  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        yield flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def stub_llm():
+    """Base URL of an in-process stub completion server"""
+    from src.services.llm_stub import serve_stub
+    server, base_url = serve_stub()
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def unreachable_url():
+    """Base URL on which nothing is listening"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f'http://127.0.0.1:{port}'
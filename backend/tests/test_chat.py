@@ -0,0 +1,32 @@
+import pytest
+from src.services.chat import reply, stream_reply
+from src.services.intents import router
+from src.services.llm import LLMBackend, llm
+from src.services.reply_cache import reply_cache
+
+
+@pytest.fixture(params=['keywords', 'stub', 'unreachable', 'stub-batching'])
+def backend(request, monkeypatch):
+    # Start from an empty reply cache so no parameter answers from another's reply
+    reply_cache.configure(reply_cache.capacity, reply_cache.dim, reply_cache.threshold, reply_cache.ttl)
+    if request.param == 'keywords':
+        monkeypatch.setattr(llm, 'backend', None)
+        yield request.param
+        return
+    url = request.getfixturevalue('unreachable_url' if request.param == 'unreachable' else 'stub_llm')
+    backend = LLMBackend(url, 'test', timeout=2.0, batching=request.param == 'stub-batching')
+    monkeypatch.setattr(llm, 'backend', backend)
+    yield request.param
+    backend.close()
+
+
+@pytest.mark.parametrize('context', [None, [{'role': 'user', 'content': 'Earlier question'}]])
+def test_reply_matches_the_drained_stream(app, backend, context):
+    message = f"Which sensor suits a {backend} weather station{'' if context else ' at home'}?"
+    pieces = list(stream_reply(message, context))
+
+    assert reply(message, context) == ''.join(pieces)
+    if backend.startswith('stub'):
+        assert ''.join(pieces).strip() == f'Stub reply to: {message}'
+    else:
+        assert ''.join(pieces) == router.respond(message)
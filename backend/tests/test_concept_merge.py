@@ -0,0 +1,43 @@
+import pytest
+from src.routes.ai_chat import MAX_BATCH_PAIRS
+
+URL = '/api/ai-chat/concept-merge/batch'
+
+
+@pytest.mark.parametrize('body', [
+    [['arduino', 'led']],
+    {'pairs': {'concept1': 'arduino', 'concept2': 'led'}},
+    {'pairs': 'arduino,led'},
+    {'pairs': [['arduino']]},
+    {'pairs': [['arduino', 'led', 'servo']]},
+    {'pairs': ['ab']},
+    {'pairs': [['arduino', 3]]},
+    {'concepts': 'arduino'},
+    {'concepts': ['arduino', None]},
+    {},
+])
+def test_malformed_batches_are_rejected(client, body):
+    response = client.post(URL, json=body)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_oversized_batches_are_rejected_before_building_pairs(client):
+    too_many_pairs = {'pairs': [None] * (MAX_BATCH_PAIRS + 1)}
+    too_many_concepts = {'concepts': [f'concept {i}' for i in range(101)]}
+
+    for body in (too_many_pairs, too_many_concepts):
+        response = client.post(URL, json=body)
+        assert response.status_code == 400
+        assert str(MAX_BATCH_PAIRS) in response.get_json()['error']
+
+
+def test_pairs_and_concepts_are_merged_together(client):
+    response = client.post(URL, json={
+        'pairs': [['arduino', 'led'], {'concept1': 'servo', 'concept2': 'sensor'}],
+        'concepts': ['robot', 'camera', 'wifi']
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 5
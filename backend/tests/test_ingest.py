@@ -0,0 +1,71 @@
+import csv
+from datetime import datetime, timedelta
+import pytest
+from src.models.project import db, Component, LearningActivity, PriceQuote
+from src.services import ingest
+
+SUPPLIER = 'Cache Test Supply'
+
+
+@pytest.fixture
+def ingested(app):
+    """Delete the quotes and the activity an ingestion adds once the test is done"""
+    last_activity = db.session.query(db.func.max(LearningActivity.id)).scalar() or 0
+    yield
+    db.session.rollback()
+    PriceQuote.query.filter_by(supplier=SUPPLIER).delete()
+    LearningActivity.query.filter(LearningActivity.id > last_activity).delete()
+    db.session.commit()
+
+
+def _write_feed(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['component', 'supplier', 'price', 'quoted_at'])
+        writer.writerows(rows)
+
+
+def test_ingest_with_more_names_than_the_cache_holds(ingested, monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest, 'NAME_CACHE_LIMIT', 2)
+    names = [component.name for component in Component.query.order_by(Component.id).limit(8)]
+    path = tmp_path / 'prices.csv'
+    rows = []
+    for i, name in enumerate(names):
+        rows.append([name, SUPPLIER, f'{i + 1}.50', '2030-01-01T00:00:00'])
+        rows.append([f'unknown part {i}', SUPPLIER, '1.00', '2030-01-01T00:00:00'])
+        # Seen again in a later chunk, so some names come from the cache and some do not
+        rows.append([name, SUPPLIER, f'{i + 1}.50', '2030-01-02T00:00:00'])
+    _write_feed(path, rows)
+
+    report = ingest.ingest_prices(str(path), chunk_size=2)
+
+    assert report.rows_read == 24
+    assert report.rows_invalid == 0
+    assert report.rows_unmatched == 8
+    quotes = PriceQuote.query.filter_by(supplier=SUPPLIER).all()
+    assert sorted(quote.price for quote in quotes) == [i + 1.5 for i in range(8)]
+
+
+def test_quote_times_are_stored_as_naive_utc():
+    def quoted_at(value):
+        return ingest.normalize_row({'component': 'Arduino Uno', 'supplier': 'Shop', 'price': '5', 'quoted_at': value})[3]
+
+    assert quoted_at('2030-01-01T09:30:00+02:00') == datetime(2030, 1, 1, 7, 30)
+    assert quoted_at('2030-01-01T09:30:00') == datetime(2030, 1, 1, 9, 30)
+    assert abs(quoted_at(None) - datetime.utcnow()) < timedelta(seconds=5)
+
+
+@pytest.mark.parametrize('price', ['inf', '-inf', 'nan', 'Infinity', '1e400', '0', '-3'])
+def test_non_finite_and_non_positive_prices_are_invalid(price):
+    assert ingest.normalize_row({'component': 'Arduino Uno', 'supplier': SUPPLIER, 'price': price}) is None
+
+
+def test_infinite_prices_are_never_upserted(ingested, tmp_path):
+    name = Component.query.order_by(Component.id).first().name
+    path = tmp_path / 'prices.csv'
+    _write_feed(path, [[name, SUPPLIER, 'inf', ''], [name, SUPPLIER, '$1,e400', '']])
+
+    report = ingest.ingest_prices(str(path))
+
+    assert report.rows_invalid == 2
+    assert PriceQuote.query.filter_by(supplier=SUPPLIER).count() == 0
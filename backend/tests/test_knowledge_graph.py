@@ -0,0 +1,98 @@
+import json
+import os
+import numpy as np
+from sqlalchemy import text
+from src.models.project import db, Project
+from src.services.knowledge_graph import build_snapshot, knowledge_graph, rebuild_knowledge_edges
+
+FILES = ('indptr.npy', 'indices.npy', 'weights.npy', 'strength.npy')
+
+
+def _project(title, tags, components, category='Graph Testing'):
+    project = Project(
+        title=title, description='Knowledge graph check', difficulty='Beginner', cost=10.0,
+        duration='1 hour', category=category, tags=json.dumps(tags), components=json.dumps(components),
+        skills=json.dumps(['soldering'])
+    )
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def _assert_matches_full_build(tmp_path):
+    path = os.path.join(knowledge_graph._directory, f'v{knowledge_graph.version}')
+    tmp_path.mkdir()
+    build_snapshot(db.session.connection(), str(tmp_path))
+    for name in FILES:
+        assert np.array_equal(np.load(os.path.join(path, name)), np.load(tmp_path / name)), name
+    with open(os.path.join(path, 'nodes.json')) as derived, open(tmp_path / 'nodes.json') as full:
+        assert json.load(derived) == json.load(full)
+
+
+def test_derived_snapshots_match_a_full_build(app, monkeypatch, tmp_path):
+    knowledge_graph.refresh()
+    built = []
+    monkeypatch.setattr('src.services.knowledge_graph.build_snapshot', lambda *args: built.append(args))
+
+    first = _project('Graph one', ['Quasar'], ['Pulsar Sensor'])
+    _project('Graph two', ['quasar', 'nebula'], ['Pulsar sensor', 'Arduino Uno'], category='Graph Other')
+    knowledge_graph.refresh()
+    monkeypatch.undo()
+    assert built == []
+    _assert_matches_full_build(tmp_path / 'added')
+
+    first.tags = json.dumps(['Nebula'])
+    db.session.commit()
+    db.session.delete(first)
+    db.session.commit()
+    graph = knowledge_graph.refresh()
+    _assert_matches_full_build(tmp_path / 'removed')
+    assert graph.lookup('pulsar sensor') is not None
+    assert graph.lookup('graph testing') is None
+
+
+def test_held_snapshot_keeps_its_version_across_a_refresh(app):
+    graph = knowledge_graph.refresh()
+    ids, indptr = graph.ids, graph.indptr
+
+    _project('Graph held', ['Blazar'], ['Pulsar Sensor'])
+    newer = knowledge_graph.refresh()
+
+    assert newer is not graph and newer.version > graph.version
+    assert knowledge_graph.version == newer.version
+    assert graph.ids is ids and graph.indptr is indptr
+    assert graph.lookup('blazar') is None
+    assert newer.lookup('blazar') is not None
+    start = newer.lookup('blazar')
+    assert newer.subgraph(list(newer.neighborhood(start)))['nodes'][0]['id'] == 'tag:blazar'
+
+
+def test_only_old_snapshots_and_changes_are_pruned(app, monkeypatch):
+    monkeypatch.setattr(knowledge_graph, 'keep', 2)
+    project = _project('Graph pruning', ['Magnetar'], ['Pulsar Sensor'])
+    versions = []
+    for i in range(4):
+        project.tags = json.dumps([f'Magnetar {i}'])
+        db.session.commit()
+        knowledge_graph.refresh()
+        versions.append(knowledge_graph.version)
+
+    assert knowledge_graph._snapshots() == versions[:-3:-1]
+    oldest_change = db.session.execute(text("SELECT min(version) FROM knowledge_edge_change")).scalar()
+    assert oldest_change >= versions[-2]
+
+
+def test_recount_forces_a_full_build(app, monkeypatch, tmp_path):
+    knowledge_graph.refresh()
+    with db.engine.begin() as conn:
+        rebuild_knowledge_edges(conn)
+    built = []
+    real_build = build_snapshot
+    monkeypatch.setattr(
+        'src.services.knowledge_graph.build_snapshot', lambda *args: built.append(args) or real_build(*args)
+    )
+
+    knowledge_graph.refresh()
+
+    assert len(built) == 1
+    _assert_matches_full_build(tmp_path / 'recounted')
@@ -0,0 +1,66 @@
+import os
+import time
+from datetime import datetime, timedelta
+import pytest
+from src.models.project import db, LearningActivity
+from src.services import rollups
+
+
+@pytest.fixture
+def off_utc(monkeypatch):
+    """Run with a local time zone whose date differs from the UTC date right now"""
+    # POSIX Etc/ names flip the sign: GMT-14 is 14 hours ahead of UTC
+    monkeypatch.setenv('TZ', 'Etc/GMT-14' if datetime.utcnow().hour >= 12 else 'Etc/GMT+12')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_added_activities_are_stamped_in_utc(client, off_utc):
+    response = client.post('/api/learning/add-activity', json={'type': 'discovery', 'description': 'UTC check'})
+    added = response.get_json()['activity']
+
+    listed = client.get(f"/api/learning/activities?since={added['id'] - 1}").get_json()['activities'][0]
+
+    assert listed['id'] == added['id']
+    assert abs(datetime.fromisoformat(listed['timestamp']) - datetime.utcnow()) < timedelta(seconds=5)
+    assert listed['time'].endswith('seconds ago') and not listed['time'].startswith('-')
+
+
+def test_default_and_explicit_timestamps_read_alike(client, off_utc):
+    db.session.add(LearningActivity(activity_type='price', description='Stamped by the model default'))
+    db.session.commit()
+
+    recent = client.get('/api/learning/activities?type=price').get_json()[0]
+
+    assert recent['activity'] == 'Stamped by the model default'
+    assert recent['time'].endswith('seconds ago') and not recent['time'].startswith('-')
+
+
+def _log(description, timestamp):
+    db.session.add(LearningActivity(activity_type='discovery', description=description, timestamp=timestamp))
+    db.session.commit()
+
+
+def test_stats_count_activities_by_utc_day_and_hour(client, off_utc):
+    def totals():
+        stats = client.get('/api/learning/stats').get_json()
+        return sum(stats['daily_increases'].values()), sum(stats['hourly_increases'].values())
+
+    before = totals()
+    now = datetime.utcnow()
+    for age in (timedelta(0), timedelta(hours=2), timedelta(days=1)):
+        _log('Rollup window check', now - age)
+
+    today = 1 + ((now - timedelta(hours=2)).date() == now.date())
+    assert totals() == (before[0] + today, before[1] + 1)
+
+
+def test_progress_counts_today_by_utc_day(app, off_utc):
+    before = rollups.active_days(1).get('discovery', 0)
+    _log('Progress day check', datetime.utcnow() - timedelta(days=1))
+    assert rollups.active_days(1).get('discovery', 0) == before
+
+    _log('Progress day check', datetime.utcnow())
+    assert rollups.active_days(1)['discovery'] == 1
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.models.project import db, CommunityPost, Project
+from src.services.counters import counters
+
+REQUESTS = 2000
+WORKERS = 16
+
+
+def _hammer(app, method, url):
+    """Issue REQUESTS concurrent requests and return their status codes"""
+    def call(_):
+        client = app.test_client()
+        return getattr(client, method)(url).status_code
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        return list(pool.map(call, range(REQUESTS)))
+
+
+@pytest.fixture
+def post(app):
+    post = CommunityPost(user_name='Tester', user_avatar='T', content='Concurrency check')
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+
+@pytest.fixture
+def project(app):
+    project = Project(
+        title='Concurrency check', description='Counted under load', difficulty='Beginner', cost=10.0,
+        duration='1 hour', category='Testing', tags='[]', components='[]', skills='[]'
+    )
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def _fresh(model, pk):
+    db.session.expire_all()
+    return db.session.get(model, pk)
+
+
+def test_parallel_post_likes_are_all_counted(app, post):
+    before = post.likes or 0
+
+    statuses = _hammer(app, 'post', f'/api/community/posts/{post.id}/like')
+
+    assert statuses == [200] * REQUESTS
+    assert _fresh(CommunityPost, post.id).likes == before + REQUESTS
+    counters.flush()
+    assert _fresh(CommunityPost, post.id).likes == before + REQUESTS
+
+
+def test_parallel_project_likes_are_all_counted(app, project):
+    before = project.likes or 0
+
+    statuses = _hammer(app, 'post', f'/api/projects/{project.id}/like')
+
+    assert statuses == [200] * REQUESTS
+    assert _fresh(Project, project.id).likes == before + REQUESTS
+    counters.flush()
+    assert _fresh(Project, project.id).likes == before + REQUESTS
+
+
+def test_parallel_views_are_all_counted_after_flush(app, project):
+    counters.flush()
+    before = _fresh(Project, project.id).views or 0
+
+    statuses = _hammer(app, 'get', f'/api/projects/{project.id}')
+
+    assert statuses == [200] * REQUESTS
+    counters.flush()
+    assert _fresh(Project, project.id).views == before + REQUESTS
+
+
+def test_unknown_project_is_not_found_and_not_counted(client):
+    response = client.get('/api/projects/999999')
+
+    assert response.status_code == 404
+    assert counters.pending(Project, 'views', 999999) == 0
+
+
+def test_counter_flush_invalidates_cached_stats(app, client):
+    project = Project.query.first()
+    counters.flush()
+    before = client.get('/api/projects/stats').get_json()['total_views']
+
+    client.get(f'/api/projects/{project.id}')
+    assert client.get('/api/projects/stats').get_json()['total_views'] == before
+    counters.flush()
+
+    assert client.get('/api/projects/stats').get_json()['total_views'] == before + 1
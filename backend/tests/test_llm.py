@@ -0,0 +1,86 @@
+import threading
+import pytest
+from src.services.chat import reply, stream_reply
+from src.services.intents import router
+from src.services.llm import LLMBackend, LLMUnavailable, llm
+from src.services.llm_stub import serve_stub
+
+
+def _messages(text):
+    return [{'role': 'system', 'content': 'Be brief.'}, {'role': 'user', 'content': text}]
+
+
+@pytest.fixture
+def slow_llm():
+    server, base_url = serve_stub(delay=1.0)
+    yield base_url
+    server.shutdown()
+
+
+def test_plain_completion(stub_llm):
+    backend = LLMBackend(stub_llm, 'test', timeout=2.0)
+    try:
+        assert backend.complete(_messages('Which servo for a gripper?')) == 'Stub reply to: Which servo for a gripper?'
+    finally:
+        backend.close()
+
+
+def test_streamed_chunks(stub_llm):
+    backend = LLMBackend(stub_llm, 'test', timeout=2.0)
+    try:
+        pieces = list(backend.stream(_messages('How do I wire an LED strip?')))
+    finally:
+        backend.close()
+
+    assert len(pieces) > 1
+    assert ''.join(pieces) == 'Stub reply to: How do I wire an LED strip?'
+
+
+def test_timeout_raises_unavailable(slow_llm):
+    backend = LLMBackend(slow_llm, 'test', timeout=0.2)
+    try:
+        with pytest.raises(LLMUnavailable):
+            backend.complete(_messages('Is this too slow?'))
+        with pytest.raises(LLMUnavailable):
+            list(backend.stream(_messages('Is this too slow?')))
+    finally:
+        backend.close()
+
+
+def test_batched_requests_reach_the_right_callers():
+    server, base_url = serve_stub(delay=0.05)
+    backend = LLMBackend(base_url, 'test', timeout=2.0, batching=True, batch_window=0.2, max_batch_size=16)
+    questions = [f'Question number {i}?' for i in range(12)]
+    answers = {}
+    start = threading.Barrier(len(questions))
+
+    def ask(question):
+        start.wait()
+        answers[question] = backend.complete(_messages(question))
+
+    threads = [threading.Thread(target=ask, args=(question,)) for question in questions]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        backend.close()
+        server.shutdown()
+
+    assert answers == {question: f'Stub reply to: {question}' for question in questions}
+    sizes = server.app.config['BATCH_SIZES']
+    assert sum(sizes) == len(questions) and max(sizes) > 1
+
+
+@pytest.mark.parametrize('url', ['unreachable_url', 'slow_llm'])
+def test_chat_falls_back_to_keywords(app, monkeypatch, request, url):
+    backend = LLMBackend(request.getfixturevalue(url), 'test', timeout=0.2)
+    monkeypatch.setattr(llm, 'backend', backend)
+    message = f'What can I build with an Arduino and a buzzer ({url})?'
+    context = [{'role': 'user', 'content': 'Hello'}]
+    try:
+        assert reply(message, context) == router.respond(message)
+        assert ''.join(stream_reply(message, context)) == router.respond(message)
+    finally:
+        backend.close()
@@ -0,0 +1,69 @@
+import json
+import pytest
+from src.models.project import db, Project
+from src.services.matching import matcher
+from src.services.stats import count_projects
+
+
+def _project(title, components):
+    project = Project(
+        title=title, description='Matcher refresh check', difficulty='Beginner', cost=10.0,
+        duration='1 hour', category='Testing', tags='[]', components=json.dumps(components), skills='[]'
+    )
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_project_count_comes_from_project_stats(app):
+    before = count_projects()
+    project = _project('Counted project', ['Flux capacitor'])
+    assert count_projects() == before + 1 == Project.query.count()
+
+    db.session.delete(project)
+    db.session.commit()
+    assert count_projects() == before == Project.query.count()
+
+
+def _suggested(equipment):
+    suggestions, _ = matcher.suggest(equipment, 'advanced', budget=1000)
+    return [suggestion['id'] for suggestion in suggestions]
+
+
+def test_matcher_drops_deleted_projects(app):
+    project = _project('Matcher deletion check', ['Tachyon emitter'])
+    matcher.refresh(force=True)
+    assert project.id in _suggested(['tachyon emitter'])
+
+    db.session.delete(project)
+    db.session.commit()
+    matcher.refresh(force=True)
+    suggestions, _ = matcher.suggest(['tachyon emitter'], 'advanced', budget=1000)
+    assert project.id not in [suggestion['id'] for suggestion in suggestions]
+
+
+def test_refresh_is_throttled_and_skips_unchanged_projects(app, monkeypatch):
+    matcher.refresh(force=True)
+    monkeypatch.setattr(matcher, 'refresh_interval', 3600)
+    project = _project('Matcher throttle check', ['Graviton lens'])
+    assert project.id not in _suggested(['graviton lens'])
+
+    matcher.refresh(force=True)
+    assert project.id in _suggested(['graviton lens'])
+
+    indexed = []
+    monkeypatch.setattr(matcher, '_index', lambda *args: indexed.append(args))
+    matcher.refresh(force=True)
+    assert indexed == []
+
+
+@pytest.mark.parametrize('body', [
+    {'equipment': ['arduino'], 'budget': '50'},
+    {'equipment': ['arduino'], 'budget': True},
+    {'equipment': ['arduino'], 'budget': None},
+    {'equipment': ['arduino'], 'skill_level': 3},
+])
+def test_malformed_suggest_requests_are_rejected(client, body):
+    response = client.post('/api/ai-chat/suggest-projects', json=body)
+
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+import pytest
+
+URL = '/api/ai-chat/optimize-cost'
+
+
+@pytest.mark.parametrize('options', [
+    {'alternatives': 'two'},
+    {'alternatives': None},
+    {'alternatives': [2]},
+    {'time_budget_ms': 'fast'},
+    {'time_budget_ms': {'ms': 100}},
+    {'time_budget_ms': 1e400},
+    {'alternatives': 2.9},
+    {'alternatives': '2'},
+    {'alternatives': True},
+    {'time_budget_ms': 250.5},
+    {'time_budget_ms': False},
+])
+def test_malformed_options_are_rejected(client, options):
+    response = client.post(URL, json={'components': ['Arduino Uno'], **options})
+
+    assert response.status_code == 400
+    assert 'integers' in response.get_json()['error']
+
+
+def test_out_of_range_options_are_clamped(client):
+    response = client.post(URL, json={
+        'components': ['Arduino Uno'], 'alternatives': 1000, 'time_budget_ms': -5
+    })
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('quantity', [True, False, 2.5, '2', 0])
+def test_malformed_quantities_are_rejected(client, quantity):
+    response = client.post(URL, json={'components': [{'name': 'Arduino Uno', 'quantity': quantity}]})
+
+    assert response.status_code == 400
+    assert 'quantity' in response.get_json()['error']
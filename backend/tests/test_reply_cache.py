@@ -0,0 +1,58 @@
+import pytest
+from src.services.reply_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(capacity=16, dim=2048)
+
+
+@pytest.mark.parametrize('stored, asked', [
+    ('cheap arduino?', 'cheapest arduino board'),
+    ('cheapest arduino board', 'cheap arduino?'),
+    ('How do I build a line following robot?', 'how to build line-following robots'),
+    ('what sensor for soil moisture', 'which sensor should I use for soil moisture'),
+    ('what sensor for soil moisture', 'which sensor should I use to measure soil moisture'),
+    ('how do I connect a servo to an arduino', 'how to connect servo motor with arduino'),
+    ('how do I connect a servo to an arduino', 'how do i conect a servo to an arduino'),
+])
+def test_near_duplicates_hit(cache, stored, asked):
+    cache.put(stored, 'reply')
+    assert cache.get(asked) == 'reply'
+    assert cache.stats()['near_hits'] == 1
+
+
+@pytest.mark.parametrize('stored, asked', [
+    ('best budget sensor for plants', 'best budget sensor for cars'),
+    ('cheap arduino?', 'arduino'),
+    ('arduino', 'cheap arduino?'),
+    ('raspberry pi camera', 'raspberry pi display'),
+    ('arduino temperature sensor', 'arduino humidity sensor'),
+])
+def test_different_subjects_miss(cache, stored, asked):
+    cache.put(stored, 'reply')
+    assert cache.get(asked) is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_exact_hit_after_normalization(cache):
+    cache.put('Cheap   Arduino!', 'reply')
+    assert cache.get('cheap arduino') == 'reply'
+    assert cache.stats()['exact_hits'] == 1
+
+
+def test_near_hit_skips_a_closer_entry_about_something_else(cache):
+    cache.put('best budget sensor for plants', 'plants')
+    cache.put('budget sensor for cars please', 'cars')
+    assert cache.get('best budget sensor for cars') == 'cars'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(capacity=2, dim=256)
+    cache.put('arduino', 'a')
+    cache.put('raspberry pi', 'b')
+    cache.get('arduino')
+    cache.put('esp32', 'c')
+    assert cache.get('raspberry pi') is None
+    assert cache.get('arduino') == 'a'
+    assert cache.stats()['evictions'] == 1
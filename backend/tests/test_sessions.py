@@ -0,0 +1,60 @@
+import os
+import time
+from datetime import datetime, timedelta
+from src.services.sessions import sessions
+
+
+def _logs():
+    return {name for name in os.listdir(sessions.directory) if name.endswith('.jsonl')}
+
+
+def test_first_exchange_is_saved_and_continues_on_another_worker(client):
+    first = client.post('/api/ai-chat/message', json={'message': 'What is an Arduino?'}).get_json()
+    conversation_id = first['conversation_id']
+    assert f'{conversation_id}.jsonl' in _logs()
+
+    # Another worker, or this one after a restart or eviction, knows it only from disk
+    sessions._hot.clear()
+    response = client.post(
+        '/api/ai-chat/message', json={'message': 'And a Raspberry Pi?', 'conversation_id': conversation_id}
+    )
+
+    assert response.status_code == 200
+    sessions._hot.clear()
+    turns = client.get(f'/api/ai-chat/conversations/{conversation_id}').get_json()['turns']
+    assert [turn['content'] for turn in turns if turn['role'] == 'user'] == ['What is an Arduino?', 'And a Raspberry Pi?']
+    assert all(datetime.fromisoformat(turn['timestamp']).utcoffset() == timedelta(0) for turn in turns)
+
+
+def test_sessions_survive_eviction_from_memory(app, monkeypatch):
+    monkeypatch.setattr(sessions, 'hot_capacity', 2)
+    created = []
+    for i in range(5):
+        session = sessions.create()
+        sessions.append(session, 'user', f'question {i}')
+        created.append(session.id)
+
+    assert len(sessions._hot) == 2
+    assert [sessions.get(session_id).context()[-1]['content'] for session_id in created] == [
+        f'question {i}' for i in range(5)
+    ]
+
+
+def test_prune_deletes_idle_and_excess_logs(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(sessions, 'directory', str(tmp_path))
+    created = []
+    for i in range(4):
+        session = sessions.create()
+        sessions.append(session, 'user', f'question {i}')
+        created.append(session.id)
+    idle = time.time() - 3600
+    os.utime(sessions._path(created[0]), (idle, idle))
+    for i, session_id in enumerate(created[1:]):
+        os.utime(sessions._path(session_id), (time.time() - 10 + i,) * 2)
+    monkeypatch.setattr(sessions, 'idle_ttl', 60)
+    monkeypatch.setattr(sessions, 'max_count', 2)
+
+    sessions.prune()
+
+    assert _logs() == {f'{created[2]}.jsonl', f'{created[3]}.jsonl'}
+    assert sessions.get(created[0]) is None
@@ -0,0 +1,27 @@
+import json
+from src.models.project import db, Project
+from src.services.similarity import similarity
+
+
+def _project(title):
+    project = Project(
+        title=title, description='Similarity refresh check', difficulty='Beginner', cost=10.0,
+        duration='1 hour', category='Testing', tags=json.dumps(['chronoton', 'warp coil']),
+        components=json.dumps(['Chronoton detector']), skills='[]'
+    )
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_deleted_projects_leave_the_index(app):
+    first, second = _project('Chronoton tracker'), _project('Chronoton logger')
+    similarity.refresh(force=True)
+    assert second.id in [summary['id'] for _, summary, _ in similarity.similar(first.id)]
+
+    db.session.delete(second)
+    db.session.commit()
+    similarity.refresh(force=True)
+
+    assert second.id not in [summary['id'] for _, summary, _ in similarity.similar(first.id)]
+    assert similarity.similar(second.id) is None